@@ -0,0 +1,55 @@
+# jobs/events.py
+"""
+Live job notifications for faculty (served as SSE by jobs/views_events.py).
+
+New jobs are published on their department's channel and status changes on
+the job's own channel, so a faculty stream subscribes to its departments
+(new postings) and to its saved jobs (status transitions). Messages go out
+through myjobs_backend/pubsub.py once the change is committed.
+"""
+from myjobs_backend.cache import hashed_key
+from myjobs_backend.pubsub import publish_on_commit
+
+from .models import SavedJob
+
+
+def department_channel(department):
+    return f'dept:{hashed_key(department)}'
+
+
+def job_channel(job_id):
+    return f'job:{job_id}'
+
+
+def job_summary(job):
+    """Small enough for a NOTIFY payload; clients fetch the full job if needed."""
+    return {
+        'id': job.id,
+        'title': job.title,
+        'department': job.department,
+        'location': job.location,
+        'job_type': job.job_type,
+        'deadline': str(job.deadline),
+        'status': job.status,
+    }
+
+
+def publish_job_created(job):
+    if job.department and job.status == 'open':
+        publish_on_commit(department_channel(job.department), {'type': 'job.created', 'job': job_summary(job)})
+
+
+def publish_status_changed(job, old_status):
+    publish_on_commit(job_channel(job.id), {
+        'type': 'job.status',
+        'job_id': job.id,
+        'title': job.title,
+        'old_status': old_status,
+        'new_status': job.status,
+    })
+
+
+def faculty_channels(user, departments):
+    """Channels a faculty stream listens on: their departments and saved jobs."""
+    saved = SavedJob.objects.filter(faculty=user).values_list('job_id', flat=True)
+    return [department_channel(d) for d in departments] + [job_channel(job_id) for job_id in saved]
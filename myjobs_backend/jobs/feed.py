@@ -0,0 +1,77 @@
+# jobs/feed.py
+"""
+Shared cache of the faculty job feed.
+
+Faculty only see open jobs in their departments, and thousands of faculty
+share the same department set, so the feed is cached per (sorted department
+set, day) rather than per user. Each department has its own namespace
+version, bumped by jobs/signals.py whenever a job in it is created, edited,
+status-changed or deleted; a bump changes the key of every feed containing
+that department.
+"""
+from django.conf import settings
+from django.utils import timezone
+
+from myjobs_backend.cache import get_or_build, hashed_key, namespace_versions
+from .models import Job
+from .serializers import JobSerializer
+
+
+def faculty_departments(faculty_user):
+    """
+    Get all departments associated with a faculty user from their transcripts and courses
+    """
+    try:
+        faculty_profile = faculty_user.facultyprofile
+        departments = set()
+
+        # Get departments from transcripts
+        transcript_depts = faculty_profile.transcripts_list.filter(
+            department__isnull=False
+        ).values_list('department__name', flat=True)
+        departments.update(transcript_depts)
+
+        # Get departments from courses
+        course_depts = faculty_profile.transcripts_list.filter(
+            courses__department__isnull=False
+        ).values_list('courses__department__name', flat=True)
+        departments.update(course_depts)
+
+        return list(departments)
+    except:
+        return []
+
+
+def department_namespace(department):
+    return f'job-dept:{hashed_key(department)}'
+
+
+def feed_cache_key(departments, today):
+    namespaces = {d: department_namespace(d) for d in departments}
+    versions = namespace_versions(namespaces.values())
+    return 'faculty-feed:' + hashed_key(today.isoformat(), *(f'{d}@{versions[namespaces[d]]}' for d in departments))
+
+
+def build_feed(departments, today):
+    """Job cards, newest first, with relative file URLs."""
+    jobs = (
+        Job.objects.filter(department__in=departments, status='open', deadline__gte=today)
+        .select_related('posted_by__recruiterprofile')
+    )
+    return [dict(card) for card in JobSerializer(jobs, many=True).data]
+
+
+def faculty_feed(departments, request):
+    """Cached job cards for ``departments`` with absolute URLs for ``request``."""
+    departments = sorted(set(departments))
+    today = timezone.now().date()
+    cards = get_or_build(
+        feed_cache_key(departments, today),
+        lambda: build_feed(departments, today),
+        timeout=getattr(settings, 'FACULTY_FEED_CACHE_TIMEOUT', 600),
+        stale_timeout=60,
+    )
+    return [
+        {**card, 'pdf_document': request.build_absolute_uri(card['pdf_document'])} if card['pdf_document'] else card
+        for card in cards
+    ]
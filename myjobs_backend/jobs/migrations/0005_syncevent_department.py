@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_syncevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncevent',
+            name='department',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='syncevent',
+            name='kind',
+            field=models.CharField(choices=[('job', 'Job'), ('saved_job', 'Saved job'), ('feed_reset', 'Feed reset')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='syncevent',
+            index=models.Index(fields=['kind', 'department', 'seq'], name='jobs_syncev_kind_777221_idx'),
+        ),
+    ]
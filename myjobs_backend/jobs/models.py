@@ -122,3 +122,36 @@ class SavedJob(models.Model):
     
     def __str__(self):
         return f"{self.faculty.email} saved {self.job.title}"
+
+class SyncEvent(models.Model):
+    """
+    Append-only change log behind the ``?since=`` delta sync of the job and
+    saved-job lists (see jobs/sync.py). ``seq`` is the sync cursor.
+    """
+    KIND_CHOICES = [
+        ('job', 'Job'),
+        ('saved_job', 'Saved job'),
+        ('feed_reset', 'Feed reset'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()  # Job id; the faculty's user id for feed_reset
+    # Job owner or saving/affected faculty. Not a foreign key, so events
+    # written while a user is being deleted never block the cascade.
+    user_id = models.BigIntegerField(null=True, blank=True)
+    # Job events: the department the change is visible in (one event each for
+    # the old and new department of a moved job)
+    department = models.CharField(max_length=255, null=True, blank=True)
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['seq']
+        indexes = [
+            models.Index(fields=['kind', 'user_id', 'seq']),
+            models.Index(fields=['kind', 'department', 'seq']),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.kind} {self.object_id}{' (deleted)' if self.deleted else ''}"
@@ -163,3 +163,16 @@ class SavedJobSerializer(serializers.ModelSerializer):
             'is_active': job.is_active,
             'days_until_deadline': job.days_until_deadline
         }
+
+class BulkSavedJobSerializer(serializers.Serializer):
+    """Input for bulk save/unsave: lists of job ids"""
+    save = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500)
+    unsave = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500)
+
+    def validate(self, attrs):
+        both = set(attrs['save']) & set(attrs['unsave'])
+        if both:
+            raise serializers.ValidationError(f"Job ids both saved and unsaved: {sorted(both)}")
+        if not attrs['save'] and not attrs['unsave']:
+            raise serializers.ValidationError("Provide job ids to save and/or unsave.")
+        return attrs
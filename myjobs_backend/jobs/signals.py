@@ -0,0 +1,77 @@
+# jobs/signals.py
+"""
+Cache invalidation for per-recruiter job statistics and the shared faculty
+job feeds (see myjobs_backend/cache.py and jobs/feed.py), the delta-sync
+change log (jobs/sync.py) and live notifications (jobs/events.py).
+
+A faculty member's feed departments come from their transcripts and courses;
+courses are only written together with their transcript (see
+users/signals.py), so Transcript changes record the feed reset.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from myjobs_backend.cache import bump_namespace
+from users.models import FacultyProfile, Transcript
+from .events import publish_job_created, publish_status_changed
+from .feed import department_namespace
+from .models import Job
+from .sync import record_feed_reset, record_job_event
+
+
+@receiver(pre_save, sender=Job)
+def remember_department(sender, instance, **kwargs):
+    # A job moved to another department must drop out of the old feeds too;
+    # the old status tells job_status_changed() whether to notify.
+    instance._previous_department = instance._previous_status = None
+    if instance.pk:
+        instance._previous_department, instance._previous_status = (
+            Job.objects.filter(pk=instance.pk).values_list('department', 'status').first()
+            or (None, None)
+        )
+
+
+@receiver([post_save, post_delete], sender=Job)
+def job_changed(sender, instance, **kwargs):
+    namespaces = {f'job-stats:{instance.posted_by_id}'}
+    for department in (instance.department, getattr(instance, '_previous_department', None)):
+        if department:
+            namespaces.add(department_namespace(department))
+
+    def bump():
+        for namespace in namespaces:
+            bump_namespace(namespace)
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=Job)
+def log_job_saved(sender, instance, **kwargs):
+    # Written in the same transaction as the change, so the two commit together
+    record_job_event(instance, previous_department=getattr(instance, '_previous_department', None))
+
+
+@receiver(post_delete, sender=Job)
+def log_job_deleted(sender, instance, **kwargs):
+    record_job_event(instance, deleted=True)
+
+
+@receiver([post_save, post_delete], sender=Transcript)
+def log_feed_reset(sender, instance, **kwargs):
+    profile = sender._meta.get_field('profile').get_cached_value(instance, default=None)
+    if profile is not None:
+        user_id = profile.user_id
+    else:
+        user_id = FacultyProfile.objects.filter(pk=instance.profile_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        record_feed_reset(user_id)
+
+
+@receiver(post_save, sender=Job)
+def notify_job_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_job_created(instance)
+        return
+    old_status = getattr(instance, '_previous_status', None)
+    if old_status is not None and old_status != instance.status:
+        publish_status_changed(instance, old_status)
@@ -0,0 +1,158 @@
+# jobs/sync.py
+"""
+Delta sync for the job and saved-job lists.
+
+Every job create/update/delete (jobs/signals.py) and every save/unsave
+(recorded explicitly by the views, including the bulk endpoint) appends a
+SyncEvent whose ``seq`` is the sync cursor. Clients call the list endpoint
+with ``?since=0`` once to get a full snapshot and a cursor, then
+``?since=<cursor>`` to get only what changed:
+
+    {"cursor": 1234, "changed": [...], "deleted": [ids]}
+
+``deleted`` holds tombstones: job ids that were deleted or no longer appear
+in the caller's list (closed, moved department, unsaved). Job events carry
+the job's department, so a faculty member only hears about jobs in (or just
+moved out of) their own departments. When their departments themselves
+change (a transcript or its courses were written), a ``feed_reset`` event
+makes their next job-list sync answer 410 like an expired cursor, and the
+client starts over with ``?since=0``.
+
+Sequence values are handed out at insert time but become visible at commit,
+so a fresh event can still appear behind a higher one. The returned cursor
+therefore never passes events younger than SYNC_SAFETY_WINDOW seconds; those
+are sent again on the next sync, which clients apply idempotently. Jobs
+dropping out of the faculty feed because their deadline passed produce no
+event; clients hide past-deadline jobs themselves.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q, Subquery
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import SyncEvent
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Sync cursor has expired; sync again with since=0.'
+    default_code = 'cursor_expired'
+
+
+class FeedReset(CursorExpired):
+    default_detail = 'Your departments changed; sync again with since=0.'
+    default_code = 'feed_reset'
+
+
+def parse_since(request):
+    """The ``since`` cursor of a list request, or None for a plain listing."""
+    since = request.query_params.get('since')
+    if since is None:
+        return None
+    try:
+        since = int(since)
+    except ValueError:
+        since = -1
+    if since < 0:
+        raise ValidationError({'since': 'Expected a non-negative integer cursor.'})
+    return since
+
+
+def sync_cursor(since):
+    """
+    Cursor to hand back for a sync starting at ``since``: the highest seq
+    older than the safety window. Read before the data, so anything changing
+    meanwhile is sent again next time. Raises CursorExpired if events after
+    ``since`` have been pruned (see prune_sync_events).
+    """
+    horizon = timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_SAFETY_WINDOW', 30))
+    settled = SyncEvent.objects.filter(created_at__lt=horizon).order_by('-seq').values('seq')[:1]
+    # Oldest retained seq and the settled cursor in one query
+    oldest, cursor = (
+        SyncEvent.objects.order_by('seq').annotate(cursor=Subquery(settled))
+        .values_list('seq', 'cursor').first()
+    ) or (None, None)
+    # Pruning always keeps the newest event, so an empty log means it was wiped
+    if since and (oldest is None or since < oldest - 1):
+        raise CursorExpired()
+    return max(since, cursor or 0)
+
+
+# -----------------------
+# Recording
+# -----------------------
+def record_job_event(job, deleted=False, previous_department=None):
+    """One event for the job's department and, if it moved, one for the department it left."""
+    departments = [job.department]
+    if previous_department and previous_department != job.department:
+        departments.append(previous_department)
+    SyncEvent.objects.bulk_create([
+        SyncEvent(kind='job', object_id=job.pk, user_id=job.posted_by_id, department=department, deleted=deleted)
+        for department in departments
+    ])
+
+
+def record_feed_reset(faculty_id):
+    SyncEvent.objects.create(kind='feed_reset', object_id=faculty_id, user_id=faculty_id)
+
+
+def record_saved_job_events(faculty_id, saved=(), unsaved=()):
+    """One event per job saved or unsaved by ``faculty_id``, in a single INSERT."""
+    events = [SyncEvent(kind='saved_job', object_id=jid, user_id=faculty_id) for jid in sorted(saved)]
+    events += [SyncEvent(kind='saved_job', object_id=jid, user_id=faculty_id, deleted=True) for jid in sorted(unsaved)]
+    if events:
+        SyncEvent.objects.bulk_create(events)
+
+
+# -----------------------
+# Reading
+# -----------------------
+def job_changes(since, owner_id=None):
+    """Ids of jobs changed after ``since`` (only ``owner_id``'s jobs, if given)."""
+    events = SyncEvent.objects.filter(kind='job', seq__gt=since)
+    if owner_id is not None:
+        events = events.filter(user_id=owner_id)
+    return set(events.values_list('object_id', flat=True))
+
+
+def feed_job_changes(since, faculty_id, departments):
+    """
+    Ids of jobs in ``departments`` changed after ``since``, read in one query
+    with the faculty's feed resets. Raises FeedReset if there is one.
+    """
+    events = SyncEvent.objects.filter(
+        Q(kind='job', department__in=departments) | Q(kind='feed_reset', user_id=faculty_id), seq__gt=since,
+    ).values_list('kind', 'object_id')
+    ids = set()
+    for kind, object_id in events:
+        if kind == 'feed_reset':
+            raise FeedReset()
+        ids.add(object_id)
+    return ids
+
+
+def saved_job_changes(since, faculty_id):
+    """
+    (saved/unsaved job ids, edited job ids, deleted job ids) after ``since``
+    for ``faculty_id``'s saved list, read in one query. Edited and deleted
+    jobs are global; the caller intersects them with what is saved.
+    """
+    events = SyncEvent.objects.filter(
+        Q(kind='saved_job', user_id=faculty_id) | Q(kind='job'), seq__gt=since,
+    ).values_list('kind', 'object_id', 'deleted')
+    touched, edited, gone = set(), set(), set()
+    for kind, object_id, deleted in events:
+        if kind == 'saved_job':
+            touched.add(object_id)
+        elif deleted:
+            gone.add(object_id)
+        else:
+            edited.add(object_id)
+    return touched, edited, gone
+
+
+def delta_payload(cursor, changed, deleted):
+    return {'cursor': cursor, 'changed': changed, 'deleted': sorted(deleted)}
@@ -1,3 +1,250 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myjobs_backend.query_budget import QueryBudgetTestMixin
+from users.models import Course, Department, FacultyProfile, RecruiterProfile, Transcript
+from .feed import build_feed
+from .models import Job, SavedJob, SyncEvent
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'myjobs_backend.cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {'LOCAL_TIMEOUT': 0},
+    },
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'jobs-tests'},
+}
+
+
+def auth(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+def make_job(recruiter, title='Lecturer', department='Computer Science', **fields):
+    return Job.objects.create(
+        title=title, department=department, description='Teach', location='Remote', course='CS',
+        eligibility='PhD', skills_required='Python', deadline=timezone.now().date() + timedelta(days=30),
+        posted_by=recruiter, **fields,
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SYNC_SAFETY_WINDOW=0)
+class JobsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science')
+        cls.recruiter = User.objects.create_user(email='recruiter@example.com', password='pw', is_recruiter=True)
+        RecruiterProfile.objects.create(user=cls.recruiter, first_name='Grace', last_name='Hopper')
+        cls.faculty = User.objects.create_user(email='faculty@example.com', password='pw', is_faculty=True)
+        profile = FacultyProfile.objects.create(user=cls.faculty, first_name='Ada', last_name='Lovelace')
+        transcript = Transcript.objects.create(profile=profile, degree='PhD', college='State', department=department)
+        Course.objects.create(transcript=transcript, name='Algorithms', department=department)
+        cls.job = make_job(cls.recruiter)
+        cls.other_job = make_job(cls.recruiter, title='Professor')
+
+    def setUp(self):
+        for alias in ('default', 'shared'):
+            caches[alias].clear()
+
+
+class ViewQueryBudgetTests(QueryBudgetTestMixin, JobsTestCase):
+    def test_job_list(self):
+        for user in (self.recruiter, self.faculty):
+            with self.subTest(user.email):
+                response = self.assertWithinQueryBudget(self.client, reverse('job-list-create'), **auth(user))
+                self.assertEqual(len(response.data), 2)
+
+    def test_job_list_delta(self):
+        url = reverse('job-list-create') + '?since=0'
+        response = self.assertWithinQueryBudget(self.client, url, **auth(self.faculty))
+        self.assertEqual(len(response.data['changed']), 2)
+
+    def test_job_detail(self):
+        url = reverse('job-detail', args=[self.job.pk])
+        response = self.assertWithinQueryBudget(self.client, url, **auth(self.faculty))
+        self.assertEqual(response.data['title'], 'Lecturer')
+
+    def test_my_jobs(self):
+        response = self.assertWithinQueryBudget(self.client, reverse('my-jobs'), **auth(self.recruiter))
+        self.assertEqual(len(response.data), 2)
+
+    def test_job_statistics(self):
+        response = self.assertWithinQueryBudget(self.client, reverse('job-statistics'), **auth(self.recruiter))
+        self.assertEqual(response.data['open_jobs'], 2)
+
+    def test_saved_jobs(self):
+        SavedJob.objects.create(faculty=self.faculty, job=self.job)
+        for query in ('', '?since=0'):
+            with self.subTest(query):
+                self.assertWithinQueryBudget(self.client, reverse('saved-jobs') + query, **auth(self.faculty))
+
+    def test_bulk_save_jobs(self):
+        SavedJob.objects.create(faculty=self.faculty, job=self.other_job)
+        data = {'save': [self.job.pk, 999999], 'unsave': [self.other_job.pk]}
+        response = self.assertWithinQueryBudget(
+            self.client, reverse('bulk-save-jobs'), 'post', data,
+            content_type='application/json', **auth(self.faculty),
+        )
+        self.assertEqual(response.data['saved'], {
+            str(self.job.pk): True, str(self.other_job.pk): False, '999999': False,
+        })
+        self.assertEqual(response.data['invalid'], [999999])
+
+    def test_is_job_saved(self):
+        url = reverse('is-job-saved', args=[self.job.pk])
+        response = self.assertWithinQueryBudget(self.client, url, **auth(self.faculty))
+        self.assertFalse(response.data['is_saved'])
+
+
+class FacultyFeedTests(JobsTestCase):
+    def feed(self, user=None):
+        response = self.client.get(reverse('job-list-create'), **auth(user or self.faculty))
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(job['title'] for job in response.data)
+
+    def add_faculty(self, email, department):
+        user = User.objects.create_user(email=email, password='pw', is_faculty=True)
+        profile = FacultyProfile.objects.create(user=user, first_name='Alan', last_name='Turing')
+        department, _ = Department.objects.get_or_create(name=department)
+        Transcript.objects.create(profile=profile, degree='PhD', college='State', department=department)
+        return user
+
+    def test_faculty_with_the_same_departments_share_one_build(self):
+        colleague = self.add_faculty('colleague@example.com', 'Computer Science')
+        with mock.patch('jobs.feed.build_feed', wraps=build_feed) as build:
+            self.assertEqual(self.feed(), ['Lecturer', 'Professor'])
+            self.assertEqual(self.feed(colleague), ['Lecturer', 'Professor'])
+        self.assertEqual(build.call_count, 1)
+
+    def test_job_changes_rebuild_the_feeds_of_their_departments(self):
+        historian = self.add_faculty('historian@example.com', 'History')
+        self.assertEqual((self.feed(), self.feed(historian)), (['Lecturer', 'Professor'], []))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Senior Lecturer'
+            self.job.save()
+        self.assertEqual(self.feed(), ['Professor', 'Senior Lecturer'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_job.department = 'History'
+            self.other_job.save()
+        self.assertEqual((self.feed(), self.feed(historian)), (['Senior Lecturer'], ['Professor']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_job.status = 'closed'
+            self.other_job.save()
+        self.assertEqual(self.feed(historian), [])
+
+    def test_faculty_department_change_switches_feeds(self):
+        history_job = make_job(self.recruiter, title='Historian', department='History')
+        self.assertEqual(self.feed(), ['Lecturer', 'Professor'])
+        Transcript.objects.create(
+            profile=self.faculty.facultyprofile, degree='MA', college='State',
+            department=Department.objects.create(name='History'),
+        )
+        self.assertEqual(self.feed(), ['Historian', 'Lecturer', 'Professor'])
+        history_job.delete()
+        Transcript.objects.filter(profile=self.faculty.facultyprofile, degree='PhD').delete()
+        self.assertEqual(self.feed(), [])
+
+
+class DeltaSyncTests(JobsTestCase):
+    def sync(self, url_name, user, since):
+        response = self.client.get(reverse(url_name) + f'?since={since}', **auth(user))
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_job_changes_and_tombstones(self):
+        cursor = self.sync('job-list-create', self.faculty, 0)['cursor']
+        self.assertEqual(self.sync('job-list-create', self.faculty, cursor)['changed'], [])
+
+        self.job.title = 'Senior Lecturer'
+        self.job.save()
+        make_job(self.recruiter, department='History')  # not in the faculty's feed, so no tombstone
+        moved = make_job(self.recruiter, title='Dean')
+        moved.department = 'History'
+        moved.save()
+        deleted_id = self.other_job.pk
+        self.other_job.delete()
+
+        delta = self.sync('job-list-create', self.faculty, cursor)
+        self.assertEqual([j['title'] for j in delta['changed']], ['Senior Lecturer'])
+        self.assertEqual(delta['deleted'], sorted([moved.pk, deleted_id]))
+        self.assertEqual(self.sync('job-list-create', self.faculty, delta['cursor'])['changed'], [])
+
+    def test_department_change_resets_the_feed(self):
+        cursor = self.sync('job-list-create', self.faculty, 0)['cursor']
+        history = make_job(self.recruiter, department='History')
+        Transcript.objects.create(
+            profile=self.faculty.facultyprofile, degree='MA', college='State',
+            department=Department.objects.create(name='History'),
+        )
+
+        response = self.client.get(reverse('job-list-create') + f'?since={cursor}', **auth(self.faculty))
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.data['detail'].code, 'feed_reset')
+        snapshot = self.sync('job-list-create', self.faculty, 0)
+        self.assertIn(history.pk, [j['id'] for j in snapshot['changed']])
+        # Other faculty keep their cursor
+        other = User.objects.create_user(email='other-faculty@example.com', password='pw', is_faculty=True)
+        profile = FacultyProfile.objects.create(user=other, first_name='Alan', last_name='Turing')
+        Transcript.objects.create(
+            profile=profile, degree='PhD', college='State', department=Department.objects.get(name='Computer Science'),
+        )
+        other_cursor = self.sync('job-list-create', other, 0)['cursor']
+        make_job(self.recruiter, department='History')
+        Transcript.objects.filter(profile=self.faculty.facultyprofile, degree='MA').delete()
+        self.assertEqual(self.sync('job-list-create', other, other_cursor)['deleted'], [])
+
+    def test_recruiter_sees_only_own_changes(self):
+        other = User.objects.create_user(email='other@example.com', password='pw', is_recruiter=True)
+        cursor = self.sync('job-list-create', self.recruiter, 0)['cursor']
+        make_job(other)
+        delta = self.sync('job-list-create', self.recruiter, cursor)
+        self.assertEqual((delta['changed'], delta['deleted']), ([], []))
+
+    def test_saved_job_changes(self):
+        cursor = self.sync('saved-jobs', self.faculty, 0)['cursor']
+        self.client.post(reverse('bulk-save-jobs'), {'save': [self.job.pk, self.other_job.pk]},
+                         content_type='application/json', **auth(self.faculty))
+        delta = self.sync('saved-jobs', self.faculty, cursor)
+        self.assertEqual(sorted(s['job'] for s in delta['changed']), sorted([self.job.pk, self.other_job.pk]))
+
+        cursor = delta['cursor']
+        deleted_id = self.other_job.pk
+        self.client.delete(reverse('unsave-job', args=[self.job.pk]), **auth(self.faculty))
+        self.other_job.delete()  # its SavedJob goes with it
+        delta = self.sync('saved-jobs', self.faculty, cursor)
+        self.assertEqual(delta['changed'], [])
+        self.assertEqual(delta['deleted'], sorted([self.job.pk, deleted_id]))
+
+    def test_pruned_cursor_expires(self):
+        cursor = self.sync('job-list-create', self.faculty, 0)['cursor']
+        make_job(self.recruiter, title='Dean')
+        make_job(self.recruiter, title='Provost')
+        SyncEvent.objects.update(created_at=timezone.now() - timedelta(days=60))
+
+        call_command('prune_sync_events', days=30, stdout=StringIO())
+        # The newest event survives, so a cursor at the head is still valid
+        self.assertEqual(SyncEvent.objects.count(), 1)
+        head = SyncEvent.objects.get().seq
+        self.assertEqual(self.sync('job-list-create', self.faculty, head)['changed'], [])
+
+        response = self.client.get(reverse('job-list-create') + f'?since={cursor}', **auth(self.faculty))
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.sync('job-list-create', self.faculty, 0)['cursor'], head)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('job-list-create') + '?since=-1', **auth(self.faculty))
+        self.assertEqual(response.status_code, 400)
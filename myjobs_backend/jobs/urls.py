@@ -2,8 +2,9 @@ from django.urls import path
 from .views import (
     JobListCreateView, JobDetailView, update_job_status, 
     my_jobs, job_statistics, JobApplicationListCreateView,
-    SavedJobListCreateView, unsave_job, is_job_saved
+    SavedJobListCreateView, unsave_job, is_job_saved, bulk_save_jobs
 )
+from .views_events import job_events
 
 urlpatterns = [
     # Job CRUD endpoints
@@ -19,8 +20,12 @@ urlpatterns = [
     
     # Saved jobs endpoints
     path('saved/', SavedJobListCreateView.as_view(), name='saved-jobs'),
+    path('saved/bulk/', bulk_save_jobs, name='bulk-save-jobs'),
     path('saved/<int:job_id>/', unsave_job, name='unsave-job'),
     path('<int:job_id>/is-saved/', is_job_saved, name='is-job-saved'),
+
+    # Live notifications (SSE, ASGI only)
+    path('events/', job_events, name='job-events'),
     
     # Future: Job applications
     path('<int:job_id>/applications/', JobApplicationListCreateView.as_view(), name='job-applications'),
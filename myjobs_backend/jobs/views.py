@@ -3,13 +3,23 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Count
 
+from myjobs_backend.cache import get_or_build, namespaced_key
+from myjobs_backend.db_router import on_primary, replica_reads
+from myjobs_backend.query_budget import QueryBudget, query_budget
+
+from .feed import faculty_departments, faculty_feed
 from .models import Job, JobApplication, JobStatusHistory, SavedJob
+from .sync import (
+    delta_payload, feed_job_changes, job_changes, parse_since, record_saved_job_events, saved_job_changes,
+    sync_cursor,
+)
 from .serializers import (
     JobSerializer, JobCreateSerializer, JobUpdateSerializer, 
     JobStatusUpdateSerializer, JobApplicationSerializer, 
-    JobStatusHistorySerializer, SavedJobSerializer
+    JobStatusHistorySerializer, SavedJobSerializer, BulkSavedJobSerializer
 )
 
 class IsRecruiterOrReadOnly(permissions.BasePermission):
@@ -39,30 +49,13 @@ class JobListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = JobSerializer
     permission_classes = [IsRecruiterOrReadOnly]
+    query_budget = QueryBudget(7)
     
     def get_faculty_departments(self, faculty_user):
         """
         Get all departments associated with a faculty user from their transcripts and courses
         """
-        try:
-            faculty_profile = faculty_user.facultyprofile
-            departments = set()
-            
-            # Get departments from transcripts
-            transcript_depts = faculty_profile.transcripts_list.filter(
-                department__isnull=False
-            ).values_list('department__name', flat=True)
-            departments.update(transcript_depts)
-            
-            # Get departments from courses
-            course_depts = faculty_profile.transcripts_list.filter(
-                courses__department__isnull=False
-            ).values_list('courses__department__name', flat=True)
-            departments.update(course_depts)
-            
-            return list(departments)
-        except:
-            return []
+        return faculty_departments(faculty_user)
 
     def get_queryset(self):
         """
@@ -77,7 +70,7 @@ class JobListCreateView(generics.ListCreateAPIView):
         
         if user.is_recruiter:
             # Recruiters see only their own jobs
-            return Job.objects.filter(posted_by=user)
+            return Job.objects.filter(posted_by=user).select_related('posted_by__recruiterprofile')
         elif user.is_faculty:
             # Faculty see only jobs matching their departments
             faculty_departments = self.get_faculty_departments(user)
@@ -91,13 +84,50 @@ class JobListCreateView(generics.ListCreateAPIView):
                 Q(department__in=faculty_departments) &
                 Q(status='open') & 
                 Q(deadline__gte=timezone.now().date())
-            )
+            ).select_related('posted_by__recruiterprofile')
         else:
             # Default: show all active jobs
             return Job.objects.filter(
                 Q(status='open') & Q(deadline__gte=timezone.now().date())
-            )
+            ).select_related('posted_by__recruiterprofile')
     
+    def list(self, request, *args, **kwargs):
+        """
+        Faculty get the department feed shared by everyone with the same
+        departments. With ?since=<cursor> only changes are returned (see
+        jobs/sync.py).
+        """
+        since = parse_since(request)
+        if since is not None:
+            return self.delta(request, since)
+        user = request.user
+        if user.is_authenticated and not user.is_recruiter and user.is_faculty:
+            faculty_departments = self.get_faculty_departments(user)
+            if not faculty_departments:
+                return Response([])
+            return Response(faculty_feed(faculty_departments, request))
+        return super().list(request, *args, **kwargs)
+
+    def delta(self, request, since):
+        cursor = sync_cursor(since)
+        user = request.user
+        faculty_feed_user = not user.is_recruiter and user.is_faculty
+        if since == 0:
+            if faculty_feed_user:
+                departments = self.get_faculty_departments(user)
+                changed = faculty_feed(departments, request) if departments else []
+            else:
+                changed = self.get_serializer(self.get_queryset(), many=True).data
+            return Response(delta_payload(cursor, changed, ()))
+
+        if faculty_feed_user:
+            ids = feed_job_changes(since, user.id, self.get_faculty_departments(user))
+        else:
+            ids = job_changes(since, owner_id=user.id if user.is_recruiter else None)
+        jobs = list(self.get_queryset().filter(id__in=ids)) if ids else []
+        changed = self.get_serializer(jobs, many=True).data
+        return Response(delta_payload(cursor, changed, ids - {job.id for job in jobs}))
+
     def get_serializer_class(self):
         """Use different serializers for create vs list"""
         if self.request.method == 'POST':
@@ -116,6 +146,7 @@ class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     serializer_class = JobSerializer
     permission_classes = [IsRecruiterOrReadOnly]
+    query_budget = QueryBudget(2)
     
     def get_queryset(self):
         """Filter jobs based on user type"""
@@ -125,10 +156,10 @@ class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         if user.is_recruiter:
             # Recruiters can access their own jobs
-            return Job.objects.filter(posted_by=user)
+            return Job.objects.filter(posted_by=user).select_related('posted_by__recruiterprofile')
         else:
             # Others can access all jobs
-            return Job.objects.all()
+            return Job.objects.select_related('posted_by__recruiterprofile')
     
     def get_serializer_class(self):
         """Use different serializers for update vs retrieve"""
@@ -178,6 +209,7 @@ def update_job_status(request, job_id):
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def my_jobs(request):
@@ -190,7 +222,7 @@ def my_jobs(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    jobs = Job.objects.filter(posted_by=request.user)
+    jobs = Job.objects.filter(posted_by=request.user).select_related('posted_by__recruiterprofile')
     
     # Filter by status if provided
     status_filter = request.GET.get('status')
@@ -200,8 +232,10 @@ def my_jobs(request):
     serializer = JobSerializer(jobs, many=True)
     return Response(serializer.data)
 
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@replica_reads
 def job_statistics(request):
     """
     Get job statistics for the current recruiter
@@ -212,22 +246,26 @@ def job_statistics(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    jobs = Job.objects.filter(posted_by=request.user)
+    today = timezone.now().date()
+    recruiter_id = request.user.id
     
-    stats = {
-        'total_jobs': jobs.count(),
-        'open_jobs': jobs.filter(status='open').count(),
-        'paused_jobs': jobs.filter(status='paused').count(),
-        'closed_jobs': jobs.filter(status='closed').count(),
-        'active_jobs': jobs.filter(
-            status='open', 
-            deadline__gte=timezone.now().date()
-        ).count(),
-        'expired_jobs': jobs.filter(
-            status='open', 
-            deadline__lt=timezone.now().date()
-        ).count(),
-    }
+    # All counters in a single aggregate query, cached until one of the
+    # recruiter's jobs changes (see jobs/signals.py) or the day rolls over.
+    # Built on the primary so a rebuild right after that change isn't cached
+    # from a lagging replica.
+    stats = get_or_build(
+        namespaced_key(f'job-stats:{recruiter_id}', today.isoformat()),
+        on_primary(lambda: Job.objects.filter(posted_by_id=recruiter_id).aggregate(
+            total_jobs=Count('id'),
+            open_jobs=Count('id', filter=Q(status='open')),
+            paused_jobs=Count('id', filter=Q(status='paused')),
+            closed_jobs=Count('id', filter=Q(status='closed')),
+            active_jobs=Count('id', filter=Q(status='open', deadline__gte=today)),
+            expired_jobs=Count('id', filter=Q(status='open', deadline__lt=today)),
+        )),
+        timeout=300,
+        stale_timeout=60,
+    )
     
     return Response(stats)
 
@@ -259,14 +297,32 @@ class SavedJobListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = SavedJobSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = QueryBudget(4)
     
     def get_queryset(self):
         """Only return saved jobs for the current user"""
-        return SavedJob.objects.filter(faculty=self.request.user)
+        return SavedJob.objects.filter(faculty=self.request.user).select_related('job')
+
+    def list(self, request, *args, **kwargs):
+        """With ?since=<cursor> only changes are returned, tombstones by job id"""
+        since = parse_since(request)
+        if since is None:
+            return super().list(request, *args, **kwargs)
+        cursor = sync_cursor(since)
+        if since == 0:
+            changed = self.get_serializer(self.get_queryset(), many=True).data
+            return Response(delta_payload(cursor, changed, ()))
+
+        touched, edited, gone = saved_job_changes(since, request.user.id)
+        saved = list(self.get_queryset().filter(job_id__in=touched | edited)) if touched or edited else []
+        changed = self.get_serializer(saved, many=True).data
+        return Response(delta_payload(cursor, changed, (touched | gone) - {s.job_id for s in saved}))
     
     def perform_create(self, serializer):
         """Set the faculty to the current user"""
-        serializer.save(faculty=self.request.user)
+        with transaction.atomic():
+            saved = serializer.save(faculty=self.request.user)
+            record_saved_job_events(saved.faculty_id, saved=[saved.job_id])
 
 @api_view(['DELETE'])
 @permission_classes([permissions.IsAuthenticated])
@@ -279,7 +335,9 @@ def unsave_job(request, job_id):
             faculty=request.user,
             job_id=job_id
         )
-        saved_job.delete()
+        with transaction.atomic():
+            saved_job.delete()
+            record_saved_job_events(request.user.id, unsaved=[job_id])
         return Response({'message': 'Job removed from saved jobs'}, status=status.HTTP_200_OK)
     except SavedJob.DoesNotExist:
         return Response(
@@ -287,6 +345,45 @@ def unsave_job(request, job_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+@query_budget(6, methods=('POST',))
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_save_jobs(request):
+    """
+    Save and/or unsave many jobs in one request:
+        {"save": [job ids], "unsave": [job ids]}
+    Already-saved jobs are skipped (ON CONFLICT DO NOTHING) and all unsaves
+    run as one DELETE. Returns the resulting {id: is_saved} map for every
+    requested id, plus ids of jobs that don't exist.
+    """
+    serializer = BulkSavedJobSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    save_ids = set(serializer.validated_data['save'])
+    unsave_ids = set(serializer.validated_data['unsave'])
+
+    with transaction.atomic():
+        if save_ids:
+            valid_ids = set(Job.objects.filter(id__in=save_ids).values_list('id', flat=True))
+            SavedJob.objects.bulk_create(
+                [SavedJob(faculty=request.user, job_id=jid) for jid in valid_ids],
+                ignore_conflicts=True,
+            )
+        else:
+            valid_ids = set()
+        if unsave_ids:
+            SavedJob.objects.filter(faculty=request.user, job_id__in=unsave_ids).delete()
+        record_saved_job_events(request.user.id, saved=valid_ids, unsaved=unsave_ids)
+
+    requested = save_ids | unsave_ids
+    saved = set(
+        SavedJob.objects.filter(faculty=request.user, job_id__in=requested).values_list('job_id', flat=True)
+    )
+    return Response({
+        'saved': {str(jid): jid in saved for jid in sorted(requested)},
+        'invalid': sorted(save_ids - valid_ids),
+    }, status=status.HTTP_200_OK)
+
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def is_job_saved(request, job_id):
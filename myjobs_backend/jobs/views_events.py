@@ -0,0 +1,85 @@
+# jobs/views_events.py
+"""
+GET /api/jobs/events/ -- Server-Sent Events stream for faculty, replacing
+polling of the job list: ``job.created`` for new open jobs in the faculty's
+departments and ``job.status`` for status changes of their saved jobs (see
+jobs/events.py).
+
+The stream holds its connection open, so it is only served under ASGI
+(``uvicorn myjobs_backend.asgi:application``), where it costs a coroutine
+rather than a worker. EventSource can't send headers, so the access token may
+be given as ``?token=``. The stream ends when the token expires or after
+SSE_MAX_DURATION seconds; the browser then reconnects with a fresh token and
+should catch up with a ``?since=`` delta sync of the job lists.
+"""
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
+
+from myjobs_backend.async_views import jwt_authenticate
+from myjobs_backend.pubsub import subscribe
+from .events import faculty_channels
+from .feed import faculty_departments
+
+
+def stream_setup(request):
+    """Authenticate and work out the channels; the only DB work of a stream."""
+    try:
+        user, token = jwt_authenticate(request, allow_query_token=True)
+        if user is None or not user.is_faculty:
+            return user, token, None
+        return user, token, faculty_channels(user, faculty_departments(user))
+    finally:
+        # Don't keep a connection checked out for the life of the stream
+        connection.close()
+
+
+def format_event(event, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {event}', f'data: {json.dumps(data, separators=(",", ":"), default=str)}']
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(channels, expires_at):
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15)
+    with subscribe(channels) as subscription:
+        yield 'retry: 5000\n\n'
+        sent = 0
+        while True:
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                yield format_event('reconnect', {'reason': 'expired'})
+                return
+            message = await subscription.get(min(heartbeat, remaining))
+            if subscription.overflowed:
+                yield format_event('resync', {'reason': 'overflow'})
+                return
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            sent += 1
+            yield format_event(message['type'], message, sent)
+
+
+async def job_events(request):
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'The event stream is only served over ASGI.'}, status=501)
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+    user, token, channels = await sync_to_async(stream_setup)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+    if channels is None:
+        return JsonResponse({'detail': 'Only faculty can subscribe to job events.'}, status=403)
+
+    expires_at = min(token['exp'], time.time() + getattr(settings, 'SSE_MAX_DURATION', 3600))
+    response = StreamingHttpResponse(event_stream(channels, expires_at), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
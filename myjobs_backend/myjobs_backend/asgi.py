@@ -2,6 +2,9 @@
 ASGI config for myjobs_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The live job event stream (/api/jobs/events/) needs it:
+
+    uvicorn myjobs_backend.asgi:application --workers 4
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -0,0 +1,102 @@
+"""
+Helpers for plain Django async views (DRF views are sync-only).
+
+Django's async ORM methods all run on one shared thread per request, so they
+don't overlap. ``gather_db()`` instead runs each sync callable on a worker
+thread with its own connection (``thread_sensitive=False``), so independent
+queries of one request really do run at the same time. Workers reuse their
+connection within CONN_MAX_AGE, or take one from the pool when DB_POOL is on,
+exactly like request threads do.
+
+``authenticate()`` does the JWT check DRF would do, and ``api_response()``
+renders with the configured DRF renderers (orjson, camelCase, msgpack) and the
+same Accept / ?format= negotiation.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed, NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+
+def _in_worker(func):
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return run
+
+
+async def db_call(func, *args, **kwargs):
+    """Run sync ``func`` (ORM work) on a worker thread."""
+    return await sync_to_async(_in_worker(func), thread_sensitive=False)(*args, **kwargs)
+
+
+async def gather_db(*funcs):
+    """Run zero-argument sync callables concurrently; results in the same order."""
+    return await asyncio.gather(*(db_call(func) for func in funcs))
+
+
+# -----------------------
+# Authentication
+# -----------------------
+def jwt_authenticate(request, allow_query_token=False):
+    """
+    (user, validated token) from the Authorization header (or ``?token=`` when
+    allowed), or (None, None). Sync: does one DB lookup for the user.
+    """
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    if header:
+        raw = auth.get_raw_token(header)
+    else:
+        raw = request.GET.get('token', '').encode() if allow_query_token else None
+    if not raw:
+        return None, None
+    try:
+        token = auth.get_validated_token(raw)
+        return auth.get_user(token), token
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None, None
+
+
+async def authenticate(request):
+    # Sub-requests of /api/batch/ arrive already authenticated
+    forced = getattr(request, '_force_auth_user', None)
+    if forced is not None:
+        return forced
+    user, _ = await db_call(jwt_authenticate, request)
+    return user
+
+
+# -----------------------
+# Rendering
+# -----------------------
+def _renderers():
+    # The browsable API needs a DRF view to render into.
+    return [cls() for cls in api_settings.DEFAULT_RENDERER_CLASSES if cls.format != 'api']
+
+
+def api_response(request, data, status=200):
+    """HttpResponse rendered like a DRF Response for ``request``."""
+    renderers = _renderers()
+    try:
+        renderer, media_type = DefaultContentNegotiation().select_renderer(Request(request), renderers)
+    except NotAcceptable:
+        renderer, media_type = renderers[0], renderers[0].media_type
+    content_type = media_type
+    if renderer.charset:
+        content_type = f'{media_type}; charset={renderer.charset}'
+    return HttpResponse(renderer.render(data, media_type, {}), status=status, content_type=content_type)
+
+
+def error_response(request, detail, status):
+    return api_response(request, {'detail': detail}, status)
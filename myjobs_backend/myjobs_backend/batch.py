@@ -0,0 +1,189 @@
+"""
+Composite GET endpoint for dashboards.
+
+    POST /api/batch/
+    {"requests": ["/api/jobs/statistics/", {"id": "degrees", "path": "/api/degrees/"}]}
+
+    200 {"responses": [{"id": ..., "path": ..., "status": 200, "body": ...}, ...]}
+
+The batch request is authenticated once; every sub-request is resolved
+against the project URLconf and dispatched in process as the same user,
+skipping the middleware stack and JWT decoding. Sub-requests run on a
+process-wide thread pool of BATCH_MAX_WORKERS threads (each keeping its own DB
+connection) and responses come back in request order. Only GETs of API
+paths (ALLOWED_PREFIXES) are allowed, so e.g. the admin is out of reach, and
+a batch holds at most BATCH_MAX_REQUESTS entries.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = '/api/batch/'
+
+# Sub-requests skip the middleware stack (CSRF, sessions, ...), so only the
+# API, whose views do their own DRF authentication and permission checks, is
+# reachable through a batch.
+ALLOWED_PREFIXES = ('/api/',)
+
+# Request headers passed on to sub-requests; credentials are not, the
+# sub-request is authenticated as the batch's user instead.
+FORWARDED_META = (
+    'SERVER_NAME', 'SERVER_PORT', 'REMOTE_ADDR', 'HTTP_HOST', 'HTTP_ACCEPT_LANGUAGE',
+    'HTTP_X_FORWARDED_FOR', 'HTTP_X_FORWARDED_PROTO', 'HTTP_X_REQUEST_ID', 'wsgi.url_scheme',
+)
+
+
+def parse_batch(data):
+    """[(id, path, query_string)] from the request body, or ValidationError."""
+    entries = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValidationError({'requests': 'Expected a non-empty list of GET paths.'})
+    limit = getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+    if len(entries) > limit:
+        raise ValidationError({'requests': f'At most {limit} requests per batch.'})
+
+    parsed = []
+    for index, entry in enumerate(entries):
+        if isinstance(entry, dict):
+            entry_id, url = entry.get('id', index), entry.get('path')
+        else:
+            entry_id, url = index, entry
+        if not isinstance(url, str) or not url.startswith('/') or url.startswith('//'):
+            raise ValidationError({'requests': f'Entry {index}: expected a relative path starting with "/".'})
+        parts = urlsplit(url)
+        segments = parts.path.split('/')
+        if not parts.path.startswith(ALLOWED_PREFIXES) or '.' in segments or '..' in segments:
+            raise ValidationError({'requests': f'Entry {index}: only API paths can be batched.'})
+        if parts.path.rstrip('/') == BATCH_PATH.rstrip('/'):
+            raise ValidationError({'requests': f'Entry {index}: batches cannot be nested.'})
+        parsed.append((entry_id, parts.path, parts.query))
+    return parsed
+
+
+def build_subrequest(request, path, query_string):
+    """A GET HttpRequest for ``path`` that DRF will treat as ``request``'s user."""
+    sub = HttpRequest()
+    sub.method = 'GET'
+    sub.path = sub.path_info = path
+    sub.META = {key: request.META[key] for key in FORWARDED_META if key in request.META}
+    sub.META.update({'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query_string})
+    sub.GET = QueryDict(query_string)
+    sub.COOKIES = {}
+    sub.id = getattr(request, 'id', None)
+    sub.user = request.user
+    # rest_framework.request.Request.__init__ reads these two attributes and,
+    # when set, authenticates with ForcedAuthentication instead of the view's
+    # authentication_classes. They are the hooks APIRequestFactory and
+    # force_authenticate() use in tests; DRF has no public way to hand an
+    # already authenticated user to an in-process request.
+    # BatchDispatchTests.test_subrequest_is_authenticated_as_the_batch_user
+    # guards this against DRF changes.
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def response_body(response):
+    if hasattr(response, 'data'):
+        return response.data
+    if response.streaming:
+        return {'error': 'Streaming responses are not available in a batch.'}
+    content = response.content.decode(response.charset or 'utf-8')
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(content) if content else None
+    return content
+
+
+def dispatch(request, entry):
+    entry_id, path, query_string = entry
+    result = {'id': entry_id, 'path': path}
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {**result, 'status': status.HTTP_404_NOT_FOUND, 'body': {'detail': 'Not found.'}}
+
+    sub = build_subrequest(request, path, query_string)
+    sub.resolver_match = match
+    try:
+        view = match.func
+        if asyncio.iscoroutinefunction(view):
+            view = async_to_sync(view)
+        response = view(sub, *match.args, **match.kwargs)
+        result.update(status=response.status_code, body=response_body(response))
+    except Http404:
+        result.update(status=status.HTTP_404_NOT_FOUND, body={'detail': 'Not found.'})
+    except Exception:
+        logger.exception("Batch sub-request %s failed", path)
+        result.update(status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={'detail': 'Server error.'})
+    registry.inc('batch_subrequests_total', (
+        ('view', match.view_name or match.route), ('status', str(result['status'])),
+    ))
+    return result
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Process-wide pool for sub-requests. Its threads live on, and so do their
+    DB connections, which are recycled per CONN_MAX_AGE like a request's.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BATCH_MAX_WORKERS', 4), thread_name_prefix='batch',
+            )
+        return _executor
+
+
+def _dispatch_in_worker(request, entry):
+    close_old_connections()
+    try:
+        return dispatch(request, entry)
+    finally:
+        close_old_connections()
+
+
+def run_batch(request, entries):
+    """Dispatch every entry; responses are returned in request order."""
+    if len(entries) <= 1 or getattr(settings, 'BATCH_MAX_WORKERS', 4) <= 1:
+        return [dispatch(request, entry) for entry in entries]
+    # Each sub-request runs in a copy of this context, so the request id
+    # (log_utils.request_id_var) and the like carry over
+    pool = get_executor()
+    futures = [
+        pool.submit(contextvars.copy_context().run, _dispatch_in_worker, request, entry) for entry in entries
+    ]
+    return [future.result() for future in futures]
+
+
+class BatchView(APIView):
+    """
+    POST: Run several GET requests in one round trip (see module docstring).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        entries = parse_batch(request.data)
+        return Response({'responses': run_batch(request, entries)})
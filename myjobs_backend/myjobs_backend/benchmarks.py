@@ -0,0 +1,274 @@
+"""
+Endpoint benchmark harness.
+
+Drives the hot API endpoints through the Django test client against whatever
+database is configured (normally one filled by ``manage.py seed_scale``) and
+collects latency percentiles, queries per request and peak memory.
+``load_test()`` instead drives a running server over HTTP (see
+``manage.py benchmark_servers``).
+"""
+import http.client
+import itertools
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import FacultyProfile, MarkedProfile
+
+from .query_budget import check_budget
+from .renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+
+User = get_user_model()
+
+
+@dataclass
+class Endpoint:
+    name: str
+    role: str              # 'recruiter' or 'faculty'
+    url_name: str
+    needs_faculty_id: bool = False
+
+
+# The endpoints the frontend hits on every dashboard / search page load.
+HOT_ENDPOINTS = [
+    Endpoint('faculty_search', 'recruiter', 'recruiter-faculty-search'),
+    Endpoint('faculty_detail', 'recruiter', 'recruiter-faculty-detail', needs_faculty_id=True),
+    Endpoint('marked_profiles', 'recruiter', 'marked-profiles'),
+    Endpoint('recruiter_job_list', 'recruiter', 'job-list-create'),
+    Endpoint('my_jobs', 'recruiter', 'my-jobs'),
+    Endpoint('job_statistics', 'recruiter', 'job-statistics'),
+    Endpoint('faculty_job_list', 'faculty', 'job-list-create'),
+    Endpoint('saved_jobs', 'faculty', 'saved-jobs'),
+    Endpoint('faculty_profile', 'faculty', 'faculty-profile'),
+    Endpoint('faculty_profile_bundle', 'faculty', 'faculty-profile-bundle'),
+    Endpoint('transcripts', 'faculty', 'faculty-transcripts'),
+    Endpoint('colleges', 'faculty', 'colleges-list'),
+    Endpoint('degrees', 'faculty', 'degrees-list'),
+    Endpoint('departments', 'faculty', 'departments-list'),
+]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def pick_users(recruiter_email=None, faculty_email=None):
+    """
+    Choose the accounts to benchmark with: by default the recruiter with the
+    most marked profiles and a faculty member that has transcripts.
+    """
+    if recruiter_email:
+        recruiter = User.objects.get(email=recruiter_email, is_recruiter=True)
+    else:
+        busiest = (
+            MarkedProfile.objects.values('recruiter_id')
+            .annotate(marked=Count('id')).order_by('-marked').first()
+        )
+        recruiter = (
+            User.objects.filter(pk=busiest['recruiter_id']).first() if busiest
+            else User.objects.filter(is_recruiter=True).first()
+        )
+
+    if faculty_email:
+        faculty = User.objects.get(email=faculty_email, is_faculty=True)
+    else:
+        profile = (
+            FacultyProfile.objects.filter(transcripts_list__isnull=False, user__is_faculty=True)
+            .select_related('user').first()
+        )
+        faculty = profile.user if profile else None
+
+    if recruiter is None or faculty is None:
+        raise ValueError('Need at least one recruiter and one faculty with transcripts; run seed_scale first.')
+    return recruiter, faculty
+
+
+def make_client(user):
+    """Test client that authenticates every request with a real JWT."""
+    token = AccessToken.for_user(user)
+    return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+def endpoint_url(endpoint, faculty):
+    if endpoint.needs_faculty_id:
+        return reverse(endpoint.url_name, kwargs={'user_id': faculty.id})
+    return reverse(endpoint.url_name)
+
+
+def measure(client, url, iterations=20, warmup=2):
+    """
+    Time ``iterations`` GETs of ``url``, then make one extra instrumented
+    request to count queries and peak allocated memory. The instrumented run
+    is kept separate so tracing overhead does not skew the latencies.
+    """
+    for _ in range(warmup):
+        client.get(url)
+
+    timings = []
+    response = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    budget = check_budget(resolve(url).func, 'GET', response, [q['sql'] for q in ctx.captured_queries])
+    return {
+        'status': response.status_code,
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': len(ctx.captured_queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'response_bytes': len(content),
+        'query_budget': budget and budget['limit'],
+        'within_budget': budget and budget['ok'],
+    }
+
+
+def renderer_classes():
+    renderers = [JSONRenderer, ORJSONRenderer]
+    if msgpack is not None:
+        renderers.append(MessagePackRenderer)
+    return renderers
+
+
+def compare_renderers(client, url, iterations=20):
+    """
+    Re-render one response's data with each renderer and report the mean
+    serialization time and body size, isolating serializer cost from the
+    rest of the request.
+    """
+    data = getattr(client.get(url), 'data', None)
+    if data is None:
+        return None
+    report = {}
+    for renderer_class in renderer_classes():
+        renderer = renderer_class()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            body = renderer.render(data, renderer_class.media_type, {})
+        report[renderer_class.__name__] = {
+            'mean_ms': round((time.perf_counter() - started) * 1000 / iterations, 3),
+            'bytes': len(body),
+        }
+    return report
+
+
+def run_benchmarks(endpoints=None, iterations=20, warmup=2, recruiter_email=None, faculty_email=None,
+                   renderers=False):
+    """
+    Benchmark each endpoint and return a JSON-serialisable report. With
+    ``renderers`` each endpoint also gets a per-renderer serialization timing.
+    """
+    recruiter, faculty = pick_users(recruiter_email, faculty_email)
+    clients = {'recruiter': make_client(recruiter), 'faculty': make_client(faculty)}
+
+    results = {}
+    for endpoint in endpoints or HOT_ENDPOINTS:
+        url = endpoint_url(endpoint, faculty)
+        results[endpoint.name] = {'url': url, **measure(clients[endpoint.role], url, iterations, warmup)}
+        if renderers:
+            results[endpoint.name]['renderers'] = compare_renderers(clients[endpoint.role], url, iterations)
+
+    return {
+        'recruiter': recruiter.email,
+        'faculty': faculty.email,
+        'dataset': {
+            'faculty': User.objects.filter(is_faculty=True).count(),
+            'recruiters': User.objects.filter(is_recruiter=True).count(),
+        },
+        'endpoints': results,
+    }
+
+
+def load_test(host, port, paths, token, concurrency=16, duration=10.0, rotate=False):
+    """
+    Load ``paths`` on a running server from ``concurrency`` keep-alive
+    connections for ``duration`` seconds; returns throughput and latencies
+    per page load. A page load requests every path in turn (a page that
+    fetches several endpoints), or with ``rotate`` just the next one of them
+    (e.g. a different faculty each time, so that no load hits a warm cache).
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json'}
+    timings, failures = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    counter = itertools.count()
+
+    def page_paths():
+        if rotate:
+            return [paths[next(counter) % len(paths)]]
+        return paths
+
+    def worker():
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        own_timings, own_failures = [], 0
+        try:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                ok = True
+                for path in page_paths():
+                    try:
+                        conn.request('GET', path, headers=headers)
+                        response = conn.getresponse()
+                        response.read()
+                        ok = ok and response.status == 200
+                    except (OSError, http.client.HTTPException):
+                        conn.close()
+                        ok = False
+                if ok:
+                    own_timings.append((time.perf_counter() - started) * 1000)
+                else:
+                    own_failures += 1
+        finally:
+            conn.close()
+            with lock:
+                timings.extend(own_timings)
+                failures.append(own_failures)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    loads = len(timings)
+    return {
+        'requests': loads if rotate else loads * len(paths),
+        'page_loads': loads,
+        'errors': sum(failures),
+        'rps': round(loads / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50), 2) if timings else None,
+        'p95_ms': round(percentile(timings, 95), 2) if timings else None,
+        # Rotated loads came round to a path again: some were cache hits
+        'wrapped': rotate and next(counter) > len(paths),
+    }
@@ -0,0 +1,358 @@
+"""
+Two-tier cache: a small per-process LRU in front of a shared backend.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'myjobs_backend.cache.TwoTierCache',
+            'LOCATION': 'shared',            # alias of the shared backend
+            'OPTIONS': {'MAX_ENTRIES': 1000, 'LOCAL_TIMEOUT': 2},
+        },
+        'shared': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', ...},
+    }
+
+Reads are served from the local tier for at most LOCAL_TIMEOUT seconds (or the
+key's own TTL, if shorter), otherwise from the shared backend, which is the
+source of truth for every gunicorn worker and node. Writes and deletes go to
+both tiers, so the writing worker sees them immediately and other workers
+within LOCAL_TIMEOUT. Anything that must never be stale (sessions, locks)
+should use the shared alias directly.
+
+Bulk invalidation uses versioned namespaces: build keys with
+``namespaced_key(ns, key)`` and call ``bump_namespace(ns)`` to orphan all of
+them at once. ``get_or_build()`` adds single-flight rebuilds and
+stale-while-revalidate on top.
+"""
+import asyncio
+import functools
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches, cache as default_cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import connection
+
+from .metrics import record_cache_access
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Django builds one cache instance per thread; the local tier is shared by
+# all threads of the process, keyed by the shared alias.
+_local_tiers = {}
+_local_tiers_lock = threading.Lock()
+
+
+def _local_tier(name):
+    with _local_tiers_lock:
+        if name not in _local_tiers:
+            _local_tiers[name] = (OrderedDict(), threading.Lock())
+        return _local_tiers[name]
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = location or 'shared'
+        self._local_timeout = float(options.get('LOCAL_TIMEOUT', 2))
+        # made key -> (expires_at, pickled value)
+        self._local, self._lock = _local_tier(self._shared_alias)
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    # -----------------------
+    # Local tier
+    # -----------------------
+    def _local_get(self, made_key):
+        with self._lock:
+            entry = self._local.get(made_key)
+            if entry is None:
+                return _MISSING
+            if entry[0] <= time.monotonic():
+                del self._local[made_key]
+                return _MISSING
+            self._local.move_to_end(made_key)
+        return pickle.loads(entry[1])
+
+    def _local_set(self, made_key, value, timeout):
+        ttl = self._local_timeout
+        if timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._local_delete(made_key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[made_key] = (time.monotonic() + ttl, pickled)
+            self._local.move_to_end(made_key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, made_key):
+        with self._lock:
+            self._local.pop(made_key, None)
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # -----------------------
+    # Cache API
+    # -----------------------
+    def get(self, key, default=None, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        value = self._local_get(made_key)
+        record_cache_access('local', value is not _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        record_cache_access(self._shared_alias, value is not _MISSING)
+        if value is _MISSING:
+            return default
+        # The shared TTL isn't known here, so a copy may outlive it by LOCAL_TIMEOUT.
+        self._local_set(made_key, value, None)
+        return value
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            value = self._local_get(self.make_and_validate_key(key, version=version))
+            record_cache_access('local', value is not _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            for key in missing:
+                record_cache_access(self._shared_alias, key in shared)
+            for key, value in shared.items():
+                self._local_set(self.make_and_validate_key(key, version=version), value, None)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self.shared.set(key, value, timeout=timeout, version=version)
+        self._local_set(made_key, value, self._timeout(timeout))
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout=timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._local_set(self.make_and_validate_key(key, version=version), value, self._timeout(timeout))
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(self.make_and_validate_key(key, version=version), value, self._timeout(timeout))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._local_delete(self.make_and_validate_key(key, version=version))
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        if self._local_get(self.make_and_validate_key(key, version=version)) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+# -----------------------
+# Versioned namespaces
+# -----------------------
+def _namespace_key(namespace):
+    return f'ns:{namespace}'
+
+
+def namespace_version(namespace, cache=None):
+    """Current version of ``namespace`` (created at 1 on first use)."""
+    cache = cache or default_cache
+    version = cache.get(_namespace_key(namespace))
+    if version is None:
+        cache.add(_namespace_key(namespace), 1, timeout=None)
+        version = cache.get(_namespace_key(namespace), 1)
+    return version
+
+
+def namespace_versions(namespaces, cache=None):
+    """``namespace_version()`` for several namespaces with one get_many."""
+    cache = cache or default_cache
+    keys = {_namespace_key(ns): ns for ns in namespaces}
+    found = cache.get_many(list(keys))
+    versions = {keys[key]: version for key, version in found.items()}
+    for key, namespace in keys.items():
+        if namespace not in versions:
+            versions[namespace] = namespace_version(namespace, cache)
+    return versions
+
+
+def hashed_key(*parts):
+    """Short, cache-safe key fragment for arbitrary (user supplied) strings."""
+    return hashlib.sha1('\x1f'.join(str(p) for p in parts).encode()).hexdigest()[:20]
+
+
+def namespaced_key(namespace, key, cache=None):
+    return f'{namespace}:v{namespace_version(namespace, cache)}:{key}'
+
+
+def bump_namespace(namespace, cache=None):
+    """Invalidate every key built with ``namespaced_key(namespace, ...)``."""
+    cache = cache or default_cache
+    key = _namespace_key(namespace)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        # Unknown namespace: any fresh value differs from what readers used.
+        version = int(time.time())
+        cache.set(key, version, timeout=None)
+        return version
+    # Backends without a native incr (file, database) re-set the key with the
+    # default timeout; a version key must never expire, or the namespace
+    # would restart at 1 and revive entries built under the old versions.
+    cache.touch(key, None)
+    return version
+
+
+# -----------------------
+# Single-flight rebuilds
+# -----------------------
+def _refresh_in_background(cache, key, build, timeout, stale_timeout, lock_key):
+    def run():
+        try:
+            _store(cache, key, build(), timeout, stale_timeout)
+        except Exception:
+            logger.exception("Background rebuild of %s failed", key)
+        finally:
+            cache.delete(lock_key)
+            connection.close()
+    threading.Thread(target=run, name='cache-refresh', daemon=True).start()
+
+
+def _store(cache, key, value, timeout, stale_timeout):
+    cache.set(key, {'value': value, 'fresh_until': time.time() + timeout}, timeout + stale_timeout)
+    return value
+
+
+def get_many_built(keys, cache=None):
+    """Values stored by get_or_build() for ``keys`` (fresh or stale) in one round trip."""
+    cache = cache or default_cache
+    return {key: entry['value'] for key, entry in cache.get_many(list(keys)).items()}
+
+
+def set_built(key, value, timeout, stale_timeout=0, cache=None):
+    """Store ``value`` so that get_or_build()/get_many_built() find it."""
+    return _store(cache or default_cache, key, value, timeout, stale_timeout)
+
+
+def get_or_build(key, build, timeout, stale_timeout=0, lock_timeout=30, wait=3.0, cache=None):
+    """
+    Return the cached value for ``key``, calling ``build()`` on a miss such
+    that only one worker rebuilds it at a time.
+
+    The entry is fresh for ``timeout`` seconds and may then be served stale for
+    another ``stale_timeout`` seconds while a single background thread
+    rebuilds it. On a cold miss the lock holder builds inline and the other
+    callers poll for up to ``wait`` seconds before giving up and building
+    themselves. ``build`` must not depend on the current request.
+    """
+    cache = cache or default_cache
+    entry = cache.get(key)
+    if entry is not None and entry['fresh_until'] > time.time():
+        return entry['value']
+
+    lock_key = f'lock:{key}'
+    if cache.add(lock_key, 1, lock_timeout):
+        if entry is not None:
+            _refresh_in_background(cache, key, build, timeout, stale_timeout, lock_key)
+            return entry['value']
+        try:
+            return _store(cache, key, build(), timeout, stale_timeout)
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry['value']
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+    return build()
+
+
+async def aget_or_build(key, build, timeout, stale_timeout=0, lock_timeout=30, wait=3.0, cache=None):
+    """
+    get_or_build() for async views; ``build`` is a coroutine function. It
+    takes the same ``lock:<key>`` lock, so sync and async callers of a key
+    still build it only once between them. A stale entry is served while the
+    lock holder rebuilds it in the background.
+    """
+    cache = cache or default_cache
+    call = functools.partial(sync_to_async, thread_sensitive=False)
+    entry = await call(cache.get)(key)
+    if entry is not None and entry['fresh_until'] > time.time():
+        return entry['value']
+
+    lock_key = f'lock:{key}'
+
+    async def rebuild():
+        try:
+            return await call(_store)(cache, key, await build(), timeout, stale_timeout)
+        finally:
+            await call(cache.delete)(lock_key)
+
+    if await call(cache.add)(lock_key, 1, lock_timeout):
+        if entry is not None:
+            task = asyncio.ensure_future(rebuild())
+            _background_rebuilds.add(task)
+            task.add_done_callback(_background_rebuilds.discard)
+            return entry['value']
+        return await rebuild()
+
+    if entry is not None:
+        return entry['value']
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await call(cache.get)(key)
+        if entry is not None:
+            return entry['value']
+    return await build()
+
+
+# Strong references, so pending background rebuilds aren't garbage collected
+_background_rebuilds = set()
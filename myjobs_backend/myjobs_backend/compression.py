@@ -0,0 +1,103 @@
+"""
+Response compression negotiated on Accept-Encoding.
+
+CompressionMiddleware (myjobs_backend/middleware.py) compresses textual
+responses of at least COMPRESSION_MIN_SIZE bytes with brotli (when the
+optional ``brotli`` package is installed) or gzip, whichever the client
+prefers. Streaming responses are gzipped on the fly.
+
+Views serving cached data can mark the response with ``cache_compressed()``;
+the compressed bytes are then stored next to the cache entry, keyed by the
+entry key, encoding and a digest of the rendered body, so a cache hit is not
+recompressed and a rebuilt entry can never be served with an old body.
+"""
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/msgpack',
+    'image/svg+xml',
+)
+
+
+def supported_encodings():
+    """Encodings we can produce, most preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding, encodings=None):
+    """Best of ``encodings`` (default: all supported) for an Accept-Encoding header, or None."""
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in encodings or supported_encodings():
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+    return gzip.compress(body, compresslevel=getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6), mtime=0)
+
+
+def is_compressible(response):
+    if response.has_header('Content-Encoding') or response.status_code < 200:
+        return False
+    # Async streams are long-lived (SSE) and would have to be flushed per event.
+    if response.streaming and response.is_async:
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type != 'text/event-stream' and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+# -----------------------
+# Cached compressed bodies
+# -----------------------
+def cache_compressed(response, key, timeout):
+    """Store this response's compressed bodies alongside cache entry ``key``."""
+    response.compression_cache = (key, timeout)
+    return response
+
+
+def compressed_body(response, encoding):
+    """Compressed ``response.content``, reusing cached bytes when the view allows it."""
+    body = response.content
+    cached = getattr(response, 'compression_cache', None)
+    if cached is None:
+        return compress(body, encoding)
+    key, timeout = cached
+    digest = hashlib.sha1(response['Content-Type'].encode() + b'\x1f' + body).hexdigest()[:20]
+    compressed_key = f'compressed:{key}:{encoding}:{digest}'
+    compressed = cache.get(compressed_key)
+    if compressed is None:
+        compressed = compress(body, encoding)
+        cache.set(compressed_key, compressed, timeout)
+    return compressed
@@ -0,0 +1,80 @@
+"""
+Connection pool metrics.
+
+With ``DB_POOL`` on, every database alias of a process draws its connections
+from a psycopg_pool ConnectionPool (see settings). ``register_pool_metrics()``
+adds scrape-time collectors for those pools to the metrics registry, labelled
+by alias (and pid): current size, idle connections, waiting requests and
+utilization, plus running totals of requests served, time spent waiting for a
+connection, timeouts and connections lost. Average wait per request is
+``rate(db_pool_wait_seconds_total) / rate(db_pool_requests_total)``.
+"""
+from django.db import connections
+
+from .metrics import registry
+
+# metric name -> (help, function of (stats dict) -> value); *_total are counters
+POOL_METRICS = {
+    'db_pool_size': (
+        'Connections currently held by the pool, idle or in use.',
+        lambda stats: stats.get('pool_size', 0),
+    ),
+    'db_pool_available': (
+        'Idle connections in the pool.',
+        lambda stats: stats.get('pool_available', 0),
+    ),
+    'db_pool_requests_waiting': (
+        'Requests waiting for a connection.',
+        lambda stats: stats.get('requests_waiting', 0),
+    ),
+    'db_pool_utilization': (
+        'Share of the pool maximum in use (0-1).',
+        lambda stats: (stats.get('pool_size', 0) - stats.get('pool_available', 0)) / (stats.get('pool_max') or 1),
+    ),
+    'db_pool_requests_total': (
+        'Connections handed out by the pool since it opened.',
+        lambda stats: stats.get('requests_num', 0),
+    ),
+    'db_pool_wait_seconds_total': (
+        'Time requests spent waiting for a connection.',
+        lambda stats: stats.get('requests_wait_ms', 0) / 1000,
+    ),
+    'db_pool_timeouts_total': (
+        'Requests that gave up waiting for a connection.',
+        lambda stats: stats.get('requests_errors', 0),
+    ),
+    'db_pool_connections_lost_total': (
+        'Connections found broken by health checks or on return.',
+        lambda stats: stats.get('connections_lost', 0) + stats.get('returns_bad', 0),
+    ),
+}
+
+
+def open_pools():
+    """{alias: ConnectionPool} of the pools this process has opened."""
+    pools = {}
+    for alias in connections:
+        conn = connections[alias]
+        if conn.vendor != 'postgresql' or not conn.settings_dict.get('OPTIONS', {}).get('pool'):
+            continue
+        pool = conn.pool
+        if pool is not None and not pool.closed:
+            pools[alias] = pool
+    return pools
+
+
+def pool_stats():
+    """{alias: psycopg_pool stats dict}; counters are totals since the pool opened."""
+    return {alias: pool.get_stats() for alias, pool in open_pools().items()}
+
+
+def _collector(value):
+    def collect():
+        return {(('alias', alias),): value(stats) for alias, stats in pool_stats().items()}
+    return collect
+
+
+def register_pool_metrics():
+    for name, (help_text, value) in POOL_METRICS.items():
+        kind = 'counter' if name.endswith('_total') else 'gauge'
+        registry.register_gauge(name, help_text, _collector(value), kind)
@@ -0,0 +1,209 @@
+"""
+Read-replica routing.
+
+When REPLICA_DATABASE_URL is set, settings adds a ``replica`` database alias.
+Writes, migrations and ordinary reads always use ``default``; only views that
+opt in read from the replica:
+
+    class FacultySearchView(ReplicaReadMixin, APIView): ...
+
+    @api_view(['GET'])
+    @replica_reads
+    def job_statistics(request): ...
+
+Opted-in views use the replica for safe methods only, and not for a user who
+wrote within the last REPLICA_STICKY_SECONDS (recorded by
+ReplicaStickinessMiddleware in the shared cache), so users always read their
+own writes. Values cached beyond the request are built on the primary
+(``on_primary()``). Without a replica everything stays on ``default``.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse
+
+from .middleware_base import HybridMiddleware
+from .query_log import acapture, capture
+
+REPLICA = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA:
+            return False
+        return None
+
+
+# -----------------------
+# Stickiness
+# -----------------------
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """Keep ``user``'s reads on the primary for REPLICA_STICKY_SECONDS."""
+    timeout = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+    if timeout > 0:
+        caches['shared'].set(_pin_key(user.pk), 1, timeout)
+
+
+def is_pinned(user):
+    return caches['shared'].get(_pin_key(user.pk)) is not None
+
+
+def should_use_replica(request):
+    if not replica_configured() or request.method not in SAFE_METHODS:
+        return False
+    user = getattr(request, 'user', None)
+    return not (user is not None and user.is_authenticated and is_pinned(user))
+
+
+class ReplicaStickinessMiddleware(HybridMiddleware):
+    """
+    Pins the user to the primary after a request that wrote to it. Only
+    unsafe methods are watched; not installed when there is no replica.
+    """
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        if request.method in SAFE_METHODS:
+            return self.get_response(request)
+
+        with capture(request) as queries:
+            response = self.get_response(request)
+        self.pin_writer(request, queries)
+        return response
+
+    async def ahandle(self, request):
+        if request.method in SAFE_METHODS:
+            return await self.get_response(request)
+
+        async with acapture(request) as queries:
+            response = await self.get_response(request)
+        # request.user may still have to be loaded
+        await sync_to_async(self.pin_writer)(request, queries)
+        return response
+
+    @staticmethod
+    def pin_writer(request, queries):
+        wrote = any(
+            s.alias == 'default' and s.sql.lstrip()[:6].upper() in WRITE_PREFIXES for s in queries.statements
+        )
+        user = getattr(request, 'user', None)
+        if wrote and user is not None and user.is_authenticated:
+            pin_to_primary(user)
+
+
+# -----------------------
+# Opting views in
+# -----------------------
+@contextmanager
+def reading_from_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def reading_from_primary():
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def on_primary(build):
+    """
+    ``build`` with its reads on the primary. Wrap cache builders with it: a
+    shared entry rebuilt right after an invalidation must not capture the
+    replica's lagging state, or every reader (the writer included) would be
+    served it until the entry expires.
+    """
+    @functools.wraps(build)
+    def wrapper(*args, **kwargs):
+        with reading_from_primary():
+            return build(*args, **kwargs)
+    return wrapper
+
+
+def replica_iter(iterable):
+    """Iterate ``iterable`` (a streamed response body) with reads on the replica."""
+    iterator = iter(iterable)
+    while True:
+        with reading_from_replica():
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+class ReplicaReadMixin:
+    """
+    DRF view mixin: route the view's reads to the replica. The decision is
+    made after authentication so that stickiness can look at the user.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if should_use_replica(request):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            self._replica_token = None
+            _use_replica.reset(token)
+            # Streamed bodies query while they are sent, after the view returned
+            if response.streaming and not isinstance(response, FileResponse):
+                response.streaming_content = replica_iter(response.streaming_content)
+        return response
+
+
+def replica_reads(view):
+    """
+    Function-view counterpart of ReplicaReadMixin; place it directly above
+    the function, below ``@api_view``, so that ``request.user`` is known.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not should_use_replica(request):
+            return view(request, *args, **kwargs)
+        with reading_from_replica():
+            return view(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,102 @@
+"""
+Logging helpers: request ids, a JSON-lines formatter and a queue-backed
+handler so that file/console I/O happens on a background thread instead of
+the request thread.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from contextvars import ContextVar
+from logging.config import ConvertingList
+from logging.handlers import QueueHandler, QueueListener
+
+# Set per request by RequestIdMiddleware; '-' outside of a request.
+request_id_var = ContextVar('request_id', default='-')
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``.
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp each record with the id of the request being handled."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request id, message and any ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'process': record.process,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    QueueHandler that owns a QueueListener feeding the real handlers.
+
+    Configure it in LOGGING with ``'handlers': ['cfg://handlers.file', ...]``;
+    the handler's own name must sort after the handlers it references because
+    dictConfig builds handlers in alphabetical order. The listener is
+    restarted after a fork (gunicorn --preload) since threads don't survive it.
+    """
+
+    def __init__(self, handlers, respect_handler_level=True):
+        super().__init__(queue.SimpleQueue())
+        if isinstance(handlers, ConvertingList):
+            # Indexing a ConvertingList resolves the cfg:// references.
+            handlers = [handlers[i] for i in range(len(handlers))]
+        self._handlers = handlers
+        self._respect_handler_level = respect_handler_level
+        self._pid = None
+        self.listener = None
+        self._start_listener()
+        atexit.register(self._stop_listener)
+
+    def _start_listener(self):
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, *self._handlers, respect_handler_level=self._respect_handler_level)
+        self.listener.start()
+        self._pid = os.getpid()
+
+    def _stop_listener(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().enqueue(record)
+
+    def prepare(self, record):
+        """
+        Merge the message args on the calling thread (they may be mutated
+        later) but keep ``extra`` fields and the traceback separate.
+        """
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
@@ -0,0 +1,306 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Each worker process keeps its own counters and histograms. When
+``METRICS_DIR`` is set, workers periodically write a snapshot of their
+registry to ``<METRICS_DIR>/metrics-<pid>.json`` and the ``/metrics``
+endpoint merges every snapshot, so a scrape of any worker reports totals for
+the whole node (gunicorn's workers share nothing else). Snapshots of workers
+that exited are folded into a ``retired`` total, so counters never go
+backwards when gunicorn recycles a worker. sql_stats.py shares the snapshot
+files code.
+"""
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import locks
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 50, 100, 250)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP responses by view, method and status code.', None),
+    'http_request_duration_seconds': ('histogram', 'Request latency by view.', LATENCY_BUCKETS),
+    'http_request_db_queries': ('histogram', 'Database queries executed per request.', QUERY_COUNT_BUCKETS),
+    'http_request_db_duration_seconds': ('histogram', 'Time spent in the database per request.', LATENCY_BUCKETS),
+    'http_response_size_bytes': ('histogram', 'Response body size (non-streaming responses).', SIZE_BUCKETS),
+    'batch_subrequests_total': ('counter', 'Sub-requests dispatched by /api/batch/, by view and status code.', None),
+    'cache_requests_total': ('counter', 'Cache lookups by cache alias and result (hit/miss).', None),
+}
+
+
+class Registry:
+    """Thread-safe store of counter values and histogram bucket counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}     # (name, labels) -> float
+        self._histograms = {}   # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self._gauges = {}       # name -> callable returning {labels: value}
+        self._last_flush = 0.0
+        self._flushed = None    # the snapshot last written to METRICS_DIR
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, tuple(labels))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(buckets) + 2)
+            series[bisect_left(buckets, value)] += 1
+            series[-1] += value
+
+    def register_gauge(self, name, help_text, collect, kind='gauge'):
+        """
+        Register a gauge whose values are computed at scrape time:
+        ``collect()`` returns ``{labels_tuple: value}``. Pass kind='counter'
+        for running totals kept elsewhere (e.g. by a connection pool).
+        """
+        METRICS.setdefault(name, (kind, help_text, None))
+        self._gauges[name] = collect
+
+    def snapshot(self):
+        with self._lock:
+            counters = [[name, list(labels), value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, list(labels), list(series)] for (name, labels), series in self._histograms.items()]
+        gauges = []
+        for name, collect in self._gauges.items():
+            try:
+                for labels, value in collect().items():
+                    gauges.append([name, [*labels, ('pid', str(os.getpid()))], value])
+            except Exception:
+                continue
+        return {'counters': counters, 'histograms': histograms, 'gauges': gauges}
+
+    def subtract(self, snapshot):
+        """Take the counts of an earlier ``snapshot()`` off this registry."""
+        with self._lock:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                self._counters[key] = self._counters.get(key, 0) - value
+            for name, labels, series in snapshot['histograms']:
+                current = self._histograms.get((name, tuple(map(tuple, labels))))
+                if current is not None:
+                    for i, value in enumerate(series):
+                        current[i] -= value
+
+    def maybe_flush(self):
+        """Write this worker's snapshot to METRICS_DIR at most every METRICS_FLUSH_INTERVAL seconds."""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 5):
+            return
+        self._last_flush = now
+        self.flush(directory)
+
+    def flush(self, directory):
+        snapshot = self.snapshot()
+        if not write_snapshot(directory, 'metrics', snapshot):
+            # The last snapshot we wrote was folded into the retired totals;
+            # only what came after it is still ours to report
+            self.subtract(self._flushed)
+            snapshot = self.snapshot()
+            write_snapshot(directory, 'metrics', snapshot)
+        self._flushed = snapshot
+
+
+registry = Registry()
+
+
+def record_cache_access(alias, hit):
+    """Count a cache lookup; called by the cache helpers wherever the cache is read."""
+    registry.inc('cache_requests_total', (('cache', alias), ('result', 'hit' if hit else 'miss')))
+
+
+# -----------------------
+# Worker snapshot files
+# -----------------------
+_worker = None      # (pid, id) of this process
+_written = set()    # (directory, prefix) this process has a snapshot file in
+
+
+def worker_id():
+    """
+    Unique name of this worker's snapshot files. A pid alone is reused after
+    a worker is recycled and clashes between containers sharing the directory.
+    """
+    global _worker
+    pid = os.getpid()
+    if _worker is None or _worker[0] != pid:  # also right after a fork
+        _worker = (pid, f'{socket.gethostname()}-{pid}-{uuid.uuid4().hex[:8]}')
+        _written.clear()
+    return _worker[1]
+
+
+def _snapshot_path(directory, prefix, name):
+    return os.path.join(directory, f'{prefix}-{name}.json')
+
+
+@contextmanager
+def _locked(directory, prefix):
+    """Serialize writes and folds of ``prefix`` snapshots across processes."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f'.{prefix}.lock'), 'a') as fh:
+        locks.lock(fh, locks.LOCK_EX)
+        try:
+            yield
+        finally:
+            locks.unlock(fh)
+
+
+def _replace_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as fh:
+        json.dump(data, fh)
+    os.replace(tmp_path, path)
+
+
+def write_snapshot(directory, prefix, data):
+    """
+    Atomically replace this worker's snapshot in ``directory``. Returns False,
+    writing nothing, if the previous one was folded into the retired totals
+    (the worker was silent for METRICS_SNAPSHOT_MAX_AGE): the caller must
+    start its counts over, or they would be counted twice.
+    """
+    path = _snapshot_path(directory, prefix, worker_id())
+    with _locked(directory, prefix):
+        if (directory, prefix) in _written and not os.path.exists(path):
+            _written.discard((directory, prefix))
+            return False
+        _replace_json(path, data)
+        _written.add((directory, prefix))
+    return True
+
+
+def read_snapshots(directory, prefix, fold):
+    """
+    Snapshots of the other workers in ``directory``, plus the retired totals.
+
+    A snapshot not rewritten for METRICS_SNAPSHOT_MAX_AGE seconds belongs to
+    a worker that exited; it is merged into ``<prefix>-retired.json`` with
+    ``fold(retired, snapshot)`` and deleted, so its totals stay counted (as
+    prometheus_client's multiprocess mode does for dead workers).
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+    max_age = getattr(settings, 'METRICS_SNAPSHOT_MAX_AGE', 600)
+    retired_path = _snapshot_path(directory, prefix, 'retired')
+    own_path = _snapshot_path(directory, prefix, worker_id())
+    snapshots, stale = [], []
+    with _locked(directory, prefix):
+        try:
+            with open(retired_path) as fh:
+                retired = json.load(fh)
+        except (OSError, ValueError):
+            retired = None
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            if not filename.startswith(f'{prefix}-') or not filename.endswith('.json'):
+                continue
+            if path in (retired_path, own_path):
+                continue
+            try:
+                with open(path) as fh:
+                    data = json.load(fh)
+                silent = time.time() - os.path.getmtime(path) > max_age
+            except (OSError, ValueError):
+                continue
+            if silent:
+                retired = fold(retired or {}, data)
+                stale.append(path)
+            else:
+                snapshots.append(data)
+        if stale:
+            _replace_json(retired_path, retired)
+            for path in stale:
+                os.remove(path)
+    return [retired, *snapshots] if retired else snapshots
+
+
+def merge_snapshots(snapshots):
+    """One snapshot with the counters and histograms of ``snapshots`` summed."""
+    counters, histograms, gauges = {}, {}, {}
+    for snap in snapshots:
+        for name, labels, value in snap.get('counters', []):
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, series in snap.get('histograms', []):
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.get(key)
+            histograms[key] = series if merged is None else [a + b for a, b in zip(merged, series)]
+        for name, labels, value in snap.get('gauges', []):
+            gauges[(name, tuple(map(tuple, labels)))] = value
+    return {
+        'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, list(labels), series] for (name, labels), series in histograms.items()],
+        'gauges': [[name, list(labels), value] for (name, labels), value in gauges.items()],
+    }
+
+
+def retire_snapshot(retired, snapshot):
+    # The gauges of an exited worker (its pool connections) are gone with it
+    return {**merge_snapshots([retired, snapshot]), 'gauges': []}
+
+
+def collect_snapshots():
+    """This process's snapshot merged with the other workers' files in METRICS_DIR."""
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if directory:
+        # Also notices whether our own counts were retired meanwhile
+        registry.flush(directory)
+    return [registry.snapshot(), *read_snapshots(directory, 'metrics', retire_snapshot)]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def render_prometheus(snapshots):
+    """Merge snapshots and render them in the Prometheus text format (v0.0.4)."""
+    merged = merge_snapshots(snapshots)
+    counters, histograms, gauges = (
+        {(name, tuple(map(tuple, labels))): value for name, labels, value in merged[kind]}
+        for kind in ('counters', 'histograms', 'gauges')
+    )
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        series = [(k, v) for k, v in {**counters, **histograms, **gauges}.items() if k[0] == name]
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (_, labels), value in sorted(series):
+            if kind != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels((*labels, ("le", str(bound))))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {value[-1]}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
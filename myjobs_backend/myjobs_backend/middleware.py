@@ -0,0 +1,236 @@
+"""
+Project-wide middleware. Every class runs natively under WSGI and ASGI (see
+myjobs_backend/middleware_base.py).
+"""
+import logging
+import random
+import re
+import time
+import uuid
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+from .compression import compressed_body, is_compressible, negotiate
+from .db_pool import register_pool_metrics
+from .log_utils import request_id_var
+from .middleware_base import HybridMiddleware
+from .metrics import registry
+from .profiling import is_staff_request, profile_request, sample_request
+from .query_log import acapture, capture
+from .sql_stats import sql_stats
+
+logger = logging.getLogger(__name__)
+
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+    """
+    Records latency, DB query count/time, response size and status per view
+    into the in-process metrics registry (exposed at /metrics), and registers
+    the connection pool gauges when DB_POOL is on.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if getattr(settings, 'DB_POOL', False):
+            register_pool_metrics()
+
+    def handle(self, request):
+        started = time.perf_counter()
+        with capture(request) as queries:
+            response = self.get_response(request)
+        return self.record(request, response, queries, time.perf_counter() - started)
+
+    async def ahandle(self, request):
+        started = time.perf_counter()
+        async with acapture(request) as queries:
+            response = await self.get_response(request)
+        return self.record(request, response, queries, time.perf_counter() - started)
+
+    @staticmethod
+    def record(request, response, queries, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.route) if match else 'unresolved'
+        labels = (('view', view),)
+
+        registry.inc('http_requests_total', (*labels, ('method', request.method), ('status', str(response.status_code))))
+        registry.observe('http_request_duration_seconds', labels, duration)
+        registry.observe('http_request_db_queries', labels, len(queries.statements))
+        registry.observe('http_request_db_duration_seconds', labels, queries.duration_ms / 1000)
+        if not response.streaming:
+            registry.observe('http_response_size_bytes', labels, len(response.content))
+        registry.maybe_flush()
+        return response
+
+
+class SQLStatsMiddleware(HybridMiddleware):
+    """
+    Aggregate SQL time per (view, fingerprint) and capture EXPLAIN plans for
+    sampled slow statements. Enabled with SQL_STATS_ENABLED; see
+    myjobs_backend/sql_stats.py.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_STATS_ENABLED', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        with capture(request) as queries:
+            response = self.get_response(request)
+        return self.record(request, response, queries)
+
+    async def ahandle(self, request):
+        async with acapture(request) as queries:
+            response = await self.get_response(request)
+        return self.record(request, response, queries)
+
+    @staticmethod
+    def record(request, response, queries):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.route) if match else 'unresolved'
+        if queries.statements:
+            sql_stats.record(view, queries.statements)
+        return response
+
+
+class RequestIdMiddleware(HybridMiddleware):
+    """
+    Assign every request an id (reusing a sane incoming X-Request-ID) that is
+    attached to all log records emitted while handling it and echoed back in
+    the response headers.
+    """
+
+    def handle(self, request):
+        token = self.assign(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response['X-Request-ID'] = request.id
+        return response
+
+    async def ahandle(self, request):
+        # sync_to_async() copies the context, so sync views log the id too
+        token = self.assign(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response['X-Request-ID'] = request.id
+        return response
+
+    @staticmethod
+    def assign(request):
+        incoming = request.headers.get('X-Request-ID', '')
+        request.id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        return request_id_var.set(request.id)
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """
+    Profile a request on demand (staff sending ``X-Profile: 1`` or
+    ``?_profile=1``) or for a random PROFILING_SAMPLE_RATE fraction of
+    traffic. See myjobs_backend/profiling.py.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+
+    @staticmethod
+    def requested(request):
+        return request.headers.get('X-Profile') == '1' or request.GET.get('_profile') == '1'
+
+    def runner(self, requested):
+        if requested:
+            return profile_request
+        if self.sample_rate and random.random() < self.sample_rate:
+            return sample_request
+        return None
+
+    def handle(self, request):
+        requested = self.requested(request) and is_staff_request(request)
+        runner = self.runner(requested)
+        if runner is None:
+            return self.get_response(request)
+        response, artifact_id = runner(self.get_response, request)
+        return self.finish(request, response, artifact_id, requested)
+
+    async def ahandle(self, request):
+        # Resolving the JWT user queries the database
+        requested = self.requested(request) and await sync_to_async(is_staff_request)(request)
+        runner = self.runner(requested)
+        if runner is None:
+            return await self.get_response(request)
+        # cProfile, the stack sampler and the SQL log follow one thread. Run
+        # the rest of the chain from sync_to_async's thread, which is also
+        # where the (sync) views and the ORM execute.
+        response, artifact_id = await sync_to_async(runner)(async_to_sync(self.get_response), request)
+        return self.finish(request, response, artifact_id, requested)
+
+    @staticmethod
+    def finish(request, response, artifact_id, requested):
+        logger.info("Stored profile %s for %s %s", artifact_id, request.method, request.path)
+        if requested:
+            response['X-Profile-Id'] = artifact_id
+        return response
+
+
+class CompressionMiddleware(HybridMiddleware):
+    """
+    Compress textual responses of at least COMPRESSION_MIN_SIZE bytes with
+    brotli or gzip according to Accept-Encoding; streaming responses are
+    gzipped. See myjobs_backend/compression.py.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+    def handle(self, request):
+        return self.compress(request, self.get_response(request))
+
+    async def ahandle(self, request):
+        response = await self.get_response(request)
+        if getattr(response, 'compression_cache', None) is not None:
+            # compressed_body() reads and writes the cache
+            return await sync_to_async(self.compress)(request, response)
+        return self.compress(request, response)
+
+    def compress(self, request, response):
+        if not is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        # The response depends on Accept-Encoding even when we don't compress it.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(
+            request.headers.get('Accept-Encoding', ''),
+            ('gzip',) if response.streaming else None,
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = compressed_body(response, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag would be wrong for the re-encoded body.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
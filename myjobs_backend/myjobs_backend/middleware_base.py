@@ -0,0 +1,46 @@
+"""
+Base class for the project's middleware, which runs natively under both WSGI
+and ASGI.
+
+Django adapts a middleware that doesn't support the handler's mode by moving
+the rest of the chain to a thread (``async_to_sync``/``sync_to_async``), so a
+single sync-only middleware makes every ASGI request, the SSE stream
+(jobs/views_events.py) included, cost a thread again. Subclasses implement
+``handle()`` for WSGI and ``ahandle()`` for ASGI around shared helpers:
+
+    class TimingMiddleware(HybridMiddleware):
+        def handle(self, request):
+            started = time.perf_counter()
+            return self.record(self.get_response(request), started)
+
+        async def ahandle(self, request):
+            started = time.perf_counter()
+            return self.record(await self.get_response(request), started)
+
+Under ASGI the ORM runs on sync_to_async's thread; anything that must see a
+request's queries goes through ``query_log.acapture()``.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
+class HybridMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            # Django then awaits __call__ instead of adapting it
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def ahandle(self, request):
+        raise NotImplementedError
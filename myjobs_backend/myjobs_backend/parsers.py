@@ -0,0 +1,33 @@
+"""
+Fast DRF parsers matching myjobs_backend/renderers.py.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+
+class ORJSONParser(BaseParser):
+    """Drop-in replacement for rest_framework's JSONParser."""
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except Exception as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
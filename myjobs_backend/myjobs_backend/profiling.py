@@ -0,0 +1,233 @@
+"""
+Per-request profiling.
+
+Staff can profile a single request by sending ``X-Profile: 1`` (or adding
+``?_profile=1``). The request runs under cProfile and tracemalloc and the
+resulting stats, top allocations and SQL log are written to a zip artifact in
+``PROFILING_DIR``; its id (generated here, never taken from the request) comes
+back in the ``X-Profile-Id`` header and it can be downloaded from
+``/api/profiles/<id>/``. tracemalloc is process-wide, so only one profiled
+request at a time traces memory; the others skip the allocation report.
+
+``PROFILING_SAMPLE_RATE`` additionally profiles that fraction of all traffic
+with a cheap wall-clock stack sampler (collapsed stacks, flamegraph-ready)
+instead of cProfile.
+"""
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+import zipfile
+from collections import Counter
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .query_log import capture
+
+ARTIFACT_ID = re.compile(r'^[0-9]{8}T[0-9]{6}-[A-Za-z0-9._-]{1,64}$')
+
+_tracing_memory = threading.Lock()
+
+
+def profiling_dir():
+    return str(getattr(settings, 'PROFILING_DIR', os.path.join(settings.BASE_DIR, 'profiles')))
+
+
+def is_staff_request(request):
+    """Resolve the user from the session or the JWT header and check is_staff."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except Exception:
+            return False
+        user = result[0] if result else None
+    return bool(user and user.is_active and user.is_staff)
+
+
+class StackSampler:
+    """
+    Samples the target thread's Python stack every ``interval`` seconds from a
+    background thread. Overhead on the profiled thread is limited to GIL
+    hand-offs, so it is safe to leave on for a fraction of production traffic.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+
+def write_artifact(files):
+    """Store ``files`` ({name: str|bytes}) as a zip and return the new artifact id."""
+    directory = profiling_dir()
+    os.makedirs(directory, exist_ok=True)
+    artifact_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex}"
+    path = os.path.join(directory, f'{artifact_id}.zip')
+    with zipfile.ZipFile(path, 'x', compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    prune_artifacts(directory)
+    return artifact_id
+
+
+def prune_artifacts(directory):
+    keep = getattr(settings, 'PROFILING_MAX_ARTIFACTS', 200)
+    artifacts = sorted(f for f in os.listdir(directory) if f.endswith('.zip'))
+    for name in artifacts[:-keep] if keep else []:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def list_artifacts():
+    directory = profiling_dir()
+    if not os.path.isdir(directory):
+        return []
+    artifacts = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if name.endswith('.zip'):
+            stat = os.stat(os.path.join(directory, name))
+            artifacts.append({'id': name[:-4], 'size': stat.st_size, 'created_at': stat.st_mtime})
+    return artifacts
+
+
+def artifact_path(artifact_id):
+    """Filesystem path of an artifact, or None for unknown/malformed ids."""
+    if not ARTIFACT_ID.match(artifact_id):
+        return None
+    path = os.path.join(profiling_dir(), f'{artifact_id}.zip')
+    return path if os.path.exists(path) else None
+
+
+def profile_stats_files(profiler):
+    """Binary pstats dump (loadable with pstats/snakeviz) plus a text summary."""
+    profiler.create_stats()
+    raw = marshal.dumps(profiler.stats)  # pstats.Stats() below takes ownership of .stats
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(60)
+    return {'profile.prof': raw, 'profile.txt': summary.getvalue()}
+
+
+def allocation_report(snapshot, peak, limit=30):
+    lines = [f'Peak traced memory: {peak / 1024:.1f} KiB', '']
+    for stat in snapshot.statistics('lineno')[:limit]:
+        lines.append(str(stat))
+    return '\n'.join(lines)
+
+
+def sql_entries(queries):
+    """The SQL log of an artifact: every statement with its parameters and duration."""
+    return [
+        {
+            'sql': statement.sql,
+            'params': repr(statement.params)[:500],
+            'many': statement.many,
+            'duration_ms': round(statement.duration_ms, 3),
+        }
+        for statement in queries.statements
+    ]
+
+
+def _meta(request, response, duration, mode, queries, **extra):
+    return json.dumps({
+        'mode': mode,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 2),
+        'queries': len(queries.statements),
+        'query_time_ms': round(queries.duration_ms, 2),
+        'request_id': getattr(request, 'id', None),
+        **extra,
+    }, indent=2)
+
+
+def profile_request(get_response, request):
+    """Full profile: cProfile + tracemalloc + SQL log."""
+    profiler = cProfile.Profile()
+    # Concurrent sessions on other threads would reset each other's peak
+    trace_memory = _tracing_memory.acquire(blocking=False)
+    if trace_memory and tracemalloc.is_tracing():  # started outside this module
+        _tracing_memory.release()
+        trace_memory = False
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        with capture(request) as queries:
+            response = get_response(request)
+    finally:
+        profiler.disable()
+        duration = time.perf_counter() - started
+        if trace_memory:
+            try:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+                _tracing_memory.release()
+
+    files = {
+        'meta.json': _meta(request, response, duration, 'cprofile', queries, memory_traced=trace_memory),
+        'sql.json': json.dumps(sql_entries(queries), indent=2),
+        **profile_stats_files(profiler),
+    }
+    if trace_memory:
+        files['allocations.txt'] = allocation_report(snapshot, peak)
+    return response, write_artifact(files)
+
+
+def sample_request(get_response, request):
+    """Low-overhead profile: wall-clock stack sampling + SQL log."""
+    sampler = StackSampler(getattr(settings, 'PROFILING_SAMPLE_INTERVAL', 0.005))
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        with capture(request) as queries:
+            response = get_response(request)
+    finally:
+        sampler.stop()
+        duration = time.perf_counter() - started
+
+    files = {
+        'meta.json': _meta(request, response, duration, 'sampled', queries),
+        'sql.json': json.dumps(sql_entries(queries), indent=2),
+        'stacks.txt': sampler.collapsed(),
+    }
+    return response, write_artifact(files)
@@ -0,0 +1,224 @@
+"""
+In-process pub/sub with a pluggable cross-worker backend.
+
+Async consumers (the SSE stream in jobs/views_events.py) subscribe to a set
+of channels on this worker's hub; publishers call ``publish()`` from ordinary
+sync code, usually via ``publish_on_commit()``. The backend carries messages
+between workers and decides which hubs see them:
+
+    PUBSUB_BACKEND = 'myjobs_backend.pubsub.LocalBackend'     # this process only
+    PUBSUB_BACKEND = 'myjobs_backend.pubsub.PostgresBackend'  # every worker, via LISTEN/NOTIFY
+
+Unset, it is PostgresBackend when the default database is Postgres: sync
+(WSGI) workers publish too, and with LocalBackend their messages would never
+reach the ASGI workers holding the streams.
+
+PostgresBackend sends each message with pg_notify() on one database channel
+and runs a listener thread per worker that hands notifications to the local
+hub. Messages must be small JSON-serialisable dicts (NOTIFY payloads are
+limited to 8000 bytes), so send ids and a summary rather than full records.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = 'faculty_finder_events'
+
+
+class Subscription:
+    """Bounded message queue of one async consumer, fed from any thread."""
+
+    def __init__(self, hub, channels, maxsize):
+        self.hub = hub
+        self.channels = frozenset(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def push(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:  # event loop already closed
+            pass
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A consumer this far behind has to resync anyway.
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Next message, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Hub:
+    """Channel -> subscriptions of this process."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, maxsize=100):
+        subscription = Subscription(self, channels, maxsize)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            subscription.push(message)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({s for subscribers in self._subscriptions.values() for s in subscribers})
+
+
+hub = Hub()
+
+
+# -----------------------
+# Backends
+# -----------------------
+class LocalBackend:
+    """Single-process stand-in: messages only reach this worker's subscribers."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, channel, message):
+        self.hub.deliver(channel, message)
+
+    def start(self):
+        pass
+
+
+class PostgresBackend:
+    """Fan out through Postgres LISTEN/NOTIFY to the hubs of every worker."""
+
+    reconnect_delay = 5
+
+    def __init__(self, hub, alias='default'):
+        self.hub = hub
+        self.alias = alias
+        self._started = False
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        payload = json.dumps({'channel': channel, 'message': message}, separators=(',', ':'), default=str)
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [PG_CHANNEL, payload])
+
+    def start(self):
+        """Start this worker's listener thread (once)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._listen_forever, name='pubsub-listener', daemon=True).start()
+
+    def _listen_forever(self):
+        import psycopg
+
+        while True:
+            try:
+                params = connections[self.alias].get_connection_params()
+                with psycopg.connect(**params, autocommit=True) as conn:
+                    conn.execute(f'LISTEN {PG_CHANNEL}')
+                    for notify in conn.notifies():
+                        self._deliver(notify.payload)
+            except Exception:
+                logger.exception("Pub/sub listener lost its connection; reconnecting")
+            time.sleep(self.reconnect_delay)
+
+    def _deliver(self, payload):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed pub/sub payload")
+            return
+        self.hub.deliver(data['channel'], data['message'])
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend_path():
+    path = getattr(settings, 'PUBSUB_BACKEND', None)
+    if path:
+        return path
+    if connections['default'].vendor == 'postgresql':
+        return 'myjobs_backend.pubsub.PostgresBackend'
+    return 'myjobs_backend.pubsub.LocalBackend'
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            backend_class = import_string(backend_path())
+            if issubclass(backend_class, LocalBackend) and int(os.getenv('WEB_CONCURRENCY', '1')) > 1:
+                logger.error(
+                    "PUBSUB_BACKEND is LocalBackend but WEB_CONCURRENCY=%s: messages published by one "
+                    "worker won't reach subscribers of the others. Use PostgresBackend.",
+                    os.getenv('WEB_CONCURRENCY'),
+                )
+            _backend = backend_class(hub)
+        return _backend
+
+
+# -----------------------
+# API
+# -----------------------
+def publish(channel, message):
+    try:
+        get_backend().publish(channel, message)
+    except Exception:
+        # Notifications are best effort; clients resync through ?since=.
+        logger.exception("Failed to publish to %s", channel)
+
+
+def publish_on_commit(channel, message):
+    transaction.on_commit(lambda: publish(channel, message))
+
+
+def subscribe(channels, maxsize=100):
+    """Subscription to ``channels`` for the running event loop; use as a context manager."""
+    get_backend().start()
+    return hub.subscribe(channels, maxsize)
@@ -0,0 +1,155 @@
+"""
+Declarative per-view query budgets.
+
+Class-based views declare a ``query_budget`` attribute, function views use the
+``@query_budget(...)`` decorator (placed above ``@api_view``):
+
+    class FacultySearchView(APIView):
+        query_budget = QueryBudget(5)
+
+    @query_budget(2)
+    @api_view(['GET'])
+    def my_jobs(request): ...
+
+Budgets are checked by ``QueryBudgetTestMixin`` in tests, by
+``manage.py benchmark_endpoints --check-budgets`` and, when
+``QUERY_BUDGET_ENFORCE`` is on, by ``QueryBudgetMiddleware`` which logs
+violations together with the offending SQL fingerprints.
+"""
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from .middleware_base import HybridMiddleware
+from .query_log import acapture, capture
+from .sql_fingerprint import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+# TestCase wraps each test in a transaction, turning a view's atomic blocks
+# into savepoints that production never runs
+_SAVEPOINT = re.compile(r'^\s*(RELEASE |ROLLBACK TO )?SAVEPOINT\b', re.IGNORECASE)
+
+
+class QueryBudget:
+    """Maximum number of queries: ``fixed + per_item * <items in response>``."""
+
+    def __init__(self, fixed, per_item=0, methods=('GET',)):
+        self.fixed = fixed
+        self.per_item = per_item
+        self.methods = tuple(m.upper() for m in methods)
+
+    def applies_to(self, method):
+        return method.upper() in self.methods
+
+    def limit(self, item_count=0):
+        return self.fixed + self.per_item * item_count
+
+    def __repr__(self):
+        return f"QueryBudget(fixed={self.fixed}, per_item={self.per_item})"
+
+
+def query_budget(fixed, per_item=0, methods=('GET',)):
+    """Attach a QueryBudget to a function-based view."""
+    def decorator(view):
+        view.query_budget = QueryBudget(fixed, per_item, methods)
+        return view
+    return decorator
+
+
+def get_query_budget(view_func):
+    """Return the budget declared for a resolved view callable, if any."""
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None and hasattr(view_func, 'view_class'):
+        budget = getattr(view_func.view_class, 'query_budget', None)
+    return budget
+
+
+def response_item_count(response):
+    """Number of top-level records in a (DRF) response body."""
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return len(data['results'])
+    if isinstance(data, list):
+        return len(data)
+    return 0
+
+
+def check_budget(view_func, method, response, sql_statements):
+    """
+    Compare executed SQL against the view's budget. Returns ``None`` when the
+    view has no applicable budget, otherwise a dict describing the outcome.
+    """
+    budget = get_query_budget(view_func)
+    if budget is None or not budget.applies_to(method):
+        return None
+    limit = budget.limit(response_item_count(response))
+    return {
+        'limit': limit,
+        'queries': len(sql_statements),
+        'ok': len(sql_statements) <= limit,
+        'fingerprints': Counter(fingerprint_sql(sql) for sql in sql_statements).most_common(),
+    }
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin:
+
+        self.assertWithinQueryBudget(self.client, '/api/jobs/', HTTP_AUTHORIZATION=...)
+        self.assertWithinQueryBudget(self.client, url, 'post', {...}, content_type='application/json')
+    """
+
+    def assertWithinQueryBudget(self, client, url, method='get', data=None, **extra):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(client, method.lower())(url, data, **extra)
+        sqls = [q['sql'] for q in ctx.captured_queries if not _SAVEPOINT.match(q['sql'])]
+        result = check_budget(resolve(url.split('?')[0]).func, method.upper(), response, sqls)
+        if result is None:
+            self.fail(f"{method.upper()} {url} has no query budget declared")
+        if not result['ok']:
+            detail = "\n".join(f"  {n}x {fp}" for fp, n in result['fingerprints'])
+            self.fail(f"{url} ran {result['queries']} queries, budget is {result['limit']}:\n{detail}")
+        return response
+
+
+class QueryBudgetMiddleware(HybridMiddleware):
+    """
+    Debug middleware: records every statement a request executes and logs a
+    warning when the resolved view exceeds its budget.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENFORCE', settings.DEBUG):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        with capture(request) as queries:
+            response = self.get_response(request)
+        return self.check(request, response, queries)
+
+    async def ahandle(self, request):
+        async with acapture(request) as queries:
+            response = await self.get_response(request)
+        return self.check(request, response, queries)
+
+    @staticmethod
+    def check(request, response, queries):
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            result = check_budget(match.func, request.method, response, [s.sql for s in queries.statements])
+            if result and not result['ok']:
+                logger.warning(
+                    "Query budget exceeded for %s %s (%s): %d queries, budget %d; top fingerprints: %s",
+                    request.method, request.path, match.view_name,
+                    result['queries'], result['limit'],
+                    "; ".join(f"{n}x {fp}" for fp, n in result['fingerprints'][:5]),
+                )
+        return response
@@ -0,0 +1,128 @@
+"""
+The SQL a request runs, recorded once for everything that looks at it.
+
+QueryLogMiddleware (near the top of MIDDLEWARE) installs a single
+execute_wrapper per connection and keeps each statement, with its alias,
+parameters and duration, on ``request.query_log``. The request metrics, the
+profiler's SQL log, SQL stats, query budgets and replica stickiness all read
+from it instead of wrapping every statement once each:
+
+    with capture(request) as queries:
+        response = self.get_response(request)
+    len(queries.statements)
+
+``capture()`` installs the recorder itself when the middleware didn't, so the
+consumers also work on their own (e.g. in tests). Async middleware uses
+``acapture()``: under ASGI the ORM runs on sync_to_async's thread-sensitive
+thread, whose connections are not the event loop's, so the wrappers are
+installed there.
+"""
+import time
+from collections import namedtuple
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from .middleware_base import HybridMiddleware
+
+Statement = namedtuple('Statement', 'alias sql params many duration_ms')
+
+
+class QueryLog:
+    def __init__(self):
+        self.statements = []
+
+    def recorder(self, alias):
+        def record(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.statements.append(Statement(alias, sql, params, many, (time.perf_counter() - started) * 1000))
+        return record
+
+    @contextmanager
+    def recording(self):
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(self.recorder(conn.alias)))
+            yield self
+
+    @asynccontextmanager
+    async def arecording(self):
+        # The thread every sync_to_async() call of this request runs on
+        stack = ExitStack()
+        await sync_to_async(stack.enter_context)(self.recording())
+        try:
+            yield self
+        finally:
+            await sync_to_async(stack.close)()
+
+
+class Capture:
+    """The statements of ``log`` run while a ``capture()`` block was open."""
+
+    def __init__(self, log):
+        self.log = log
+        self.start = len(log.statements)
+        self.end = None
+
+    @property
+    def statements(self):
+        return self.log.statements[self.start:self.end]
+
+    @property
+    def duration_ms(self):
+        return sum(statement.duration_ms for statement in self.statements)
+
+
+@contextmanager
+def capture(request):
+    log = getattr(request, 'query_log', None)
+    if log is not None:
+        scope = Capture(log)
+        try:
+            yield scope
+        finally:
+            scope.end = len(log.statements)
+        return
+
+    log = request.query_log = QueryLog()
+    scope = Capture(log)
+    try:
+        with log.recording():
+            yield scope
+    finally:
+        scope.end = len(log.statements)
+        del request.query_log
+
+
+@asynccontextmanager
+async def acapture(request):
+    """capture() for async middleware."""
+    if getattr(request, 'query_log', None) is not None:
+        with capture(request) as scope:
+            yield scope
+        return
+
+    log = request.query_log = QueryLog()
+    scope = Capture(log)
+    try:
+        async with log.arecording():
+            yield scope
+    finally:
+        scope.end = len(log.statements)
+        del request.query_log
+
+
+class QueryLogMiddleware(HybridMiddleware):
+    def handle(self, request):
+        request.query_log = QueryLog()
+        with request.query_log.recording():
+            return self.get_response(request)
+
+    async def ahandle(self, request):
+        request.query_log = QueryLog()
+        async with request.query_log.arecording():
+            return await self.get_response(request)
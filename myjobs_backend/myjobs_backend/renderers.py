@@ -0,0 +1,158 @@
+"""
+Fast DRF renderers.
+
+ORJSONRenderer is a drop-in replacement for rest_framework's JSONRenderer:
+output matches DRF's encoder (ISO 8601 datetimes with 'Z' for UTC, Decimal
+as float, lazy strings forced to str) but is produced by orjson.
+MessagePackRenderer serves the same data to clients sending
+``Accept: application/msgpack``; it needs the optional ``msgpack`` package.
+CamelCaseJSONRenderer emits camelCase keys for clients asking for
+``application/vnd.facultyfinder.camel+json`` or ``?format=camel``.
+
+The JSON renderers can also encode a list incrementally (``stream_array``),
+which StreamingHttpResponse views use so streamed bodies match the
+negotiated format. MessagePack arrays carry their length up front, so that
+renderer has no streaming form.
+"""
+import datetime
+import decimal
+import uuid
+
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_default(obj):
+    """Fallback for types orjson/msgpack don't handle natively, mirroring DRF's JSONEncoder."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Serializers will coerce decimals to strings by default.
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        try:
+            return dict(obj)
+        except Exception:
+            return list(obj)
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = ORJSON_OPTIONS
+        # The browsable API asks for indented output; orjson only does 2 spaces.
+        renderer_context = renderer_context or {}
+        if renderer_context.get('indent') or 'indent=' in (accepted_media_type or ''):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encode_default, option=options)
+
+    def stream_array(self, items, flush_bytes=64 * 1024):
+        """
+        Encode ``items`` as a JSON array, one ``render`` call per item, yielding
+        roughly ``flush_bytes`` sized chunks. The opening bracket is sent immediately.
+        """
+        yield b'['
+        buffer = []
+        size = 0
+        separator = b''
+        for item in items:
+            chunk = separator + self.render(item)
+            separator = b','
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= flush_bytes:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        buffer.append(b']')
+        yield b''.join(buffer)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        return representation[:-6] + 'Z' if representation.endswith('+00:00') else representation
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return encode_default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+# -----------------------
+# camelCase output
+# -----------------------
+# snake_case -> camelCase for every key seen so far. Serializer field names are
+# a small fixed set, so after warm-up converting a payload is dict lookups
+# only; the cap keeps data-derived keys (e.g. id maps) from growing it forever.
+_CAMEL_KEYS = {}
+_CAMEL_KEYS_MAX = 10000
+
+
+def snake_to_camel(name):
+    camel = _CAMEL_KEYS.get(name)
+    if camel is None:
+        if '_' not in name.strip('_'):
+            camel = name
+        else:
+            head, *rest = name.split('_')
+            camel = head + ''.join(part[:1].upper() + part[1:] for part in rest)
+        if len(_CAMEL_KEYS) < _CAMEL_KEYS_MAX:
+            _CAMEL_KEYS[name] = camel
+    return camel
+
+
+def camelize(data):
+    if isinstance(data, dict):
+        return {
+            (snake_to_camel(key) if isinstance(key, str) else key): camelize(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [camelize(item) for item in data]
+    return data
+
+
+class CamelCaseJSONRenderer(ORJSONRenderer):
+    media_type = 'application/vnd.facultyfinder.camel+json'
+    format = 'camel'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(camelize(data), accepted_media_type, renderer_context)
@@ -12,7 +12,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import importlib.util
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -65,15 +67,33 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
 
+    # orjson-based JSON (myjobs_backend/renderers.py, parsers.py); MessagePack
+    # is negotiated via Accept/Content-Type when the optional msgpack package
+    # is installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'myjobs_backend.renderers.ORJSONRenderer',
+        'myjobs_backend.renderers.CamelCaseJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'myjobs_backend.parsers.ORJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ],
 }
 
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].insert(2, 'myjobs_backend.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].insert(1, 'myjobs_backend.parsers.MessagePackParser')
+
 
 MIDDLEWARE = [
+    'myjobs_backend.middleware.RequestIdMiddleware',
+    'myjobs_backend.query_log.QueryLogMiddleware',
+    'myjobs_backend.middleware.RequestMetricsMiddleware',
+    'myjobs_backend.middleware.ProfilingMiddleware',
+    'myjobs_backend.middleware.SQLStatsMiddleware',
+    'myjobs_backend.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -83,8 +103,90 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'myjobs_backend.db_router.ReplicaStickinessMiddleware',
+    'myjobs_backend.query_budget.QueryBudgetMiddleware',
 ]
 
+# Response compression (see myjobs_backend/compression.py). Brotli is used
+# when the optional ``brotli`` package is installed and the client accepts it.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# Delta sync of job lists (?since=<cursor>, see jobs/sync.py): cursors never
+# pass events younger than the safety window, and pruned events are kept for
+# the retention period.
+SYNC_SAFETY_WINDOW = int(os.getenv("SYNC_SAFETY_WINDOW", "30"))
+SYNC_EVENT_RETENTION_DAYS = int(os.getenv("SYNC_EVENT_RETENTION_DAYS", "30"))
+
+# Live job notifications (/api/jobs/events/, ASGI only). PUBSUB_BACKEND fans
+# messages out across workers: LocalBackend for a single process,
+# PostgresBackend (LISTEN/NOTIFY) for several, the default on Postgres.
+# See myjobs_backend/pubsub.py.
+PUBSUB_BACKEND = os.getenv("PUBSUB_BACKEND")
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_MAX_DURATION = int(os.getenv("SSE_MAX_DURATION", "3600"))
+
+# Route the recruiter faculty detail endpoint to its async view
+# (users/views_async.py); worth it when served through asgi.py.
+USE_ASYNC_READ_VIEWS = os.getenv("USE_ASYNC_READ_VIEWS", "False") == "True"
+
+# /api/batch/: max sub-requests per batch and threads used to run them
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "4"))
+
+# Log views that exceed their declared query budget (see myjobs_backend/query_budget.py)
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", str(DEBUG)) == "True"
+
+# Request metrics (exposed to staff at /metrics). Set METRICS_DIR to a directory
+# shared by all gunicorn workers on the node to aggregate across workers.
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = int(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+# Worker snapshots (metrics and SQL stats) not rewritten for this long are
+# taken to belong to exited workers and folded into the retired totals
+METRICS_SNAPSHOT_MAX_AGE = int(os.getenv("METRICS_SNAPSHOT_MAX_AGE", "600"))
+
+# Per-request profiling (myjobs_backend/profiling.py). Staff opt in with an
+# `X-Profile: 1` header; PROFILING_SAMPLE_RATE stack-samples that fraction of
+# all requests (e.g. 0.001).
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / 'profiles'))
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_MAX_ARTIFACTS = int(os.getenv("PROFILING_MAX_ARTIFACTS", "200"))
+
+# Per-view SQL statistics and slow-query EXPLAIN capture (myjobs_backend/sql_stats.py).
+# Inspect with `manage.py sql_stats` or GET /api/sql-stats/ (staff). Sampled
+# slow SELECTs are re-run under EXPLAIN ANALYZE, so it is off unless DEBUG.
+SQL_STATS_ENABLED = os.getenv("SQL_STATS_ENABLED", str(DEBUG)) == "True"
+SQL_STATS_DIR = os.getenv("SQL_STATS_DIR", METRICS_DIR)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.05"))
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+
+# Rows fetched per server-side cursor round trip by /api/faculty/search/?stream=1
+FACULTY_SEARCH_STREAM_CHUNK_SIZE = int(os.getenv("FACULTY_SEARCH_STREAM_CHUNK_SIZE", "2000"))
+
+# Cached faculty search records: fresh for CACHE_TIMEOUT seconds, then served
+# stale for up to STALE_TIMEOUT more while one worker rebuilds them.
+FACULTY_SEARCH_CACHE_TIMEOUT = int(os.getenv("FACULTY_SEARCH_CACHE_TIMEOUT", "60"))
+FACULTY_SEARCH_STALE_TIMEOUT = int(os.getenv("FACULTY_SEARCH_STALE_TIMEOUT", "300"))
+# Results with more records than this are streamed uncached instead
+FACULTY_SEARCH_CACHE_MAX_RECORDS = int(os.getenv("FACULTY_SEARCH_CACHE_MAX_RECORDS", "2000"))
+
+# Faculty job feeds are shared per department set and invalidated on job changes
+FACULTY_FEED_CACHE_TIMEOUT = int(os.getenv("FACULTY_FEED_CACHE_TIMEOUT", "600"))
+
+# Recruiter faculty detail payloads, invalidated per faculty by users/signals.py
+FACULTY_DETAIL_CACHE_TIMEOUT = int(os.getenv("FACULTY_DETAIL_CACHE_TIMEOUT", "3600"))
+# Maximum faculty per /api/recruiter/faculty/compare/ request
+FACULTY_COMPARE_MAX = int(os.getenv("FACULTY_COMPARE_MAX", "10"))
+
+# Exports with more profiles than this are produced by a background ExportJob
+EXPORT_SYNC_MAX_ROWS = int(os.getenv("EXPORT_SYNC_MAX_ROWS", "5000"))
+# A job still 'running' after this long lost its worker; it is retried up to
+# EXPORT_JOB_MAX_ATTEMPTS times in all, then marked failed
+EXPORT_JOB_STALE_SECONDS = int(os.getenv("EXPORT_JOB_STALE_SECONDS", "1800"))
+EXPORT_JOB_MAX_ATTEMPTS = int(os.getenv("EXPORT_JOB_MAX_ATTEMPTS", "3"))
+
 
 # CORS Settings
 # CORS settings
@@ -101,12 +203,35 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Uploaded files are stored once per content under blobs/<sha256>
+# (myjobs_backend/storage.py); `manage.py gc_blobs` deletes blobs unreferenced
+# for BLOB_GC_GRACE_HOURS. Static files keep Django's default storage.
+STORAGES = {
+    "default": {"BACKEND": "myjobs_backend.storage.DedupFileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+BLOB_GC_GRACE_HOURS = int(os.getenv("BLOB_GC_GRACE_HOURS", "24"))
+# Total size of the files of one faculty profile and its records
+PROFILE_STORAGE_QUOTA_MB = int(os.getenv("PROFILE_STORAGE_QUOTA_MB", "200"))
+
+# Chunked uploads (users/uploads.py) send and read these headers
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset', 'upload-checksum')
+CORS_EXPOSE_HEADERS = ['Location', 'Upload-Offset', 'Upload-Length']
+
 
 
 # Media files (resumes, etc.)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Chunked uploads (users/uploads.py): partial files live in UPLOAD_SESSION_DIR,
+# which every worker must share and which should sit on the same file system
+# as MEDIA_ROOT so finished files are moved rather than copied. Sessions idle
+# for UPLOAD_SESSION_TTL_HOURS are removed by `manage.py prune_upload_sessions`.
+UPLOAD_SESSION_DIR = os.getenv("UPLOAD_SESSION_DIR", os.path.join(BASE_DIR, 'partial_uploads'))
+UPLOAD_CHUNK_MAX_BYTES = int(os.getenv("UPLOAD_CHUNK_MAX_BYTES", str(8 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
 # Authentication settings
 AUTH_USER_MODEL = 'users.CustomUser'
 
@@ -169,19 +294,50 @@ else:
         }
     }
 
-# Database connection optimization for both environments
-# for db_config in DATABASES.values():
-#     if 'OPTIONS' not in db_config:
-#         db_config['OPTIONS'] = {}
-    
-#     db_config['OPTIONS'].update({
-#         'MAX_CONNS': db_config['OPTIONS'].get('MAX_CONNS', 20),
-#         'MIN_CONNS': db_config['OPTIONS'].get('MIN_CONNS', 5),
-#         'connect_timeout': 60,
-#         'server_side_binding': True,
-#     })
-  
-#     db_config['CONN_MAX_AGE'] = 600
+# Optional read replica (myjobs_backend/db_router.py). Search, job statistics,
+# lookups and exports read from it; users who wrote within the last
+# REPLICA_STICKY_SECONDS keep reading from the primary. To try it locally,
+# point REPLICA_DATABASE_URL at a second database (or at the same one). Tests
+# mirror it onto the default test database.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+if REPLICA_DATABASE_URL:
+    DATABASES["replica"] = dj_database_url.config(
+        default=REPLICA_DATABASE_URL,
+        conn_max_age=600,
+        ssl_require=bool(DATABASE_URL),
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ['myjobs_backend.db_router.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+# Connection handling for every alias. Health checks make Django test a
+# reused connection before a request uses it, so connections dropped by a
+# failover are replaced instead of failing the request. With DB_POOL=True each
+# process draws from a psycopg_pool ConnectionPool (requires psycopg[pool])
+# instead of keeping persistent connections; pool size, wait time and
+# utilization are exported at /metrics (see myjobs_backend/db_pool.py).
+DB_POOL = os.getenv("DB_POOL", "False") == "True"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# Seconds a request waits for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Idle connections above the minimum are closed after this many seconds
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+# Connections are recycled after this many seconds
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+
+for db_config in DATABASES.values():
+    db_config["CONN_HEALTH_CHECKS"] = True
+    if DB_POOL:
+        # Pooling replaces persistent connections
+        db_config["CONN_MAX_AGE"] = 0
+        db_config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+            "max_idle": DB_POOL_MAX_IDLE,
+            "max_lifetime": DB_POOL_MAX_LIFETIME,
+        }
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -242,34 +398,44 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Performance Optimizations
 # -------------------------
 
-# Session settings for better performance
+# Session settings for better performance. Sessions live in the shared tier
+# only, so a logout is visible to every worker immediately.
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-SESSION_CACHE_ALIAS = 'default'
-
-# Simple in-memory cache for development
-if DEBUG:
-    CACHES = {
-        'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-            'LOCATION': 'faculty-finder-cache',
-        }
+SESSION_CACHE_ALIAS = 'shared'
+
+# Two-tier cache (myjobs_backend/cache.py): a per-process LRU in front of the
+# 'shared' backend. Set REDIS_URL to share the cache across workers and nodes;
+# without it the shared tier falls back to locmem (DEBUG) or the file cache.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'ff',
+    }
+elif DEBUG:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'faculty-finder-cache',
     }
 else:
-    # Redis for production (uncomment when Redis is available)
-    # CACHES = {
-    #     'default': {
-    #         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
-    #         'LOCATION': 'redis://127.0.0.1:6379/1',
-    #     }
-    # }
-    # Fallback to file-based cache for production without Redis
-    CACHES = {
-        'default': {
-            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
-            'LOCATION': '/tmp/faculty-finder-cache',
-        }
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/faculty-finder-cache',
     }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'myjobs_backend.cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "1000")),
+            'LOCAL_TIMEOUT': float(os.getenv("LOCAL_CACHE_TIMEOUT", "2")),
+        },
+    },
+    'shared': SHARED_CACHE,
+}
+
 # JWT Settings
 # ------------
 from datetime import timedelta
@@ -291,9 +457,19 @@ SIMPLE_JWT = {
 
 # Logging Configuration
 # --------------------
+# App loggers use lazy %-style arguments and are level-gated by LOG_LEVEL.
+# Records are handed to a queue on the request thread; a background
+# QueueListener does the file/console I/O (myjobs_backend/log_utils.py).
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {
+            '()': 'myjobs_backend.log_utils.RequestIdFilter',
+        },
+    },
     'formatters': {
         'verbose': {
             'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
@@ -303,32 +479,51 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'structured': {
+            '()': 'myjobs_backend.log_utils.StructuredFormatter',
+        },
     },
     'handlers': {
         'file': {
             'level': 'INFO',
             'class': 'logging.FileHandler',
             'filename': 'faculty_finder.log',
-            'formatter': 'verbose',
+            'formatter': 'structured',
         },
         'console': {
             'level': 'WARNING',
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        # Must sort after the handlers it wraps (dictConfig builds them alphabetically).
+        'queue': {
+            'class': 'myjobs_backend.log_utils.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
+            'filters': ['request_id'],
+        },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'WARNING',
     },
     'loggers': {
         'users': {
-            'handlers': ['console', 'file'],
-            'level': 'INFO',
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'jobs': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'myjobs_backend': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
             'propagate': False,
         },
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
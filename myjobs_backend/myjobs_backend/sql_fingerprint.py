@@ -0,0 +1,27 @@
+"""
+SQL fingerprinting: reduce a statement to its shape so that queries which
+differ only in their literal values group together.
+"""
+import re
+from functools import lru_cache
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\$\d+")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*\(.*\)", re.IGNORECASE | re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_sql(sql):
+    """
+    Normalise literals, placeholders, IN lists and multi-row VALUES so that
+    e.g. ``WHERE id = 7`` and ``WHERE id = 9`` share one fingerprint.
+    """
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    shape = _VALUES_LIST.sub("VALUES (...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
@@ -0,0 +1,201 @@
+"""
+Per-view SQL statistics and slow-query EXPLAIN capture.
+
+SQLStatsMiddleware times every statement, groups them by (view, SQL
+fingerprint) and keeps count / total / max time in this process. Statements
+slower than SLOW_QUERY_THRESHOLD_MS are, for a SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+fraction, re-run as ``EXPLAIN (ANALYZE, BUFFERS)`` on a background thread so
+the plan can be inspected later. Only SELECTs are explained, and those that
+lock rows (FOR UPDATE/SHARE) or have side effects get a plain EXPLAIN, since
+ANALYZE executes the statement. Off by default outside DEBUG.
+
+Like the metrics registry, each worker writes its snapshot to SQL_STATS_DIR
+so ``manage.py sql_stats`` and ``/api/sql-stats/`` can merge all workers.
+"""
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .metrics import read_snapshots, write_snapshot
+from .sql_fingerprint import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED = 5000
+MAX_PENDING_EXPLAINS = 10
+NOT_REPLAYABLE = re.compile(
+    r'\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b|\bFOR\s+KEY\s+SHARE\b'
+    r'|\b(?:pg_notify|nextval|setval|pg_advisory_\w*lock\w*)\s*\(',
+    re.IGNORECASE,
+)
+
+
+def explain_prefix(sql):
+    """
+    ANALYZE runs the statement again. That is harmless for a plain SELECT, but
+    not for one that takes row locks or has side effects; those only get
+    their estimated plan.
+    """
+    if NOT_REPLAYABLE.search(sql):
+        return 'EXPLAIN'
+    return 'EXPLAIN (ANALYZE, BUFFERS)'
+
+
+class SQLStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}    # (view, fingerprint) -> dict
+        self._plans = {}    # fingerprint -> {'plan', 'sql', 'duration_ms', 'captured_at'}
+        self._pending = set()
+        self._last_flush = 0.0
+        self._explainer = None
+
+    # -----------------------
+    # Recording
+    # -----------------------
+    def record(self, view, statements):
+        """``statements`` are query_log.Statement tuples."""
+        threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100)
+        sample_rate = getattr(settings, 'SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.05)
+        with self._lock:
+            for alias, sql, params, many, duration_ms in statements:
+                fingerprint = fingerprint_sql(sql)
+                key = (view, fingerprint)
+                entry = self._stats.get(key)
+                if entry is None:
+                    if len(self._stats) >= MAX_TRACKED:
+                        continue
+                    entry = self._stats[key] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow': 0}
+                entry['count'] += 1
+                entry['total_ms'] += duration_ms
+                entry['max_ms'] = max(entry['max_ms'], duration_ms)
+                if duration_ms >= threshold:
+                    entry['slow'] += 1
+                    # executemany params can't be replayed by EXPLAIN
+                    if not many and random.random() < sample_rate:
+                        self._schedule_explain(alias, sql, params, fingerprint, duration_ms)
+        self.maybe_flush()
+
+    def _schedule_explain(self, alias, sql, params, fingerprint, duration_ms):
+        """Called with the lock held."""
+        if connections[alias].vendor != 'postgresql' or not sql.lstrip().upper().startswith('SELECT'):
+            return
+        # One plan per fingerprint per interval, and never let the queue grow.
+        previous = self._plans.get(fingerprint)
+        interval = getattr(settings, 'SLOW_QUERY_EXPLAIN_INTERVAL', 300)
+        if previous and time.time() - previous['captured_at'] < interval:
+            return
+        if fingerprint in self._pending or len(self._pending) >= MAX_PENDING_EXPLAINS:
+            return
+        if self._explainer is None:
+            self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sql-explain')
+        self._pending.add(fingerprint)
+        self._explainer.submit(self._explain, alias, sql, params, fingerprint, duration_ms)
+
+    def _explain(self, alias, sql, params, fingerprint, duration_ms):
+        # Runs on the explainer thread, which has its own connection; the
+        # request's execute_wrapper is not installed there so this isn't recorded.
+        close_old_connections()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(f'{explain_prefix(sql)} {sql}', params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+        except Exception:
+            logger.warning("Could not EXPLAIN slow query %s", fingerprint, exc_info=True)
+            with self._lock:
+                self._pending.discard(fingerprint)
+            return
+        with self._lock:
+            self._pending.discard(fingerprint)
+            self._plans[fingerprint] = {
+                'plan': plan,
+                'sql': sql,
+                'duration_ms': round(duration_ms, 3),
+                'captured_at': time.time(),
+            }
+
+    # -----------------------
+    # Snapshots
+    # -----------------------
+    def snapshot(self):
+        with self._lock:
+            return {
+                'stats': [[view, fp, dict(entry)] for (view, fp), entry in self._stats.items()],
+                'plans': dict(self._plans),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._plans.clear()
+
+    def maybe_flush(self):
+        directory = getattr(settings, 'SQL_STATS_DIR', None)
+        now = time.monotonic()
+        if not directory or now - self._last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 5):
+            return
+        self._last_flush = now
+        self.flush(directory)
+
+    def flush(self, directory):
+        snapshot = self.snapshot()
+        if not snapshot['stats'] and not snapshot['plans']:
+            return  # e.g. ``manage.py sql_stats`` itself
+        if not write_snapshot(directory, 'sql-stats', snapshot):
+            # Our stats so far were folded into the retired totals; start over
+            self.reset()
+
+
+sql_stats = SQLStats()
+
+
+def merge_stats(snapshots):
+    """One snapshot with the per-(view, fingerprint) stats of ``snapshots`` combined."""
+    merged, plans = {}, {}
+    for snap in snapshots:
+        for row_view, fingerprint, entry in snap.get('stats', []):
+            total = merged.setdefault((row_view, fingerprint), {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow': 0})
+            total['count'] += entry['count']
+            total['total_ms'] += entry['total_ms']
+            total['max_ms'] = max(total['max_ms'], entry['max_ms'])
+            total['slow'] += entry['slow']
+        for fingerprint, plan in snap.get('plans', {}).items():
+            if fingerprint not in plans or plan['captured_at'] > plans[fingerprint]['captured_at']:
+                plans[fingerprint] = plan
+    return {'stats': [[view, fp, entry] for (view, fp), entry in merged.items()], 'plans': plans}
+
+
+def merged_report(limit=50, view=None):
+    """
+    Merge this process's stats with every worker snapshot in SQL_STATS_DIR and
+    return the top ``limit`` (view, fingerprint) rows by total time.
+    """
+    directory = getattr(settings, 'SQL_STATS_DIR', None)
+    if directory:
+        # Also notices whether our own stats were retired meanwhile
+        sql_stats.flush(directory)
+    snapshots = [sql_stats.snapshot(), *read_snapshots(directory, 'sql-stats', lambda a, b: merge_stats([a, b]))]
+    combined = merge_stats(snapshots)
+    merged = {(row_view, fp): entry for row_view, fp, entry in combined['stats'] if not view or row_view == view}
+    plans = combined['plans']
+
+    rows = sorted(merged.items(), key=lambda item: item[1]['total_ms'], reverse=True)[:limit]
+    return [
+        {
+            'view': row_view,
+            'fingerprint': fingerprint,
+            'count': entry['count'],
+            'total_ms': round(entry['total_ms'], 3),
+            'mean_ms': round(entry['total_ms'] / entry['count'], 3),
+            'max_ms': round(entry['max_ms'], 3),
+            'slow': entry['slow'],
+            'explain': plans.get(fingerprint),
+        }
+        for (row_view, fingerprint), entry in rows
+    ]
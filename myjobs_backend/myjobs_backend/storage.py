@@ -0,0 +1,96 @@
+"""
+Content-addressed, deduplicated media storage.
+
+``DedupFileSystemStorage`` ignores the ``upload_to`` name of an upload and
+stores it under the sha256 of its content, computed while the upload is
+streamed to disk:
+
+    blobs/3f/a2/3fa2...c9.pdf
+
+Saving a file that is already stored only refreshes the existing blob, so
+the same transcript uploaded as a Transcript, a Document and a job
+application resume takes up space once. Blobs are shared, so ``delete()``
+leaves them alone: users/signals.py keeps a StoredBlob reference count per
+blob and ``manage.py gc_blobs`` removes blobs nothing refers to any more.
+Each save checks and writes its blob while holding the blob's StoredBlob row
+lock (users.blobs.leased_blob), the same lock gc_blobs deletes under.
+Files stored before this backend keep their old names and behave as before.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+BLOB_PREFIX = 'blobs/'
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def blob_name(digest, extension=''):
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+class DedupFileSystemStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # The content decides the final name; equal names mean equal files.
+        return name
+
+    def _save(self, name, content):
+        from users.blobs import leased_blob  # users.blobs imports this module
+
+        extension = os.path.splitext(name)[1].lower()[:16]
+        tmp_dir = self.path(BLOB_PREFIX + 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (large uploads, finished upload sessions): hash it in place
+            source = content.temporary_file_path()
+            with open(source, 'rb') as fh:
+                for block in iter(lambda: fh.read(COPY_CHUNK_SIZE), b''):
+                    digest.update(block)
+            move = file_move_safe
+        else:
+            fd, source = tempfile.mkstemp(dir=tmp_dir)
+            with os.fdopen(fd, 'wb') as fh:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    fh.write(chunk)
+            move = os.replace
+
+        name = blob_name(digest.hexdigest(), extension)
+        full_path = self.path(name)
+        size = os.path.getsize(source)
+        with leased_blob(name, size):
+            if os.path.exists(full_path):
+                # Also restart the orphan scan's grace period for a blob that is being reused
+                os.utime(full_path)
+                if move is os.replace:
+                    os.remove(source)
+                return name
+
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if move is os.replace:
+                os.replace(source, full_path)
+            else:
+                move(source, full_path, allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+    def delete(self, name):
+        if is_blob(name):
+            return  # possibly shared; gc_blobs removes unreferenced blobs
+        super().delete(name)
+
+    def delete_blob(self, name):
+        """Really remove a blob; only for gc_blobs."""
+        super().delete(name)
@@ -0,0 +1,517 @@
+import asyncio
+import datetime
+import decimal
+import gzip
+import json
+import os
+import tempfile
+import time
+import uuid
+import zipfile
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from users.exports import run_export_job
+from . import pubsub
+from .batch import build_subrequest, parse_batch, run_batch
+from .cache import aget_or_build, bump_namespace, namespace_version, namespaced_key
+from .compression import brotli, cache_compressed, compress, negotiate, supported_encodings
+from .db_router import (
+    REPLICA, ReplicaRouter, ReplicaStickinessMiddleware, _use_replica, is_pinned, on_primary,
+    pin_to_primary, reading_from_primary, reading_from_replica, replica_configured, should_use_replica,
+)
+from .log_utils import request_id_var
+from .middleware import (
+    CompressionMiddleware, RequestIdMiddleware, RequestMetricsMiddleware, SQLStatsMiddleware,
+)
+from .metrics import Registry, read_snapshots, render_prometheus, retire_snapshot, worker_id, write_snapshot
+from .profiling import _tracing_memory, profile_request
+from .query_budget import QueryBudgetMiddleware
+from .query_log import QueryLog, QueryLogMiddleware, Statement, capture
+from .renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+from .sql_stats import explain_prefix
+
+
+def two_tier_over_files(location):
+    return {
+        'default': {
+            'BACKEND': 'myjobs_backend.cache.TwoTierCache',
+            'LOCATION': 'shared',
+            'OPTIONS': {'LOCAL_TIMEOUT': 0},
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        },
+    }
+
+
+class NamespaceVersionTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings_override = override_settings(CACHES=two_tier_over_files(self.tmp.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_bumps_change_namespaced_keys(self):
+        cache = caches['default']
+        before = namespaced_key('things', 'a', cache)
+        bump_namespace('things', cache)
+        self.assertNotEqual(namespaced_key('things', 'a', cache), before)
+
+    def test_version_survives_default_timeout_on_file_cache(self):
+        cache = caches['default']
+        namespace_version('lookups', cache)
+        bump_namespace('lookups', cache)
+        version = bump_namespace('lookups', cache)
+        self.assertEqual(version, 3)
+
+        # Well past the 300 s default timeout the incr would have applied
+        later = time.time() + 3600
+        with mock.patch('django.core.cache.backends.filebased.time.time', return_value=later):
+            self.assertEqual(namespace_version('lookups', cache), 3)
+            self.assertEqual(namespace_version('lookups', caches['shared']), 3)
+
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+
+def fake_request(method='GET', user=None):
+    return SimpleNamespace(method=method, user=user or AnonymousUser())
+
+
+@override_settings(CACHES=LOCMEM_CACHES, REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        for target in ('myjobs_backend.db_router.replica_configured', 'users.exports.replica_configured'):
+            patcher = mock.patch(target, return_value=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.router = ReplicaRouter()
+        self.user = SimpleNamespace(pk=7, is_authenticated=True)
+
+    def test_reads_follow_context(self):
+        self.assertEqual(self.router.db_for_read(None), 'default')
+        with reading_from_replica():
+            self.assertEqual(self.router.db_for_read(None), REPLICA)
+            self.assertEqual(self.router.db_for_write(None), 'default')
+            with reading_from_primary():
+                self.assertEqual(self.router.db_for_read(None), 'default')
+            self.assertEqual(on_primary(lambda: self.router.db_for_read(None))(), 'default')
+        self.assertEqual(self.router.db_for_read(None), 'default')
+        self.assertFalse(self.router.allow_migrate(REPLICA, 'users'))
+
+    def test_only_safe_methods_of_unpinned_users_use_replica(self):
+        self.assertTrue(should_use_replica(fake_request('GET')))
+        self.assertTrue(should_use_replica(fake_request('GET', self.user)))
+        self.assertFalse(should_use_replica(fake_request('POST', self.user)))
+        pin_to_primary(self.user)
+        self.assertFalse(should_use_replica(fake_request('GET', self.user)))
+        self.assertTrue(should_use_replica(fake_request('GET', SimpleNamespace(pk=8, is_authenticated=True))))
+
+    def run_middleware(self, method, sql):
+        request = fake_request(method, self.user)
+        request.query_log = QueryLog()
+
+        def get_response(request):
+            request.query_log.statements.append(Statement('default', sql, None, False, 1.0))
+
+        ReplicaStickinessMiddleware(get_response)(request)
+
+    def test_middleware_pins_after_a_write(self):
+        self.run_middleware('POST', 'SELECT 1')
+        self.assertFalse(is_pinned(self.user))
+        self.run_middleware('POST', '  update "users_facultyprofile" SET ...')
+        self.assertTrue(is_pinned(self.user))
+
+    def test_export_jobs_read_from_replica_unless_pinned(self):
+        seen = []
+        with mock.patch('users.exports.export_profiles', return_value=[]), \
+                mock.patch('users.exports.export_rows', side_effect=lambda rows: seen.append(_use_replica.get()) or []):
+            for pin in (False, True):
+                if pin:
+                    pin_to_primary(self.user)
+                job = mock.Mock(recruiter=self.user, source='search', file_format='csv', filters={}, pk=1)
+                run_export_job(job)
+                self.assertEqual(job.status, 'done')
+        self.assertEqual(seen, [True, False])
+
+
+@skipUnless(replica_configured(), 'REPLICA_DATABASE_URL is not set')
+class ReplicaMirrorTests(TestCase):
+    """In tests the replica alias mirrors the default test database."""
+    databases = {'default', REPLICA}
+
+    def test_replica_reads_see_test_data(self):
+        user = get_user_model().objects.create_user(email='mirror@example.com', password='x')
+        with reading_from_replica():
+            users = get_user_model().objects.filter(pk=user.pk)
+            self.assertEqual(users.db, REPLICA)
+            self.assertTrue(users.exists())
+
+
+class PubSubBackendTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(pubsub, '_backend', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(PUBSUB_BACKEND=None)
+    def test_defaults_to_postgres_on_postgres(self):
+        self.assertEqual(connections['default'].vendor, 'postgresql')
+        self.assertIsInstance(pubsub.get_backend(), pubsub.PostgresBackend)
+
+    @override_settings(PUBSUB_BACKEND='myjobs_backend.pubsub.LocalBackend')
+    def test_local_backend_with_several_workers_logs_an_error(self):
+        with mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '4'}), \
+                self.assertLogs('myjobs_backend.pubsub', 'ERROR'):
+            self.assertIsInstance(pubsub.get_backend(), pubsub.LocalBackend)
+
+
+@override_settings(BATCH_MAX_WORKERS=3)
+class BatchDispatchTests(SimpleTestCase):
+    def test_sub_requests_keep_request_id_and_order(self):
+        def fake_dispatch(request, entry):
+            time.sleep(0.01 * (3 - entry[0]))
+            return {'id': entry[0], 'request_id': request_id_var.get()}
+
+        token = request_id_var.set('req-42')
+        try:
+            with mock.patch('myjobs_backend.batch.dispatch', side_effect=fake_dispatch), \
+                    mock.patch('myjobs_backend.batch.close_old_connections'):
+                results = run_batch(None, [(i, '/api/x/', '') for i in range(3)])
+        finally:
+            request_id_var.reset(token)
+        self.assertEqual(results, [{'id': i, 'request_id': 'req-42'} for i in range(3)])
+
+    def test_only_api_paths_can_be_batched(self):
+        self.assertEqual(
+            parse_batch({'requests': ['/api/jobs/?status=open', {'id': 'd', 'path': '/api/degrees/'}]}),
+            [(0, '/api/jobs/', 'status=open'), ('d', '/api/degrees/', '')],
+        )
+        for path in ('/admin/', '/metrics', '/api/../admin/', '/api/./batch/', '/api/batch/', '//evil/api/'):
+            with self.subTest(path), self.assertRaises(ValidationError):
+                parse_batch({'requests': [path]})
+
+    def test_subrequest_is_authenticated_as_the_batch_user(self):
+        user, token = SimpleNamespace(is_active=True), object()
+        batch = SimpleNamespace(META={'HTTP_AUTHORIZATION': 'Bearer other'}, user=user, auth=token)
+        sub = Request(build_subrequest(batch, '/api/jobs/', ''))
+        self.assertIs(sub.user, user)
+        self.assertIs(sub.auth, token)
+        self.assertNotIn('HTTP_AUTHORIZATION', sub.META)
+
+
+class QueryLogTests(SimpleTestCase):
+    def test_nested_captures_share_one_recorder(self):
+        request = SimpleNamespace()
+        conn = connections['default']
+        with capture(request) as outer:
+            self.assertEqual(len(conn.execute_wrappers), 1)
+            conn.execute_wrappers[0](lambda *args: None, 'SELECT 1', None, False, {})
+            with capture(request) as inner:
+                self.assertEqual(len(conn.execute_wrappers), 1)
+                conn.execute_wrappers[0](lambda *args: None, 'SELECT 2', (1,), False, {})
+        self.assertEqual(conn.execute_wrappers, [])
+        self.assertFalse(hasattr(request, 'query_log'))
+        self.assertEqual([s.sql for s in outer.statements], ['SELECT 1', 'SELECT 2'])
+        self.assertEqual([(s.alias, s.sql, s.params) for s in inner.statements], [('default', 'SELECT 2', (1,))])
+
+    def test_locking_and_side_effect_selects_are_not_analyzed(self):
+        self.assertEqual(explain_prefix('SELECT * FROM "jobs_job" WHERE id = %s'), 'EXPLAIN (ANALYZE, BUFFERS)')
+        self.assertEqual(explain_prefix('SELECT * FROM "users_exportjob" FOR UPDATE SKIP LOCKED'), 'EXPLAIN')
+        self.assertEqual(explain_prefix('SELECT pg_notify(%s, %s)'), 'EXPLAIN')
+
+
+@override_settings(METRICS_SNAPSHOT_MAX_AGE=60)
+class WorkerSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, data, age=0):
+        path = os.path.join(self.tmp.name, f'metrics-{name}.json')
+        with open(path, 'w') as fh:
+            json.dump(data, fh)
+        if age:
+            os.utime(path, (time.time() - age, time.time() - age))
+        return path
+
+    def counter(self, value):
+        return {'counters': [['http_requests_total', [['view', 'jobs']], value]], 'histograms': [], 'gauges': []}
+
+    def test_silent_workers_are_retired_not_forgotten(self):
+        write_snapshot(self.tmp.name, 'metrics', self.counter(100))
+        self.write('live', self.counter(2))
+        exited = self.write('exited', self.counter(5), age=120)
+
+        snapshots = read_snapshots(self.tmp.name, 'metrics', retire_snapshot)
+        self.assertFalse(os.path.exists(exited))
+        # Our own file is left out (callers use the in-memory registry)
+        self.assertEqual(render_prometheus(snapshots).count('http_requests_total{view="jobs"} 7'), 1)
+
+        self.write('recycled', self.counter(1), age=120)
+        snapshots = read_snapshots(self.tmp.name, 'metrics', retire_snapshot)
+        self.assertIn('http_requests_total{view="jobs"} 8', render_prometheus(snapshots))
+
+    def test_retired_worker_starts_over(self):
+        registry = Registry()
+        registry.inc('http_requests_total', (('view', 'jobs'),), 3)
+        registry.flush(self.tmp.name)
+        own = os.path.join(self.tmp.name, f'metrics-{worker_id()}.json')
+        os.utime(own, (time.time() - 120, time.time() - 120))
+        with mock.patch('myjobs_backend.metrics.worker_id', return_value='scraper'):
+            read_snapshots(self.tmp.name, 'metrics', retire_snapshot)
+        self.assertFalse(os.path.exists(own))
+
+        registry.inc('http_requests_total', (('view', 'jobs'),))
+        registry.flush(self.tmp.name)
+        with mock.patch('myjobs_backend.metrics.worker_id', return_value='scraper'):
+            snapshots = read_snapshots(self.tmp.name, 'metrics', retire_snapshot)
+        # The 3 retired requests are counted once, the one after them too
+        self.assertIn('http_requests_total{view="jobs"} 4', render_prometheus(snapshots))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AsyncSingleFlightTests(SimpleTestCase):
+    def test_concurrent_misses_build_once(self):
+        cache = caches['default']
+        cache.clear()
+        builds = []
+
+        async def build():
+            builds.append(1)
+            await asyncio.sleep(0.1)
+            return {'built': len(builds)}
+
+        async def run():
+            return await asyncio.gather(*(aget_or_build('detail', build, timeout=60, cache=cache) for _ in range(3)))
+
+        self.assertEqual(async_to_sync(run)(), [{'built': 1}] * 3)
+        self.assertEqual(len(builds), 1)
+        self.assertIsNone(cache.get('lock:detail'))
+
+
+class ProfilingTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings_override = override_settings(PROFILING_DIR=self.tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def profile(self):
+        request = RequestFactory().get('/api/jobs/')
+        request.id = 'chosen-by-client'
+        _, artifact_id = profile_request(lambda request: HttpResponse('ok'), request)
+        with zipfile.ZipFile(os.path.join(self.tmp.name, f'{artifact_id}.zip')) as zf:
+            return artifact_id, json.loads(zf.read('meta.json')), zf.namelist()
+
+    def test_artifact_ids_are_not_taken_from_the_request(self):
+        first, meta, _ = self.profile()
+        second, _, _ = self.profile()
+        self.assertNotIn('chosen-by-client', first)
+        self.assertNotEqual(first, second)
+        self.assertEqual(meta['request_id'], 'chosen-by-client')
+
+    def test_memory_is_traced_by_one_request_at_a_time(self):
+        _, meta, files = self.profile()
+        self.assertTrue(meta['memory_traced'])
+        self.assertIn('allocations.txt', files)
+
+        with _tracing_memory:  # another profiled request is tracing
+            _, meta, files = self.profile()
+        self.assertFalse(meta['memory_traced'])
+        self.assertNotIn('allocations.txt', files)
+
+
+class HybridMiddlewareTests(SimpleTestCase):
+    def test_project_middleware_supports_both_modes(self):
+        for path in settings.MIDDLEWARE:
+            if path.startswith('myjobs_backend.'):
+                middleware = import_string(path)
+                self.assertTrue(middleware.sync_capable and middleware.async_capable, path)
+
+    @override_settings(SQL_STATS_ENABLED=True, QUERY_BUDGET_ENFORCE=True, COMPRESSION_MIN_SIZE=10, METRICS_DIR=None)
+    def test_async_chain_records_queries_run_on_the_sync_thread(self):
+        seen = {}
+
+        def query():
+            # What an ORM call does on sync_to_async's thread
+            connections['default'].execute_wrappers[0](lambda *args: None, 'SELECT 1', None, False, {})
+
+        async def view(request):
+            await sync_to_async(query)()
+            seen['statements'] = [s.sql for s in request.query_log.statements]
+            return HttpResponse('x' * 100, content_type='text/plain')
+
+        handler = view
+        for middleware in (QueryBudgetMiddleware, CompressionMiddleware, SQLStatsMiddleware,
+                           RequestMetricsMiddleware, QueryLogMiddleware, RequestIdMiddleware):
+            handler = middleware(handler)
+            self.assertTrue(iscoroutinefunction(handler), middleware.__name__)
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip', HTTP_X_REQUEST_ID='req-7')
+        response = async_to_sync(handler)(request)
+        self.assertEqual(seen['statements'], ['SELECT 1'])
+        self.assertEqual(connections['default'].execute_wrappers, [])
+        self.assertEqual((response['X-Request-ID'], response['Content-Encoding']), ('req-7', 'gzip'))
+
+    def test_sync_chain_is_unchanged(self):
+        handler = RequestIdMiddleware(QueryLogMiddleware(lambda request: HttpResponse('ok')))
+        self.assertFalse(iscoroutinefunction(handler))
+        self.assertEqual(handler(RequestFactory().get('/', HTTP_X_REQUEST_ID='req-8'))['X-Request-ID'], 'req-8')
+
+
+RENDERER_SAMPLE = {
+    'aware': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+    'offset': datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30))),
+    'naive': datetime.datetime(2026, 1, 2, 3, 4, 5),
+    'date': datetime.date(2026, 1, 2),
+    'time': datetime.time(3, 4, 5, 6),
+    'decimal': decimal.Decimal('12.50'),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'lazy': gettext_lazy('Not found.'),
+    'duration': datetime.timedelta(hours=1, seconds=1),
+    'nested': [{'a_b': (1, 2.5, None, True)}, 'ünïcode'],
+    'float': 0.1,
+}
+
+
+class _EchoView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        return Response(RENDERER_SAMPLE)
+
+
+class RendererParityTests(SimpleTestCase):
+    def test_orjson_output_is_byte_identical_to_drf(self):
+        for data in (RENDERER_SAMPLE, {**RENDERER_SAMPLE, 7: 'non-str key'}, [RENDERER_SAMPLE, None], 'text', None):
+            with self.subTest(type(data).__name__):
+                self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_parses_the_same(self):
+        context = {'indent': 4}
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(RENDERER_SAMPLE, renderer_context=context)),
+            json.loads(JSONRenderer().render(RENDERER_SAMPLE, renderer_context=context)),
+        )
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_decodes_to_the_json_values(self):
+        self.assertEqual(
+            msgpack.unpackb(MessagePackRenderer().render(RENDERER_SAMPLE)),
+            json.loads(JSONRenderer().render(RENDERER_SAMPLE)),
+        )
+
+    def test_negotiation(self):
+        view = _EchoView.as_view()
+        cases = [('application/json', 'application/json'), ('*/*', 'application/json')]
+        if msgpack is not None:
+            cases.append(('application/msgpack', 'application/msgpack'))
+        for accept, content_type in cases:
+            with self.subTest(accept):
+                response = view(APIRequestFactory().get('/', HTTP_ACCEPT=accept))
+                response.render()
+                self.assertEqual(response['Content-Type'], content_type)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, COMPRESSION_MIN_SIZE=100)
+class CompressionTests(SimpleTestCase):
+    body = json.dumps([{'id': i, 'name': 'Computer Science'} for i in range(50)]).encode()
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def respond(self, response, accept_encoding='gzip, deflate, br'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_negotiation(self):
+        self.assertEqual(negotiate('gzip;q=0.5, identity'), 'gzip')
+        self.assertEqual(negotiate('deflate, gzip;q=0'), None)
+        self.assertEqual(negotiate('*;q=0.2'), supported_encodings()[0])
+        self.assertEqual(negotiate('br, gzip;q=0.9', ('gzip',)), 'gzip')
+        self.assertEqual(negotiate('GZIP;q=abc'), None)
+
+    def test_large_textual_responses_are_compressed(self):
+        response = self.respond(HttpResponse(self.body, content_type='application/json'), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    @skipUnless(brotli, 'brotli is not installed')
+    def test_brotli_is_preferred(self):
+        response = self.respond(HttpResponse(self.body, content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.body)
+
+    def test_left_alone(self):
+        encoded = HttpResponse(self.body, content_type='application/json')
+        encoded['Content-Encoding'] = 'gzip'
+        cases = {
+            'small': HttpResponse(b'[]', content_type='application/json'),
+            'binary': HttpResponse(self.body, content_type='image/png'),
+            'already encoded': encoded,
+            'incompressible': HttpResponse(os.urandom(500), content_type='text/plain'),
+            'event stream': StreamingHttpResponse(iter([b'data: 1\n\n']), content_type='text/event-stream'),
+        }
+        for name, response in cases.items():
+            with self.subTest(name):
+                before = (response.get('Content-Encoding'), None if response.streaming else response.content)
+                response = self.respond(response, 'gzip')
+                after = (response.get('Content-Encoding'), None if response.streaming else response.content)
+                self.assertEqual(after, before)
+        # Nor is a body the client can't decode
+        response = self.respond(HttpResponse(self.body, content_type='text/plain'), 'identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_responses_are_gzipped(self):
+        chunks = [self.body[:200], self.body[200:]]
+        response = self.respond(StreamingHttpResponse(iter(chunks), content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.body)
+
+    def test_strong_etag_is_weakened(self):
+        response = HttpResponse(self.body, content_type='application/json')
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.respond(response, 'gzip')['ETag'], 'W/"abc"')
+
+    def test_cached_compressed_body(self):
+        def cached(body):
+            response = HttpResponse(body, content_type='application/json')
+            return self.respond(cache_compressed(response, 'lookups:degrees', 60), 'gzip')
+
+        with mock.patch('myjobs_backend.compression.compress', wraps=compress) as compressor:
+            first, second = cached(self.body), cached(self.body)
+            self.assertEqual(compressor.call_count, 1)
+            self.assertEqual(first.content, second.content)
+            # A rebuilt entry with a different body is never served the old bytes
+            changed = self.body.replace(b'Computer', b'Political')
+            self.assertEqual(gzip.decompress(cached(changed).content), changed)
+            self.assertEqual(compressor.call_count, 2)
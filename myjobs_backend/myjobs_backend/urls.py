@@ -3,6 +3,8 @@ from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf import settings
 from django.conf.urls.static import static
+from .batch import BatchView
+from .views import MetricsView, ProfileArtifactListView, ProfileArtifactDownloadView, SQLStatsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,6 +12,11 @@ urlpatterns = [
     path('api/jobs/', include('jobs.urls')),  # job-related endpoints
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('metrics', MetricsView.as_view(), name='metrics'),  # staff-only Prometheus endpoint
+    path('api/profiles/', ProfileArtifactListView.as_view(), name='profile-artifacts'),
+    path('api/profiles/<str:artifact_id>/', ProfileArtifactDownloadView.as_view(), name='profile-artifact-download'),
+    path('api/sql-stats/', SQLStatsView.as_view(), name='sql-stats'),
+    path('api/batch/', BatchView.as_view(), name='batch'),  # several GETs in one round trip
 ]
 
 # ✅ Serve media files during development (resumes, transcripts, etc.)
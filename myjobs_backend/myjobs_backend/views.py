@@ -0,0 +1,66 @@
+"""
+Project-level operational endpoints (staff only).
+"""
+from django.http import FileResponse, Http404, HttpResponse
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .metrics import collect_snapshots, render_prometheus
+from .profiling import artifact_path, list_artifacts
+from .sql_stats import merged_report
+
+
+class MetricsView(APIView):
+    """
+    GET: Prometheus text-format metrics for this node (staff only).
+    Accepts a JWT or an admin session so it can be opened from the admin.
+    """
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(
+            render_prometheus(collect_snapshots()),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+class ProfileArtifactListView(APIView):
+    """
+    GET: Stored request profiles, newest first (staff only).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(list_artifacts())
+
+
+class ProfileArtifactDownloadView(APIView):
+    """
+    GET: Download one profile artifact as a zip (staff only).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, artifact_id):
+        path = artifact_path(artifact_id)
+        if path is None:
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{artifact_id}.zip')
+
+
+class SQLStatsView(APIView):
+    """
+    GET: Statements with the most total time per view, with captured EXPLAIN
+    plans (staff only). Optional ?limit= and ?view=.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 50)), 500))
+        except ValueError:
+            limit = 50
+        return Response(merged_report(limit=limit, view=request.query_params.get('view') or None))
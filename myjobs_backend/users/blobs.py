@@ -0,0 +1,149 @@
+# users/blobs.py
+"""
+Bookkeeping for uploaded files: StoredBlob reference counts for the
+deduplicated storage (myjobs_backend/storage.py) and the per-profile
+``storage_used`` counter behind the storage quota.
+
+users/signals.py remembers the file names of every model with file fields
+when an instance is loaded and compares them after save/delete; only changed
+fields cost a ``stat`` and one UPDATE each. The quota check is then a single
+read of the profile's counter instead of a sum over all its files.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, FileField
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from myjobs_backend.storage import is_blob
+from .models import FacultyProfile, StoredBlob
+
+_FILE_FIELDS = {}
+
+
+class QuotaExceeded(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Profile storage quota exceeded.'
+    default_code = 'storage_quota_exceeded'
+
+
+# -----------------------
+# Files of a model instance
+# -----------------------
+def file_fields(model):
+    """{attname: FileField} of ``model``'s concrete file fields."""
+    fields = _FILE_FIELDS.get(model)
+    if fields is None:
+        fields = _FILE_FIELDS[model] = {
+            f.attname: f for f in model._meta.concrete_fields if isinstance(f, FileField)
+        }
+    return fields
+
+
+def file_names(instance):
+    """{attname: stored name} of the loaded file fields ('' when empty)."""
+    names = {}
+    for attname in file_fields(type(instance)):
+        if attname not in instance.__dict__:
+            continue  # deferred
+        value = instance.__dict__[attname]
+        names[attname] = getattr(value, 'name', value) or ''
+    return names
+
+
+def stored_size(field, name):
+    if not name:
+        return 0
+    try:
+        return field.storage.size(name)
+    except OSError:
+        return 0
+
+
+def owning_profile_id(instance):
+    if isinstance(instance, FacultyProfile):
+        return instance.pk
+    field = next((f for f in instance._meta.concrete_fields if f.name == 'profile'), None)
+    if field is not None and field.related_model is FacultyProfile:
+        return instance.profile_id
+    return None
+
+
+# -----------------------
+# Counters
+# -----------------------
+@contextmanager
+def leased_blob(name, size):
+    """
+    Hold the StoredBlob row of ``name`` locked, created if need be and with
+    gc_blobs' grace period restarted, while the storage checks and writes the
+    blob. gc_blobs deletes under the same lock, so a blob is never unlinked
+    between being found on disk and being referenced.
+    """
+    with transaction.atomic():
+        StoredBlob.objects.bulk_create(
+            [StoredBlob(name=name, size=size)],
+            update_conflicts=True, unique_fields=['name'], update_fields=['updated_at'],
+        )
+        yield
+
+
+def add_ref(name, size):
+    now = timezone.now()
+    if StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=now):
+        return
+    try:
+        with transaction.atomic():
+            StoredBlob.objects.create(name=name, size=size, ref_count=1)
+    except IntegrityError:
+        StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=now)
+
+
+def drop_ref(name):
+    StoredBlob.objects.filter(name=name, ref_count__gt=0).update(
+        ref_count=F('ref_count') - 1, updated_at=timezone.now(),
+    )
+
+
+def add_profile_usage(profile_id, delta):
+    if profile_id is not None and delta:
+        FacultyProfile.objects.filter(pk=profile_id).update(storage_used=Greatest(F('storage_used') + delta, 0))
+
+
+def files_changed(instance, before, after):
+    """Move blob references and profile usage from ``before`` to ``after`` names."""
+    fields = file_fields(type(instance))
+    delta = 0
+    for attname, name in after.items():
+        old = before.get(attname, '')
+        if name == old:
+            continue
+        field = fields[attname]
+        new_size, old_size = stored_size(field, name), stored_size(field, old)
+        if is_blob(name):
+            add_ref(name, new_size)
+        if is_blob(old):
+            drop_ref(old)
+        delta += new_size - old_size
+    add_profile_usage(owning_profile_id(instance), delta)
+
+
+# -----------------------
+# Quota
+# -----------------------
+def storage_quota():
+    return getattr(settings, 'PROFILE_STORAGE_QUOTA_MB', 200) * 1024 * 1024
+
+
+def check_quota(user, incoming, replacing=0):
+    """Raise QuotaExceeded if ``user``'s profile can't take ``incoming`` more bytes."""
+    if incoming <= 0:
+        return
+    used = FacultyProfile.objects.filter(user=user).values_list('storage_used', flat=True).first() or 0
+    quota = storage_quota()
+    if used - replacing + incoming > quota:
+        raise QuotaExceeded(f'Profile storage quota of {quota // (1024 * 1024)} MB exceeded.')
@@ -0,0 +1,191 @@
+# users/exports.py
+"""
+CSV / XLSX export of recruiter search and shortlist results.
+
+Rows come from the same values_list cursor as the faculty search
+(users/faculty_search.py), so an export never materialises more than one
+profile at a time: CSV is streamed straight to the client and XLSX is written
+by XlsxWriter in constant-memory mode. Exports larger than EXPORT_SYNC_MAX_ROWS
+profiles are queued as an ExportJob instead and written by the
+``process_export_jobs`` management command.
+"""
+import csv
+import logging
+import tempfile
+from contextlib import nullcontext
+from datetime import timedelta
+
+import xlsxwriter
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from myjobs_backend.db_router import is_pinned, reading_from_replica, replica_configured
+from .faculty_search import (
+    iter_search_records, marked_profiles, search_profiles, search_rows,
+)
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [
+    'Faculty ID', 'First Name', 'Last Name', 'Full Name', 'Email',
+    'Departments', 'Degree Levels', 'Degrees', 'Course Credit Total', 'Courses',
+]
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+# -----------------------
+# Rows
+# -----------------------
+def export_profiles(recruiter, source, filters):
+    """FacultyProfile queryset for a 'search' or 'shortlist' export."""
+    if source == 'shortlist':
+        return marked_profiles(recruiter)
+    return search_profiles(recruiter, filters)
+
+
+def export_row(record):
+    degree_levels = []
+    for d in record['degrees']:
+        if d['degree_level'] and d['degree_level'] not in degree_levels:
+            degree_levels.append(d['degree_level'])
+    return [
+        record['id'],
+        record['first_name'],
+        record['last_name'],
+        record['full_name'],
+        record['email'],
+        '; '.join(record['departments']),
+        '; '.join(degree_levels),
+        '; '.join(d['label'] for d in record['degrees']),
+        record['course_credit_total'],
+        len(record['courses']),
+    ]
+
+
+def export_rows(profiles):
+    """Yield one spreadsheet row per profile, reading through a server-side cursor."""
+    chunk_size = getattr(settings, 'FACULTY_SEARCH_STREAM_CHUNK_SIZE', 2000)
+    for record in iter_search_records(search_rows(profiles).iterator(chunk_size=chunk_size), None):
+        yield export_row(record)
+
+
+# -----------------------
+# Writers
+# -----------------------
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(rows, fh):
+    """Write to a text file; returns the number of data rows."""
+    writer = csv.writer(fh)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_xlsx(rows, path):
+    """Write an .xlsx file at ``path`` row by row; returns the number of data rows."""
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        sheet = workbook.add_worksheet('Faculty')
+        sheet.write_row(0, 0, EXPORT_COLUMNS, workbook.add_format({'bold': True}))
+        count = 0
+        for count, row in enumerate(rows, start=1):
+            sheet.write_row(count, 0, row)
+    finally:
+        workbook.close()
+    return count
+
+
+def write_export(rows, file_format, fh):
+    """Write ``rows`` into the open binary temp file ``fh``."""
+    if file_format == 'xlsx':
+        return write_xlsx(rows, fh.name)
+    with open(fh.name, 'w', newline='', encoding='utf-8') as text:
+        return write_csv(rows, text)
+
+
+# -----------------------
+# Background jobs
+# -----------------------
+# Jobs are queued as 'pending' rows and run by ``manage.py process_export_jobs``,
+# a separate worker process, so a restarted web worker loses nothing.
+def claim_export_job():
+    """Mark the oldest pending ExportJob running and return it, or None if the queue is empty."""
+    with transaction.atomic():
+        # SKIP LOCKED lets several workers take jobs from the queue at once
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(status='pending').order_by('created_at').first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'attempts'])
+    return job
+
+
+def export_reads(recruiter):
+    """Where a job reads from: the replica, as for the export view, unless ``recruiter`` just wrote."""
+    if replica_configured() and not is_pinned(recruiter):
+        return reading_from_replica()
+    return nullcontext()
+
+
+def run_export_job(job):
+    """Produce the file for the claimed ``job``."""
+    try:
+        profiles = export_profiles(job.recruiter, job.source, job.filters)
+        with export_reads(job.recruiter), tempfile.NamedTemporaryFile(suffix=f'.{job.file_format}') as fh:
+            job.row_count = write_export(export_rows(profiles), job.file_format, fh)
+            fh.seek(0)
+            job.file.save(f'{job.source}-export-{job.pk}.{job.file_format}', File(fh), save=False)
+        job.status = 'done'
+    except Exception as exc:
+        logger.exception("Export job %s failed", job.pk)
+        job.status = 'failed'
+        job.error = str(exc)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'file', 'row_count', 'error', 'finished_at'])
+
+
+def recover_stale_export_jobs():
+    """
+    Requeue jobs left 'running' by a worker that died, or fail them once they
+    have used up EXPORT_JOB_MAX_ATTEMPTS; returns (requeued, failed).
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'EXPORT_JOB_STALE_SECONDS', 1800))
+    max_attempts = getattr(settings, 'EXPORT_JOB_MAX_ATTEMPTS', 3)
+    stale = ExportJob.objects.filter(
+        Q(started_at__lt=cutoff) | Q(started_at__isnull=True, created_at__lt=cutoff), status='running',
+    )
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status='failed', error='The export worker stopped before the export finished.', finished_at=now,
+    )
+    requeued = stale.update(status='pending', started_at=None)
+    return requeued, failed
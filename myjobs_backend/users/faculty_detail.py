@@ -0,0 +1,235 @@
+# users/faculty_detail.py
+"""
+Recruiter-facing faculty detail payload.
+
+The payload is recruiter-independent, so it is assembled once (with relative
+file URLs) and cached under a per-faculty version counter that
+users/signals.py bumps whenever the profile or one of the child rows shown in
+it changes. Only the per-request parts -- absolute URLs and whether the
+current recruiter has marked the faculty -- are applied on top.
+"""
+from django.conf import settings
+from django.db.models import Prefetch
+
+from myjobs_backend.async_views import db_call, gather_db
+from myjobs_backend.cache import aget_or_build, get_many_built, get_or_build, namespace_versions, set_built
+from .models import Course, Document, Education, Experience, FacultyProfile, MarkedProfile, Transcript
+from .serializers import DocumentSerializer, EducationSerializer, ExperienceSerializer
+
+DETAIL_NAMESPACE = 'faculty-detail'
+
+SECTIONS = ('basic_info', 'education', 'experience', 'applicable_courses', 'documents')
+
+
+def detail_namespace(user_id):
+    return f'{DETAIL_NAMESPACE}:{user_id}'
+
+
+def detail_queryset(sections=SECTIONS):
+    """Faculty profiles with everything ``sections`` needs prefetched."""
+    transcripts = Transcript.objects.select_related('department')
+    prefetches = [Prefetch('transcripts_list', queryset=transcripts)]
+    if 'applicable_courses' in sections:
+        prefetches.append(Prefetch('transcripts_list__courses', queryset=Course.objects.select_related('department')))
+    for section, lookup in (('education', 'educations'), ('experience', 'experiences'), ('documents', 'documents')):
+        if section in sections:
+            prefetches.append(lookup)
+    return (
+        FacultyProfile.objects
+        .filter(user__is_faculty=True)
+        .select_related('user')
+        .prefetch_related(*prefetches)
+    )
+
+
+def build_detail_payload(profile, sections=SECTIONS, related=None):
+    """
+    Assemble the detail payload for a prefetched ``profile`` (relative URLs).
+    ``related`` may supply already loaded 'educations', 'experiences' and
+    'documents' rows instead of the profile's prefetches.
+    """
+    related = related or {}
+
+    def rows(name):
+        return related[name] if name in related else getattr(profile, name).all()
+
+    # Aggregate departments and compute per-transcript data
+    degrees_blocks = []
+    departments = []
+    transcripts_summary = []
+
+    for t in profile.transcripts_list.all():
+        dept_name = t.department.name if t.department else None
+        if dept_name and dept_name not in departments:
+            departments.append(dept_name)
+
+        if 'applicable_courses' in sections:
+            # sum credits for this transcript
+            t_credit_sum = 0.0
+            course_rows = []
+            for c in t.courses.all():
+                credit = float(c.credits or 0)
+                t_credit_sum += credit
+                course_rows.append({
+                    'code': c.code,
+                    'name': c.name,
+                    'credits': credit,
+                    'department': c.department.name if c.department else None,
+                })
+
+            degrees_blocks.append({
+                'transcript_id': t.id,
+                'degree_name': t.degree_level,  # e.g., Master's / Doctorate
+                'college_name': t.college,
+                'degree': t.degree,
+                'major': t.major,
+                'department': dept_name,
+                'course_credit_total': t_credit_sum,
+                'courses': course_rows,
+            })
+
+        transcripts_summary.append({
+            'id': t.id,
+            'degree_level': t.degree_level,
+            'degree': t.degree,
+            'college': t.college,
+            'major': t.major,
+            'department_name': dept_name,
+            'year_completed': t.year_completed,
+        })
+
+    payload = {}
+    if 'basic_info' in sections:
+        first = (profile.first_name or '').strip()
+        last = (profile.last_name or '').strip()
+        photo_url = None
+        try:
+            if profile.profile_photo:
+                photo_url = profile.profile_photo.url
+        except Exception:
+            photo_url = None
+        payload['basic_info'] = {
+            'id': profile.user.id,
+            'email': profile.user.email,
+            'first_name': first,
+            'last_name': last,
+            'full_name': f"{first} {last}".strip() or profile.user.email,
+            'designation': profile.title,
+            'profile_photo_url': photo_url,
+            'linkedin': profile.linkedin,
+            'phone': profile.phone,
+            'city': profile.city,
+            'state': profile.state,
+            'work_preference': profile.work_preference or [],
+            'departments': departments,
+        }
+    if 'education' in sections:
+        payload['education'] = {
+            'educations': list(EducationSerializer(rows('educations'), many=True).data),
+            'transcripts': transcripts_summary,
+        }
+    if 'experience' in sections:
+        payload['experience'] = list(ExperienceSerializer(rows('experiences'), many=True).data)
+    if 'applicable_courses' in sections:
+        payload['applicable_courses'] = {'degrees': degrees_blocks}
+    if 'documents' in sections:
+        # No request in the context, so file URLs stay relative until absolutize()
+        payload['documents'] = list(DocumentSerializer(rows('documents'), many=True).data)
+    return payload
+
+
+def detail_cache_keys(user_ids):
+    """{user_id: cache key} built from the per-faculty and global versions."""
+    namespaces = [detail_namespace(uid) for uid in user_ids]
+    versions = namespace_versions([DETAIL_NAMESPACE, *namespaces])
+    return {
+        uid: f'{DETAIL_NAMESPACE}:{uid}:v{versions[ns]}.{versions[DETAIL_NAMESPACE]}'
+        for uid, ns in zip(user_ids, namespaces)
+    }
+
+
+def detail_timeout():
+    return getattr(settings, 'FACULTY_DETAIL_CACHE_TIMEOUT', 3600)
+
+
+def cached_detail_payload(user_id):
+    """Cached recruiter-independent payload, or None if there is no such faculty."""
+    def build():
+        profile = detail_queryset().filter(user_id=user_id).first()
+        return build_detail_payload(profile) if profile else None
+    return get_or_build(
+        detail_cache_keys([user_id])[user_id],
+        build,
+        timeout=detail_timeout(),
+    )
+
+
+def cached_detail_entry(user_id):
+    """(cache key, cached payload or None) without building anything."""
+    key = detail_cache_keys([user_id])[user_id]
+    return key, get_many_built([key]).get(key)
+
+
+async def abuild_detail_payload(user_id, key):
+    """
+    Async counterpart of the cache-miss path of cached_detail_payload(), under
+    the same single-flight lock: the profile (with transcripts and courses),
+    educations, experiences and documents are loaded concurrently, then the
+    payload is assembled and cached. Returns None if there is no such faculty.
+    """
+    async def build():
+        profile, educations, experiences, documents = await gather_db(
+            lambda: detail_queryset(('basic_info', 'applicable_courses')).filter(user_id=user_id).first(),
+            lambda: list(Education.objects.filter(profile__user_id=user_id)),
+            lambda: list(Experience.objects.filter(profile__user_id=user_id)),
+            lambda: list(Document.objects.filter(profile__user_id=user_id)),
+        )
+        if profile is None:
+            return None
+        related = {'educations': educations, 'experiences': experiences, 'documents': documents}
+        return await db_call(build_detail_payload, profile, related=related)
+    return await aget_or_build(key, build, timeout=detail_timeout())
+
+
+def detail_payloads(user_ids, sections=SECTIONS):
+    """
+    {user_id: payload} for several faculty. Cached payloads are read with one
+    get_many; the rest are loaded with a single prefetch pass over
+    ``user_id__in`` (restricted to what ``sections`` needs) no matter how
+    many ids there are. Full payloads built here are cached for later.
+    """
+    keys = detail_cache_keys(user_ids)
+    cached = get_many_built(keys.values())
+    payloads = {}
+    for uid, key in keys.items():
+        if cached.get(key) is not None:
+            payloads[uid] = {name: cached[key][name] for name in sections if name in cached[key]}
+
+    missing = [uid for uid in user_ids if uid not in payloads]
+    if missing:
+        for profile in detail_queryset(sections).filter(user_id__in=missing):
+            payload = build_detail_payload(profile, sections)
+            if set(sections) == set(SECTIONS):
+                set_built(keys[profile.user_id], payload, detail_timeout())
+            payloads[profile.user_id] = payload
+    return payloads
+
+
+def absolutize(payload, request):
+    """Copy of ``payload`` with absolute photo and document URLs for ``request``."""
+    payload = dict(payload)
+    basic_info = payload.get('basic_info')
+    if basic_info and basic_info.get('profile_photo_url'):
+        payload['basic_info'] = {**basic_info, 'profile_photo_url': request.build_absolute_uri(basic_info['profile_photo_url'])}
+    if payload.get('documents'):
+        payload['documents'] = [
+            {**doc, 'file': request.build_absolute_uri(doc['file'])} if doc.get('file') else doc
+            for doc in payload['documents']
+        ]
+    return payload
+
+
+def marked_faculty_ids(recruiter, user_ids):
+    return set(
+        MarkedProfile.objects.filter(recruiter=recruiter, faculty_id__in=user_ids).values_list('faculty_id', flat=True)
+    )
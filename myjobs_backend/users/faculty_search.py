@@ -0,0 +1,173 @@
+# users/faculty_search.py
+"""
+Row-level building blocks for the recruiter faculty search.
+
+The search reads flat ``values_list`` tuples (one per transcript/course pair,
+ordered by profile) instead of model instances, and folds consecutive rows of
+the same profile into one search record. Because nothing is held beyond the
+current profile, the same generator backs both the regular JSON response and
+the ``?stream=1`` StreamingHttpResponse, and the CSV/XLSX exports in
+users/exports.py.
+"""
+from itertools import groupby
+from operator import itemgetter
+
+from myjobs_backend.cache import hashed_key
+
+from .models import FacultyProfile, MarkedProfile, Transcript
+
+SEARCH_ROW_FIELDS = (
+    'id',
+    'user_id',
+    'user__email',
+    'first_name',
+    'last_name',
+    'profile_photo',
+    'transcripts_list__id',
+    'transcripts_list__college',
+    'transcripts_list__degree',
+    'transcripts_list__degree_level',
+    'transcripts_list__department__name',
+    'transcripts_list__courses__name',
+    'transcripts_list__courses__credits',
+)
+
+(PROFILE_ID, USER_ID, EMAIL, FIRST_NAME, LAST_NAME, PHOTO,
+ TRANSCRIPT_ID, COLLEGE, DEGREE, DEGREE_LEVEL, DEPARTMENT, COURSE_NAME, COURSE_CREDITS) = range(len(SEARCH_ROW_FIELDS))
+
+# Query parameters understood by the search and export endpoints; they match
+# the dropdown filters on the recruiter search page.
+SEARCH_FILTERS = {
+    'department': 'department__name',
+    'course': 'courses__name',
+    'degree': 'degree',
+}
+
+
+def apply_search_filters(profiles, params):
+    """Keep profiles having a transcript (or course) matching each given filter."""
+    for param, lookup in SEARCH_FILTERS.items():
+        value = (params.get(param) or '').strip()
+        if value:
+            profiles = profiles.filter(id__in=Transcript.objects.filter(**{lookup: value}).values('profile_id'))
+    return profiles
+
+
+def base_profiles(params=None):
+    """Faculty with at least one transcript matching the search filters (recruiter-independent)."""
+    profiles = FacultyProfile.objects.filter(id__in=Transcript.objects.values('profile_id'))
+    return apply_search_filters(profiles, params or {})
+
+
+def search_profiles(recruiter, params=None):
+    """``base_profiles()`` minus the faculty already marked by ``recruiter``."""
+    marked_faculty_ids = MarkedProfile.objects.filter(recruiter=recruiter).values('faculty_id')
+    return base_profiles(params).exclude(user_id__in=marked_faculty_ids)
+
+
+def search_cache_key(params):
+    """Cache key (within the 'faculty-search' namespace) for a filter combination."""
+    return 'records:' + hashed_key(*((params.get(k) or '').strip() for k in sorted(SEARCH_FILTERS)))
+
+
+def marked_profiles(recruiter):
+    """Faculty profiles on ``recruiter``'s shortlist."""
+    return FacultyProfile.objects.filter(
+        user_id__in=MarkedProfile.objects.filter(recruiter=recruiter).values('faculty_id')
+    )
+
+
+def search_rows(profiles):
+    """
+    One tuple per (transcript, course) of each profile in ``profiles``;
+    transcripts without courses (and profiles without transcripts) appear once
+    with NULL columns. Rows of the same profile/transcript are contiguous.
+    """
+    return profiles.order_by(
+        'id', '-transcripts_list__year_completed', 'transcripts_list__degree_level',
+        'transcripts_list__degree', 'transcripts_list__id', 'transcripts_list__courses__id',
+    ).values_list(*SEARCH_ROW_FIELDS)
+
+
+def build_search_record(rows, photo_url):
+    """Fold the rows of one profile into the search result dict."""
+    first_row = rows[0]
+    first = (first_row[FIRST_NAME] or "").strip()
+    last = (first_row[LAST_NAME] or "").strip()
+    email = first_row[EMAIL]
+    full_name = f"{first} {last}".strip() or email
+    initials = "".join([s[0] for s in [first, last] if s])[:2].upper() or (email[:2].upper() if email else "")
+
+    course_credit_total = 0.0
+    departments = []
+    degrees = []
+    degree_credits = []
+    courses = []
+
+    for _, transcript_rows in groupby(rows, key=itemgetter(TRANSCRIPT_ID)):
+        transcript_rows = list(transcript_rows)
+        t = transcript_rows[0]
+        if t[TRANSCRIPT_ID] is None:
+            continue
+        dept_name = t[DEPARTMENT]
+        if dept_name and dept_name not in departments:
+            departments.append(dept_name)
+
+        t_credits = 0.0
+        for row in transcript_rows:
+            if row[COURSE_NAME] is None:
+                continue
+            credit = float(row[COURSE_CREDITS] or 0)
+            t_credits += credit
+            courses.append({"name": row[COURSE_NAME], "credits": credit})
+        course_credit_total += t_credits
+
+        degrees.append({
+            "institution": t[COLLEGE],
+            "degree": t[DEGREE],
+            "department": dept_name,
+            "degree_level": t[DEGREE_LEVEL],
+            "label": f"{t[COLLEGE]} \u2013 {t[DEGREE]}" + (f" \u2013 {dept_name}" if dept_name else "")
+        })
+        degree_credits.append({
+            "degree": t[DEGREE],
+            "credits": t_credits
+        })
+
+    return {
+        "id": first_row[USER_ID],
+        "profile_id": first_row[PROFILE_ID],
+        "email": email,
+        "first_name": first,
+        "last_name": last,
+        "full_name": full_name,
+        "initials": initials,
+        "profile_photo_url": photo_url,
+        "course_credit_total": course_credit_total,
+        "courses": courses,
+        "degrees": degrees,
+        "degree_credits": degree_credits,
+        "departments": departments,
+    }
+
+
+def iter_search_records(rows, request):
+    """
+    Yield one search record per profile from ``search_rows()`` output.
+    Photo URLs are made absolute against ``request``, or left relative when
+    it is None (cached records are absolutized per request).
+    """
+    storage = FacultyProfile._meta.get_field('profile_photo').storage
+    for _, profile_rows in groupby(rows, key=itemgetter(PROFILE_ID)):
+        profile_rows = list(profile_rows)
+        photo = profile_rows[0][PHOTO]
+        photo_url = None
+        try:
+            if photo:
+                photo_url = storage.url(photo)
+                if request is not None:
+                    photo_url = request.build_absolute_uri(photo_url)
+        except Exception:
+            photo_url = None
+        yield build_search_record(profile_rows, photo_url)
+
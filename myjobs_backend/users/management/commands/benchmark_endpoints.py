@@ -0,0 +1,117 @@
+# users/management/commands/benchmark_endpoints.py
+"""
+Benchmark the hot API endpoints and print the results as JSON.
+
+    python manage.py seed_scale --faculty 100000
+    python manage.py benchmark_endpoints --output bench-before.json
+    python manage.py benchmark_endpoints --compare bench-before.json
+    python manage.py benchmark_endpoints --check-budgets --iterations 1
+    python manage.py benchmark_endpoints --renderers --endpoint faculty_search
+"""
+import json
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+
+from myjobs_backend.benchmarks import HOT_ENDPOINTS, renderer_classes, run_benchmarks
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+class Command(BaseCommand):
+    help = "Report p50/p95 latency, queries per request and peak memory for the hot endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--endpoint", action="append", dest="endpoints",
+                            choices=[e.name for e in HOT_ENDPOINTS],
+                            help="Only run the named endpoint (repeatable).")
+        parser.add_argument("--recruiter", help="Email of the recruiter account to use.")
+        parser.add_argument("--faculty", help="Email of the faculty account to use.")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--compare", help="Previous JSON report to diff against.")
+        parser.add_argument("--check-budgets", action="store_true",
+                            help="Fail if any endpoint exceeds its declared query budget.")
+        parser.add_argument("--renderers", action="store_true",
+                            help="Also time DRF's JSONRenderer against the orjson/msgpack renderers.")
+
+    def handle(self, *args, **options):
+        # Lets the test client through ALLOWED_HOSTS and stubs outgoing email.
+        setup_test_environment()
+
+        endpoints = None
+        if options["endpoints"]:
+            endpoints = [e for e in HOT_ENDPOINTS if e.name in options["endpoints"]]
+
+        try:
+            report = run_benchmarks(
+                endpoints=endpoints,
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                recruiter_email=options["recruiter"],
+                faculty_email=options["faculty"],
+                renderers=options["renderers"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        report = {"commit": current_commit(), "timestamp": timezone.now().isoformat(), **report}
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output)
+        self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as fh:
+                self.print_comparison(json.load(fh), report)
+
+        if options["renderers"]:
+            self.print_renderers(report)
+
+        if options["check_budgets"]:
+            over = {
+                name: result for name, result in report["endpoints"].items()
+                if result["within_budget"] is False
+            }
+            if over:
+                raise CommandError("Query budget exceeded: " + ", ".join(
+                    f"{name} ({r['queries']} > {r['query_budget']})" for name, r in over.items()
+                ))
+
+    def print_comparison(self, before, after):
+        self.stdout.write("")
+        self.stdout.write(f"{'endpoint':<22}{'p50 ms':>16}{'p95 ms':>16}{'queries':>12}{'peak KB':>18}")
+        for name, new in after["endpoints"].items():
+            old = before.get("endpoints", {}).get(name)
+            if not old:
+                continue
+            self.stdout.write(
+                f"{name:<22}"
+                f"{old['p50_ms']:>7} -> {new['p50_ms']:<6}"
+                f"{old['p95_ms']:>7} -> {new['p95_ms']:<6}"
+                f"{old['queries']:>4} -> {new['queries']:<4}"
+                f"{old['peak_memory_kb']:>8} -> {new['peak_memory_kb']:<8}"
+            )
+
+    def print_renderers(self, report):
+        self.stdout.write("")
+        self.stdout.write(f"{'endpoint':<22}" + "".join(f"{r.__name__:>24}" for r in renderer_classes()))
+        for name, result in report["endpoints"].items():
+            timings = result.get("renderers")
+            if not timings:
+                continue
+            self.stdout.write(f"{name:<22}" + "".join(
+                f"{timings[r.__name__]['mean_ms']:>12} ms {timings[r.__name__]['bytes']:>8} B" for r in renderer_classes()
+            ))
@@ -0,0 +1,155 @@
+# users/management/commands/benchmark_servers.py
+"""
+Compare throughput per worker of the WSGI deployment (gunicorn, sync views)
+and the ASGI one (uvicorn, async read views) on the read-heavy endpoints.
+
+Each server is started with a single worker on a local port against the
+configured database (normally one filled by ``manage.py seed_scale``), loaded
+over HTTP with real JWTs, then stopped. Results are per page load: the async
+profile bundle is compared with the requests the sync profile page makes
+(the profile plus each section list). Faculty detail is measured warm and
+cold; the cold run invalidates the detail cache first (which needs a cache
+shared with the servers, e.g. Redis) and asks for a different faculty on
+every load.
+
+    python manage.py benchmark_servers
+    python manage.py benchmark_servers --concurrency 64 --duration 20 --endpoint faculty_detail
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myjobs_backend.benchmarks import HOT_ENDPOINTS, endpoint_url, load_test, pick_users
+from myjobs_backend.cache import bump_namespace
+from users.faculty_detail import DETAIL_NAMESPACE
+from users.models import FacultyProfile
+
+SERVER_ENDPOINTS = ['faculty_detail', 'faculty_profile_bundle']
+
+# The sync requests an async endpoint replaces, for the WSGI side of the comparison
+SYNC_EQUIVALENTS = {
+    'faculty_profile_bundle': [
+        'faculty-profile', 'faculty-educations', 'faculty-transcripts', 'faculty-certificates',
+        'faculty-memberships', 'faculty-experiences', 'faculty-skills', 'faculty-presentations',
+        'faculty-documents',
+    ],
+}
+
+SERVERS = {
+    'wsgi': lambda port, threads: [
+        sys.executable, '-m', 'gunicorn', 'myjobs_backend.wsgi:application',
+        '--workers', '1', '--threads', str(threads), '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+    ],
+    'asgi': lambda port, threads: [
+        sys.executable, '-m', 'uvicorn', 'myjobs_backend.asgi:application',
+        '--workers', '1', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning', '--no-access-log',
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(kind, threads, startup_timeout=30):
+    port = free_port()
+    env = {**os.environ, 'USE_ASYNC_READ_VIEWS': str(kind == 'asgi')}
+    process = subprocess.Popen(SERVERS[kind](port, threads), cwd=settings.BASE_DIR, env=env)
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise CommandError(f"{kind} server exited with status {process.returncode}")
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise CommandError(f"{kind} server did not start within {startup_timeout}s")
+                time.sleep(0.2)
+        yield port
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class Command(BaseCommand):
+    help = "Compare per-worker throughput of gunicorn (WSGI) and uvicorn (ASGI) on the read endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=32, help="Concurrent keep-alive clients.")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per endpoint and server.")
+        parser.add_argument("--threads", type=int, default=4, help="gunicorn threads for the WSGI worker.")
+        parser.add_argument("--endpoint", action="append", choices=[e.name for e in HOT_ENDPOINTS],
+                            help="Endpoint(s) to load (default: %s)." % ", ".join(SERVER_ENDPOINTS))
+        parser.add_argument("--server", action="append", choices=list(SERVERS), help="Only run these servers.")
+        parser.add_argument("--recruiter", help="Email of the recruiter to benchmark as.")
+        parser.add_argument("--faculty", help="Email of the faculty member to benchmark as.")
+        parser.add_argument("--no-cold", action="store_true", help="Skip the cold-cache runs.")
+        parser.add_argument("--json", action="store_true", help="Print the raw report as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            recruiter, faculty = pick_users(options["recruiter"], options["faculty"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        tokens = {'recruiter': str(AccessToken.for_user(recruiter)), 'faculty': str(AccessToken.for_user(faculty))}
+        names = options["endpoint"] or SERVER_ENDPOINTS
+        endpoints = [e for e in HOT_ENDPOINTS if e.name in names]
+
+        report = {}
+        for kind in options["server"] or list(SERVERS):
+            with running_server(kind, options["threads"]) as port:
+                for endpoint in endpoints:
+                    paths = self.page_paths(endpoint, kind, faculty)
+                    token = tokens[endpoint.role]
+                    # Warm caches and connections before measuring
+                    load_test('127.0.0.1', port, paths, token, concurrency=2, duration=1)
+                    result = load_test('127.0.0.1', port, paths, token, options["concurrency"], options["duration"])
+                    report.setdefault(endpoint.name, {})[kind] = result
+
+                    if endpoint.needs_faculty_id and not options["no_cold"]:
+                        bump_namespace(DETAIL_NAMESPACE)
+                        result = load_test('127.0.0.1', port, self.faculty_paths(endpoint), token,
+                                           options["concurrency"], options["duration"], rotate=True)
+                        report.setdefault(f'{endpoint.name} (cold)', {})[kind] = result
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'endpoint':<30}{'server':<8}{'loads/s':>10}{'req/load':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}"
+        )
+        for name, results in report.items():
+            for kind, r in results.items():
+                per_load = round(r['requests'] / r['page_loads'], 1) if r['page_loads'] else '-'
+                note = '  (wrapped: some loads were warm)' if r['wrapped'] else ''
+                self.stdout.write(
+                    f"{name:<30}{kind:<8}{r['rps']:>10}{per_load:>10}{str(r['p50_ms']):>10}"
+                    f"{str(r['p95_ms']):>10}{r['errors']:>8}{note}"
+                )
+
+    def page_paths(self, endpoint, kind, faculty):
+        if kind == 'wsgi' and endpoint.name in SYNC_EQUIVALENTS:
+            return [reverse(url_name) for url_name in SYNC_EQUIVALENTS[endpoint.name]]
+        return [endpoint_url(endpoint, faculty)]
+
+    def faculty_paths(self, endpoint, limit=10000):
+        user_ids = FacultyProfile.objects.filter(user__is_faculty=True).values_list('user_id', flat=True)[:limit]
+        return [reverse(endpoint.url_name, kwargs={'user_id': user_id}) for user_id in user_ids]
@@ -0,0 +1,86 @@
+# users/management/commands/gc_blobs.py
+"""
+Delete deduplicated media blobs (see myjobs_backend/storage.py) that no row
+has referenced for BLOB_GC_GRACE_HOURS, plus blob files that never got a
+StoredBlob row (e.g. a save that failed after the file was written).
+
+    python manage.py gc_blobs
+    python manage.py gc_blobs --hours 1 --dry-run
+"""
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from myjobs_backend.storage import BLOB_PREFIX
+from users.models import StoredBlob
+
+
+class Command(BaseCommand):
+    help = "Delete media blobs that nothing references any more."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=getattr(settings, "BLOB_GC_GRACE_HOURS", 24))
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
+
+    def handle(self, *args, **options):
+        grace = timedelta(hours=options["hours"])
+        cutoff = timezone.now() - grace
+        dry_run = options["dry_run"]
+
+        deleted = freed = 0
+        candidates = StoredBlob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff)
+        for name in candidates.values_list("name", flat=True).iterator():
+            # Re-check under the row lock that saves take (users.blobs.leased_blob):
+            # the blob may have been saved or referenced again meanwhile
+            with transaction.atomic():
+                blob = candidates.select_for_update().filter(name=name).first()
+                if blob is None:
+                    continue
+                if not dry_run:
+                    blob.delete()
+                    default_storage.delete_blob(name)
+            deleted += 1
+            freed += blob.size
+
+        orphans = [name for name in self.orphan_files(grace) if dry_run or self.delete_orphan(name)]
+
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted} unreferenced blobs ({freed / (1024 * 1024):.1f} MB) and {len(orphans)} orphan files."
+        ))
+
+    def delete_orphan(self, name):
+        """Delete a blob file without a row, unless a save is creating its row right now."""
+        with transaction.atomic():
+            _, created = StoredBlob.objects.select_for_update().get_or_create(name=name)
+            if not created:
+                return False
+            default_storage.delete_blob(name)
+            StoredBlob.objects.filter(name=name).delete()
+        return True
+
+    def orphan_files(self, grace):
+        root = default_storage.path(BLOB_PREFIX)
+        if not os.path.isdir(root):
+            return []
+        on_disk = []
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    if time.time() - os.path.getmtime(path) < grace.total_seconds():
+                        continue
+                except OSError:
+                    continue
+                on_disk.append(os.path.relpath(path, default_storage.location).replace(os.sep, '/'))
+        known = set()
+        for start in range(0, len(on_disk), 1000):
+            batch = on_disk[start:start + 1000]
+            known.update(StoredBlob.objects.filter(name__in=batch).values_list("name", flat=True))
+        return [name for name in on_disk if name not in known]
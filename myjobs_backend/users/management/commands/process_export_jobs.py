@@ -0,0 +1,40 @@
+# users/management/commands/process_export_jobs.py
+"""
+Run queued background exports (see users/exports.py). Keep one or more of
+these running next to the web workers; jobs left 'running' by a worker that
+died are requeued after EXPORT_JOB_STALE_SECONDS.
+
+    python manage.py process_export_jobs
+    python manage.py process_export_jobs --once   # drain the queue and exit (cron)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users.exports import claim_export_job, recover_stale_export_jobs, run_export_job
+
+
+class Command(BaseCommand):
+    help = "Run queued CSV/XLSX export jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls of an empty queue.")
+
+    def handle(self, *args, **options):
+        while True:
+            # Like a request: don't hold on to a connection past CONN_MAX_AGE or after an error
+            close_old_connections()
+            requeued, failed = recover_stale_export_jobs()
+            if requeued or failed:
+                self.stdout.write(f"Requeued {requeued} and failed {failed} stale export jobs.")
+
+            job = claim_export_job()
+            if job is not None:
+                run_export_job(job)
+                self.stdout.write(f"Export job #{job.pk}: {job.status}, {job.row_count} rows.")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,44 @@
+# users/management/commands/prune_sync_events.py
+"""
+Delete delta-sync events older than SYNC_EVENT_RETENTION_DAYS (see
+jobs/sync.py). Clients holding a cursor from before the cut get 410 Gone and
+fall back to a full sync.
+
+    python manage.py prune_sync_events
+    python manage.py prune_sync_events --days 7 --dry-run
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.models import SyncEvent
+
+
+class Command(BaseCommand):
+    help = "Delete delta-sync events older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=getattr(settings, "SYNC_EVENT_RETENTION_DAYS", 30))
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many events would go.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        # Delete by seq so the retained events stay one contiguous range. The
+        # newest event always stays: the oldest retained seq is how sync_cursor
+        # tells that a cursor's events were pruned.
+        newest = SyncEvent.objects.order_by("-seq").values_list("seq", flat=True).first()
+        last = (
+            SyncEvent.objects.filter(created_at__lt=cutoff, seq__lt=newest)
+            .order_by("-seq").values_list("seq", flat=True).first()
+        ) if newest is not None else None
+        if last is None:
+            self.stdout.write("No sync events to prune.")
+            return
+        events = SyncEvent.objects.filter(seq__lte=last)
+        if options["dry_run"]:
+            self.stdout.write(f"Would delete {events.count()} sync events up to #{last}.")
+            return
+        deleted, _ = events.delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} sync events up to #{last}."))
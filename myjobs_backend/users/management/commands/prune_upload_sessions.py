@@ -0,0 +1,37 @@
+# users/management/commands/prune_upload_sessions.py
+"""
+Delete chunked upload sessions (see users/uploads.py) that have been idle for
+UPLOAD_SESSION_TTL_HOURS, together with their partial files.
+
+    python manage.py prune_upload_sessions
+    python manage.py prune_upload_sessions --hours 6 --dry-run
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import UploadSession
+from users.uploads import discard_partial
+
+
+class Command(BaseCommand):
+    help = "Delete idle chunked upload sessions and their partial files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=getattr(settings, "UPLOAD_SESSION_TTL_HOURS", 24))
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many sessions would go.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        sessions = UploadSession.objects.filter(updated_at__lt=cutoff)
+        if options["dry_run"]:
+            self.stdout.write(f"Would delete {sessions.count()} upload sessions.")
+            return
+        deleted = 0
+        for session in sessions.iterator():
+            discard_partial(session)
+            session.delete()
+            deleted += 1
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} upload sessions."))
@@ -0,0 +1,326 @@
+# users/management/commands/seed_scale.py
+"""
+Generate a large synthetic dataset for load testing and benchmarks.
+
+    python manage.py seed_scale --faculty 100000
+    python manage.py seed_scale --faculty 1000000 --batch-size 5000
+
+Every seeded account uses an email under ``--domain`` so a dataset can be
+removed again with ``--flush``.
+"""
+import random
+import time
+from array import array
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.models import Job, SavedJob
+from users.models import (
+    FacultyProfile, RecruiterProfile,
+    College, Degree, Department,
+    Education, Transcript, Course, Experience,
+    MarkedProfile
+)
+
+User = get_user_model()
+
+# -----------------------
+# Vocabulary used to build realistic rows
+# -----------------------
+DEPARTMENTS = [
+    "Computer Science", "Information Technology", "Mathematics", "Statistics",
+    "Physics", "Chemistry", "Biology", "Biochemistry", "Economics",
+    "Business Administration", "Accounting", "Finance", "Marketing",
+    "Psychology", "Sociology", "Political Science", "History", "English",
+    "Philosophy", "Education", "Nursing", "Public Health",
+    "Mechanical Engineering", "Electrical Engineering", "Civil Engineering",
+    "Chemical Engineering", "Data Science", "Cybersecurity",
+    "Communication Studies", "Criminal Justice",
+]
+
+COLLEGES = [
+    "State University", "Northern Technical Institute", "Riverside College",
+    "Lakeview University", "Central Polytechnic", "Westbrook University",
+    "Eastfield College", "Pinecrest University", "Harbor State College",
+    "Summit Institute of Technology", "Valley Community College",
+    "Metropolitan University", "Kingsway College", "Oakridge University",
+    "Granite State University", "Bayside Institute",
+]
+
+DEGREES = {
+    "Master's": ["M.S.", "M.A.", "MBA", "M.Ed.", "M.Tech", "MPH"],
+    "Doctorate": ["Ph.D.", "Ed.D.", "D.B.A.", "D.Sc."],
+}
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael",
+    "Linda", "David", "Elizabeth", "William", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Priya", "Arjun", "Wei", "Mei",
+    "Carlos", "Sofia", "Ahmed", "Fatima", "Kenji", "Yuki", "Olga", "Ivan",
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Wilson",
+    "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+    "Patel", "Kumar", "Chen", "Wang", "Nguyen", "Kim", "Singh", "Ali",
+]
+
+STATES = [
+    ("California", "Los Angeles"), ("Texas", "Austin"), ("New York", "Buffalo"),
+    ("Florida", "Tampa"), ("Illinois", "Chicago"), ("Ohio", "Columbus"),
+    ("Georgia", "Atlanta"), ("Washington", "Seattle"), ("Virginia", "Richmond"),
+    ("Arizona", "Phoenix"), ("Michigan", "Detroit"), ("Colorado", "Denver"),
+]
+
+WORK_PREFERENCES = ["Remote", "Onsite", "Hybrid", "Part Time", "Full Time"]
+
+COURSE_TOPICS = [
+    "Foundations", "Advanced Topics", "Research Methods", "Seminar",
+    "Theory", "Applications", "Systems", "Analysis", "Design", "Practicum",
+]
+
+GRADES = ["A", "A-", "B+", "B", "B-", "A+"]
+
+JOB_TYPES = [choice for choice, _ in Job.JOB_TYPE_CHOICES]
+
+
+def chunked_range(total, size):
+    """Yield (start, stop) pairs covering range(total) in steps of size."""
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate recruiters, faculty, transcripts, courses, jobs, saved jobs and marked profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--faculty", type=int, default=10000,
+                            help="Number of faculty accounts to create (typically 10k-1M).")
+        parser.add_argument("--recruiters", type=int, default=None,
+                            help="Number of recruiter accounts (default: faculty / 50).")
+        parser.add_argument("--jobs", type=int, default=None,
+                            help="Number of jobs to post (default: faculty / 10).")
+        parser.add_argument("--saved-per-faculty", type=int, default=5,
+                            help="Maximum saved jobs per faculty.")
+        parser.add_argument("--marked-per-recruiter", type=int, default=20,
+                            help="Maximum marked profiles per recruiter.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--password", default="benchmark-pass",
+                            help="Password shared by every seeded account.")
+        parser.add_argument("--domain", default="seed.facultyfinder.test",
+                            help="Email domain used for seeded accounts.")
+        parser.add_argument("--flush", action="store_true",
+                            help="Delete previously seeded accounts on --domain first.")
+
+    def handle(self, *args, **options):
+        faculty_total = options["faculty"]
+        if faculty_total < 1:
+            raise CommandError("--faculty must be at least 1")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.domain = options["domain"]
+        recruiter_total = options["recruiters"] or max(1, faculty_total // 50)
+        job_total = options["jobs"] or max(1, faculty_total // 10)
+
+        if options["flush"]:
+            deleted, _ = User.objects.filter(email__endswith=f"@{self.domain}").delete()
+            self.stdout.write(f"Flushed {deleted} seeded rows")
+
+        # Hash once; PBKDF2 per row would dominate the run time.
+        self.password_hash = make_password(options["password"])
+        self.next_number = User.objects.filter(email__endswith=f"@{self.domain}").count()
+
+        started = time.monotonic()
+        self.seed_lookups()
+        recruiter_ids = self.seed_recruiters(recruiter_total)
+        faculty_ids = self.seed_faculty(faculty_total)
+        job_ids = self.seed_jobs(job_total, recruiter_ids)
+        self.seed_saved_jobs(faculty_ids, job_ids, options["saved_per_faculty"])
+        self.seed_marked_profiles(recruiter_ids, faculty_ids, options["marked_per_recruiter"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {recruiter_total} recruiters, {faculty_total} faculty and "
+            f"{job_total} jobs in {time.monotonic() - started:.1f}s"
+        ))
+
+    # -----------------------
+    # Helpers
+    # -----------------------
+    def make_users(self, count, role):
+        users = []
+        for _ in range(count):
+            users.append(User(
+                email=f"{role}{self.next_number}@{self.domain}",
+                password=self.password_hash,
+                is_faculty=role == "faculty",
+                is_recruiter=role == "recruiter",
+            ))
+            self.next_number += 1
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def progress(self, label, done, total):
+        self.stdout.write(f"  {label}: {done}/{total}", ending="\r")
+        if done >= total:
+            self.stdout.write("")
+
+    # -----------------------
+    # Seeders
+    # -----------------------
+    def seed_lookups(self):
+        Department.objects.bulk_create(
+            [Department(name=name) for name in DEPARTMENTS], ignore_conflicts=True
+        )
+        College.objects.bulk_create(
+            [College(name=name) for name in COLLEGES], ignore_conflicts=True
+        )
+        Degree.objects.bulk_create(
+            [Degree(name=name) for names in DEGREES.values() for name in names],
+            ignore_conflicts=True,
+        )
+        self.departments = list(
+            Department.objects.filter(name__in=DEPARTMENTS).values_list("id", "name")
+        )
+
+    def seed_recruiters(self, total):
+        ids = array("q")
+        for start, stop in chunked_range(total, self.batch_size):
+            with transaction.atomic():
+                users = self.make_users(stop - start, "recruiter")
+                RecruiterProfile.objects.bulk_create([
+                    RecruiterProfile(
+                        user=user,
+                        first_name=self.rng.choice(FIRST_NAMES),
+                        last_name=self.rng.choice(LAST_NAMES),
+                        college=self.rng.choice(COLLEGES),
+                    )
+                    for user in users
+                ], batch_size=self.batch_size)
+            ids.extend(user.id for user in users)
+            self.progress("recruiters", stop, total)
+        return ids
+
+    def seed_faculty(self, total):
+        rng = self.rng
+        ids = array("q")
+        for start, stop in chunked_range(total, self.batch_size):
+            with transaction.atomic():
+                users = self.make_users(stop - start, "faculty")
+                profiles = []
+                for user in users:
+                    state, city = rng.choice(STATES)
+                    profiles.append(FacultyProfile(
+                        user=user,
+                        title=rng.choice(["Dr.", "Prof.", ""]),
+                        first_name=rng.choice(FIRST_NAMES),
+                        last_name=rng.choice(LAST_NAMES),
+                        phone=f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+                        state=state,
+                        city=city,
+                        work_preference=rng.sample(WORK_PREFERENCES, rng.randint(1, 2)),
+                    ))
+                profiles = FacultyProfile.objects.bulk_create(profiles, batch_size=self.batch_size)
+
+                transcripts, educations, experiences = [], [], []
+                for profile in profiles:
+                    for _ in range(rng.randint(1, 3)):
+                        level = rng.choice(list(DEGREES))
+                        dept_id, dept_name = rng.choice(self.departments)
+                        transcripts.append(Transcript(
+                            profile=profile,
+                            degree_level=level,
+                            degree=f"{rng.choice(DEGREES[level])} {dept_name}",
+                            college=rng.choice(COLLEGES),
+                            major=dept_name,
+                            year_completed=rng.randint(1985, 2024),
+                            department_id=dept_id,
+                        ))
+                    educations.append(Education(
+                        profile=profile,
+                        degree=rng.choice(DEGREES["Master's"]),
+                        university=rng.choice(COLLEGES),
+                        year=rng.randint(1985, 2024),
+                    ))
+                    experiences.append(Experience(
+                        profile=profile,
+                        institution_or_company=rng.choice(COLLEGES),
+                        position=rng.choice(["Lecturer", "Assistant Professor", "Adjunct Faculty"]),
+                        start_date=timezone.now().date() - timedelta(days=rng.randint(365, 7000)),
+                    ))
+                transcripts = Transcript.objects.bulk_create(transcripts, batch_size=self.batch_size)
+                Education.objects.bulk_create(educations, batch_size=self.batch_size)
+                Experience.objects.bulk_create(experiences, batch_size=self.batch_size)
+
+                courses = []
+                for transcript in transcripts:
+                    for n in range(rng.randint(4, 8)):
+                        course_dept_id = transcript.department_id if rng.random() < 0.8 else rng.choice(self.departments)[0]
+                        courses.append(Course(
+                            transcript=transcript,
+                            code=f"{transcript.major[:3].upper()}{rng.randint(500, 899)}",
+                            name=f"{transcript.major} {rng.choice(COURSE_TOPICS)} {n + 1}",
+                            credits=rng.choice([3.0, 3.0, 3.0, 4.0, 1.5]),
+                            grade=rng.choice(GRADES),
+                            department_id=course_dept_id,
+                        ))
+                Course.objects.bulk_create(courses, batch_size=self.batch_size)
+            ids.extend(user.id for user in users)
+            self.progress("faculty", stop, total)
+        return ids
+
+    def seed_jobs(self, total, recruiter_ids):
+        rng = self.rng
+        today = timezone.now().date()
+        ids = array("q")
+        for start, stop in chunked_range(total, self.batch_size):
+            jobs = []
+            for _ in range(stop - start):
+                dept_name = rng.choice(self.departments)[1]
+                jobs.append(Job(
+                    title=f"{rng.choice(['Adjunct', 'Assistant Professor', 'Lecturer', 'Visiting Professor'])} - {dept_name}",
+                    department=dept_name,
+                    job_type=rng.choice(JOB_TYPES),
+                    description=f"Teach graduate and undergraduate courses in {dept_name}.",
+                    location=rng.choice(STATES)[1],
+                    experience_years=rng.randint(0, 10),
+                    course=dept_name,
+                    eligibility="Master's or Doctorate with 18 graduate credit hours in the discipline.",
+                    skills_required="Teaching, Curriculum Design, Research",
+                    deadline=today + timedelta(days=rng.randint(-30, 120)),
+                    status=rng.choices(["open", "paused", "closed"], weights=[8, 1, 1])[0],
+                    posted_by_id=rng.choice(recruiter_ids),
+                ))
+            with transaction.atomic():
+                jobs = Job.objects.bulk_create(jobs, batch_size=self.batch_size)
+            ids.extend(job.id for job in jobs)
+            self.progress("jobs", stop, total)
+        return ids
+
+    def seed_saved_jobs(self, faculty_ids, job_ids, per_faculty):
+        rng = self.rng
+        total = len(faculty_ids)
+        for start, stop in chunked_range(total, self.batch_size):
+            rows = []
+            for faculty_id in faculty_ids[start:stop]:
+                for job_id in set(rng.choice(job_ids) for _ in range(rng.randint(0, per_faculty))):
+                    rows.append(SavedJob(faculty_id=faculty_id, job_id=job_id))
+            SavedJob.objects.bulk_create(rows, batch_size=self.batch_size, ignore_conflicts=True)
+            self.progress("saved jobs", stop, total)
+
+    def seed_marked_profiles(self, recruiter_ids, faculty_ids, per_recruiter):
+        rng = self.rng
+        total = len(recruiter_ids)
+        for start, stop in chunked_range(total, self.batch_size):
+            rows = []
+            for recruiter_id in recruiter_ids[start:stop]:
+                for faculty_id in set(rng.choice(faculty_ids) for _ in range(rng.randint(0, per_recruiter))):
+                    rows.append(MarkedProfile(recruiter_id=recruiter_id, faculty_id=faculty_id))
+            MarkedProfile.objects.bulk_create(rows, batch_size=self.batch_size, ignore_conflicts=True)
+            self.progress("marked profiles", stop, total)
@@ -0,0 +1,62 @@
+# users/management/commands/sql_stats.py
+"""
+Show the SQL statements with the most total time per view, as recorded by
+SQLStatsMiddleware in every worker that writes to SQL_STATS_DIR.
+
+    python manage.py sql_stats --limit 20
+    python manage.py sql_stats --view faculty-search --explain
+    python manage.py sql_stats --json > sql-stats.json
+"""
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myjobs_backend.sql_stats import merged_report
+
+
+class Command(BaseCommand):
+    help = "Report SQL count/total/max time per view and fingerprint, with captured EXPLAIN plans."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=25)
+        parser.add_argument("--view", help="Only show statements issued by this view name.")
+        parser.add_argument("--explain", action="store_true", help="Print captured EXPLAIN plans.")
+        parser.add_argument("--json", action="store_true", help="Print the raw report as JSON.")
+        parser.add_argument("--reset", action="store_true", help="Delete the worker snapshots in SQL_STATS_DIR.")
+
+    def handle(self, *args, **options):
+        directory = getattr(settings, "SQL_STATS_DIR", None)
+        if not directory:
+            raise CommandError("SQL_STATS_DIR is not set; workers only keep statistics in memory (see /api/sql-stats/).")
+
+        if options["reset"]:
+            removed = 0
+            if os.path.isdir(directory):
+                for filename in os.listdir(directory):
+                    if filename.startswith("sql-stats-") and filename.endswith(".json"):
+                        os.remove(os.path.join(directory, filename))
+                        removed += 1
+            self.stdout.write(f"Removed {removed} snapshot(s).")
+            return
+
+        rows = merged_report(limit=options["limit"], view=options["view"])
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+        if not rows:
+            self.stdout.write("No statements recorded yet.")
+            return
+
+        for row in rows:
+            self.stdout.write(
+                f"{row['total_ms']:>10.1f} ms total  {row['count']:>7} calls  "
+                f"{row['mean_ms']:>8.2f} ms mean  {row['max_ms']:>8.1f} ms max  "
+                f"{row['slow']:>5} slow  {row['view']}"
+            )
+            self.stdout.write(f"    {row['fingerprint'][:300]}")
+            if options["explain"] and row["explain"]:
+                self.stdout.write(self.style.MIGRATE_HEADING("    EXPLAIN (ANALYZE, BUFFERS):"))
+                for line in row["explain"]["plan"].splitlines():
+                    self.stdout.write(f"      {line}")
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:47
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def file_size(name):
+    if not name:
+        return 0
+    try:
+        return default_storage.size(name)
+    except OSError:
+        return 0
+
+
+def clear_document_sizes(apps, schema_editor):
+    # Sizes were free-form client values (MB at best); they are recomputed below.
+    apps.get_model('users', 'Document').objects.update(size=None)
+
+
+def backfill_sizes(apps, schema_editor):
+    FacultyProfile = apps.get_model('users', 'FacultyProfile')
+    Document = apps.get_model('users', 'Document')
+    usage = {}
+
+    for document in Document.objects.exclude(file='').exclude(file=None).only('id', 'profile_id', 'file').iterator():
+        size = file_size(document.file.name)
+        Document.objects.filter(pk=document.pk).update(size=size)
+        usage[document.profile_id] = usage.get(document.profile_id, 0) + size
+    for model_name in ('Transcript', 'Certificate'):
+        rows = apps.get_model('users', model_name).objects.exclude(file='').exclude(file=None)
+        for profile_id, name in rows.values_list('profile_id', 'file').iterator():
+            usage[profile_id] = usage.get(profile_id, 0) + file_size(name)
+    for profile_id, *names in FacultyProfile.objects.values_list('id', 'profile_photo', 'resume', 'transcripts').iterator():
+        usage[profile_id] = usage.get(profile_id, 0) + sum(file_size(name) for name in names)
+
+    for profile_id, used in usage.items():
+        if used:
+            FacultyProfile.objects.filter(pk=profile_id).update(storage_used=used)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facultyprofile',
+            name='storage_used',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(clear_document_sizes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='document',
+            name='size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_sizes, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='users_store_ref_cou_bea737_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 # users/models.py
+import uuid
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
 from .managers import CustomUserManager
@@ -49,6 +50,15 @@ class FacultyProfile(models.Model):
     resume = models.FileField(upload_to='resumes/', null=True, blank=True)
     transcripts = models.FileField(upload_to='transcripts/', null=True, blank=True)
 
+    # Bytes of all files on the profile and its records, kept by users/signals.py
+    storage_used = models.PositiveBigIntegerField(default=0, editable=False)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # storage_used only changes through F() updates (users/blobs.py); never
+        # write back a stale in-memory value. Inserts still set it.
+        values = [value for value in values if value[0].attname != 'storage_used']
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
     def __str__(self):
         return f"{self.user.email} - FacultyProfile"
 
@@ -188,7 +198,7 @@ class Document(models.Model):
     doc_type = models.CharField(max_length=100, blank=True)
     file = models.FileField(upload_to='documents/', null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
-    size = models.FloatField(null=True, blank=True)  # MB if desired
+    size = models.PositiveBigIntegerField(null=True, blank=True)  # bytes, set from the file
     def __str__(self): return self.name
 
 class MarkedProfile(models.Model):
@@ -204,3 +214,75 @@ class MarkedProfile(models.Model):
     
     def __str__(self):
         return f"{self.recruiter.email} marked {self.faculty.email}"
+
+class ExportJob(models.Model):
+    """Background CSV/XLSX export of search or shortlist results (see users/exports.py)"""
+    SOURCE_CHOICES = (('search', 'search'), ('shortlist', 'shortlist'))
+    FORMAT_CHOICES = (('csv', 'csv'), ('xlsx', 'xlsx'))
+    STATUS_CHOICES = (('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed'))
+
+    recruiter = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='export_jobs')
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='exports/', null=True, blank=True)
+    row_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.source} export #{self.pk} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """Chunked, resumable upload of one file field (see users/uploads.py)"""
+    TARGET_CHOICES = (
+        ('transcript', 'transcript'), ('resume', 'resume'), ('document', 'document'),
+        ('certificate', 'certificate'), ('job_pdf', 'job_pdf'),
+    )
+    STATUS_CHOICES = (('uploading', 'uploading'), ('complete', 'complete'))
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='upload_sessions')
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)  # None for the profile resume
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()  # declared total, in bytes
+    offset = models.PositiveBigIntegerField(default=0)  # bytes received so far
+    checksum = models.CharField(max_length=64, blank=True)  # sha256 hex of the whole file
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.target} upload {self.pk} ({self.offset}/{self.size})"
+
+
+class StoredBlob(models.Model):
+    """
+    Reference count of a deduplicated media blob (myjobs_backend/storage.py),
+    kept by users/signals.py; blobs at zero are removed by gc_blobs.
+    """
+    name = models.CharField(max_length=255, primary_key=True)  # storage name, blobs/...
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['ref_count', 'updated_at'])]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
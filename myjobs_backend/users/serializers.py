@@ -1,20 +1,36 @@
 # users/serializers.py
 import re
 import json
+from functools import lru_cache
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.core.files.uploadedfile import UploadedFile
 from rest_framework import serializers
 from .models import (
     CustomUser, FacultyProfile, RecruiterProfile, Department, 
     College, Degree, Transcript, Course, Document, MarkedProfile,
-    Education, Certificate, Membership, Experience, Skill, Presentation
+    Education, Certificate, Membership, Experience, Skill, Presentation,
+    ExportJob, UploadSession
 )
+from .blobs import check_quota, file_fields, owning_profile_id, stored_size
+from .uploads import UPLOAD_TARGETS, UploadTooLarge, max_upload_bytes, target_object
 
 
 # -----------------------
 # Helper: normalize camelCase -> snake_case for incoming data
 # -----------------------
+_FIRST_CAP = re.compile("(.)([A-Z][a-z]+)")
+_ALL_CAP = re.compile("([a-z0-9])([A-Z])")
+
+
+@lru_cache(maxsize=4096)
 def camel_to_snake(name):
-    s1 = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
-    return re.sub("([a-z0-9])([A-Z])", r"\1_\2", s1).lower()
+    # Payload keys come from a small set, so after warm-up this is a dict lookup.
+    if name == name.lower():
+        return name
+    s1 = _FIRST_CAP.sub(r"\1_\2", name)
+    return _ALL_CAP.sub(r"\1_\2", s1).lower()
 
 
 def validate_file_size(file, max_mb=10):
@@ -28,18 +44,35 @@ def validate_file_size(file, max_mb=10):
 class CamelInputModelSerializer(serializers.ModelSerializer):
     """
     ModelSerializer that accepts camelCase keys from frontend by converting
-    them to snake_case before validation.
+    them to snake_case before validation, and checks uploaded files against
+    the profile storage quota.
     """
 
     def to_internal_value(self, data):
         if isinstance(data, dict):
-            new = {}
-            for key, val in data.items():
-                new_key = camel_to_snake(key) if any(c.isupper() for c in key) else key
-                new[new_key] = val
+            new = {camel_to_snake(key): val for key, val in data.items()}
             return super().to_internal_value(new)
         return super().to_internal_value(data)
 
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        self.validate_storage_quota(attrs)
+        return attrs
+
+    def validate_storage_quota(self, attrs):
+        """New uploads must fit the profile's storage quota (files they replace are freed)."""
+        uploads = {k: v for k, v in attrs.items() if isinstance(v, UploadedFile)}
+        request = self.context.get("request")
+        if not uploads or request is None:
+            return
+        replacing = 0
+        if self.instance is not None:
+            fields = file_fields(type(self.instance))
+            replacing = sum(
+                stored_size(fields[k], getattr(self.instance, k).name) for k in uploads if k in fields
+            )
+        check_quota(request.user, sum(f.size for f in uploads.values()), replacing)
+
 
 # -----------------------
 # Existing user / registration serializers
@@ -437,41 +470,42 @@ class TranscriptSerializer(CamelInputModelSerializer):
         # Add the profile to the validated data
         validated_data["profile"] = profile
 
-        # Create the transcript
-        transcript = super().create(validated_data)
+        # One transaction, so the cache bumps the Transcript signals schedule
+        # on commit run after the courses are written too
+        with transaction.atomic():
+            transcript = super().create(validated_data)
 
-        # Create associated courses
-        for course_data in courses_data:
-            # Create the course using the CourseSerializer to handle department and credits
-            course_serializer = CourseSerializer(data=course_data, context=self.context)
-            course_serializer.is_valid(raise_exception=True)
-            # Pass the parent transcript explicitly (field not declared on serializer fields)
-            course_serializer.save(transcript=transcript)
+            # Create associated courses (already validated by the nested CourseSerializer)
+            self._create_courses(transcript, courses_data)
 
         return transcript
 
+    def _create_courses(self, transcript, courses_data):
+        """Insert all courses for a transcript in a single query."""
+        courses = []
+        for course_data in courses_data:
+            course_data = dict(course_data)
+            course_data.pop("credit_hours", None)
+            course_data.pop("creditHours", None)
+            courses.append(Course(transcript=transcript, **course_data))
+        Course.objects.bulk_create(courses)
+
     def update(self, instance, validated_data, **kwargs):
         courses_data = validated_data.pop("courses", None)
 
         # Update transcript fields
         for attr, val in validated_data.items():
             setattr(instance, attr, val)
-        instance.save()
-
-        # Update courses if provided
-        if courses_data is not None:
-            # Delete existing courses
-            instance.courses.all().delete()
-
-            # Create new courses
-            for course_data in courses_data:
-                # Create the course using the CourseSerializer to handle department and credits
-                course_serializer = CourseSerializer(
-                    data=course_data, context=self.context
-                )
-                course_serializer.is_valid(raise_exception=True)
-                # Pass the parent transcript explicitly (field not declared on serializer fields)
-                course_serializer.save(transcript=instance)
+
+        # See create(): the courses are part of the committed change
+        with transaction.atomic():
+            instance.save()
+
+            # Update courses if provided
+            if courses_data is not None:
+                # Replace existing courses
+                instance.courses.all().delete()
+                self._create_courses(instance, courses_data)
 
         return instance
 
@@ -550,12 +584,18 @@ class DocumentSerializer(CamelInputModelSerializer):
 
     class Meta:
         model = Document
-        read_only_fields = ("id", "uploaded_at")
+        read_only_fields = ("id", "uploaded_at", "size")
         fields = ("id", "name", "doc_type", "file", "uploaded_at", "size")
 
 
 class MarkedProfileSerializer(serializers.ModelSerializer):
-    """Serializer for Marked Profile model"""
+    """
+    Serializer for Marked Profile model.
+
+    List views should select_related('faculty__facultyprofile') and pass a
+    precomputed ``faculty_departments`` map ({profile_id: [names]}) in the
+    context; otherwise departments are looked up per row.
+    """
     faculty_details = serializers.SerializerMethodField()
     
     class Meta:
@@ -598,18 +638,98 @@ class MarkedProfileSerializer(serializers.ModelSerializer):
     
     def _get_faculty_departments(self, faculty_profile):
         """Get all departments associated with a faculty user"""
-        departments = set()
-        
-        # Get departments from transcripts
-        transcript_depts = faculty_profile.transcripts_list.filter(
-            department__isnull=False
-        ).values_list('department__name', flat=True)
-        departments.update(transcript_depts)
-        
-        # Get departments from courses
-        course_depts = faculty_profile.transcripts_list.filter(
-            courses__department__isnull=False
-        ).values_list('courses__department__name', flat=True)
-        departments.update(course_depts)
-        
-        return list(departments)
+        departments_map = self.context.get('faculty_departments')
+        if departments_map is not None:
+            return departments_map.get(faculty_profile.id, [])
+        return departments_by_profile([faculty_profile.id]).get(faculty_profile.id, [])
+
+
+def departments_by_profile(profile_ids):
+    """
+    Map each FacultyProfile id to the department names found on its transcripts
+    and courses, using two queries regardless of how many profiles are given.
+    """
+    departments = {}
+    transcript_depts = Transcript.objects.filter(
+        profile_id__in=profile_ids, department__isnull=False
+    ).values_list('profile_id', 'department__name')
+    course_depts = Course.objects.filter(
+        transcript__profile_id__in=profile_ids, department__isnull=False
+    ).values_list('transcript__profile_id', 'department__name')
+
+    for profile_id, name in list(transcript_depts) + list(course_depts):
+        names = departments.setdefault(profile_id, [])
+        if name not in names:
+            names.append(name)
+    return departments
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Status of a background export; download_url is set once it is done."""
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'source', 'file_format', 'filters', 'status', 'row_count', 'error',
+                  'created_at', 'finished_at', 'download_url']
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'done' or not obj.file:
+            return None
+        url = reverse('export-job-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Create/status of a chunked upload (users/uploads.py). ``object_id`` names
+    the record to attach to (ignored for the resume); ``checksum`` is the
+    optional sha256 hex digest of the whole file.
+    """
+    max_chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'target', 'object_id', 'filename', 'size', 'checksum', 'offset', 'status',
+                  'max_chunk_size', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'offset', 'status', 'created_at', 'updated_at']
+        extra_kwargs = {'size': {'min_value': 1}}
+
+    def get_max_chunk_size(self, obj):
+        return getattr(settings, 'UPLOAD_CHUNK_MAX_BYTES', 8 * 1024 * 1024)
+
+    def validate_checksum(self, value):
+        if value and not re.fullmatch(r'[0-9a-fA-F]{64}', value):
+            raise serializers.ValidationError("Expected a sha256 hex digest")
+        return value.lower()
+
+    def validate(self, attrs):
+        target = attrs['target']
+        limit = max_upload_bytes(target)
+        if attrs['size'] > limit:
+            # Refused before a single byte is sent
+            raise UploadTooLarge(f"File size must be <= {limit // (1024 * 1024)} MB")
+        user = self.context['request'].user
+        instance = target_object(target, attrs.get('object_id'), user)
+        if instance is None:
+            raise serializers.ValidationError({'object_id': "No such record of yours to upload to"})
+        if owning_profile_id(instance) is not None:
+            field = file_fields(type(instance))[UPLOAD_TARGETS[target].field]
+            check_quota(user, attrs['size'], stored_size(field, getattr(instance, field.attname).name))
+        return attrs
+
+
+class BulkMarkSerializer(serializers.Serializer):
+    """Input for bulk mark/unmark: lists of faculty user ids"""
+    mark = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500)
+    unmark = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500)
+
+    def validate(self, attrs):
+        both = set(attrs['mark']) & set(attrs['unmark'])
+        if both:
+            raise serializers.ValidationError(f"Faculty ids both marked and unmarked: {sorted(both)}")
+        if not attrs['mark'] and not attrs['unmark']:
+            raise serializers.ValidationError("Provide faculty ids to mark and/or unmark.")
+        return attrs
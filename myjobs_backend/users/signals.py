@@ -0,0 +1,114 @@
+# users/signals.py
+"""
+Cache invalidation for the cached lookup lists, faculty search records and
+recruiter faculty detail payloads (see myjobs_backend/cache.py). Namespaces are bumped after commit so a
+concurrent rebuild can't cache the pre-commit state under the new version.
+
+File bookkeeping (users/blobs.py) is connected for every model with file
+fields at the bottom of this module.
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from myjobs_backend.cache import bump_namespace
+from .blobs import file_fields, file_names, files_changed
+from .faculty_detail import DETAIL_NAMESPACE, detail_namespace
+from .models import (
+    College, CustomUser, Degree, Department, Document, Education, Experience,
+    FacultyProfile, Transcript,
+)
+
+
+def bump_on_commit(*namespaces):
+    def bump():
+        for namespace in namespaces:
+            bump_namespace(namespace)
+    transaction.on_commit(bump)
+
+
+@receiver([post_save, post_delete], sender=Degree)
+@receiver([post_save, post_delete], sender=College)
+def lookups_changed(sender, **kwargs):
+    bump_on_commit('lookups')
+
+
+@receiver([post_save, post_delete], sender=Department)
+def department_changed(sender, **kwargs):
+    # Department names also appear in the search records and every detail payload
+    bump_on_commit('lookups', 'faculty-search', DETAIL_NAMESPACE)
+
+
+# Courses are only written through their transcript: TranscriptSerializer
+# saves the transcript and its courses (bulk_create, which sends no signals) in
+# one transaction, and deletes cascade. The Transcript signals' on_commit bumps
+# therefore run after the courses have changed too.
+@receiver([post_save, post_delete], sender=FacultyProfile)
+@receiver([post_save, post_delete], sender=Transcript)
+def faculty_search_changed(sender, **kwargs):
+    bump_on_commit('faculty-search')
+
+
+@receiver(post_save, sender=CustomUser)
+def faculty_user_changed(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no payload shows
+    if instance.is_faculty and update_fields != frozenset({'last_login'}):
+        bump_on_commit(detail_namespace(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=FacultyProfile)
+def faculty_profile_changed(sender, instance, **kwargs):
+    bump_on_commit(detail_namespace(instance.user_id))
+
+
+# Only the child models shown in the detail payload; courses again come
+# through their transcript.
+@receiver([post_save, post_delete], sender=Education)
+@receiver([post_save, post_delete], sender=Transcript)
+@receiver([post_save, post_delete], sender=Experience)
+@receiver([post_save, post_delete], sender=Document)
+def faculty_detail_changed(sender, instance, **kwargs):
+    profile = sender._meta.get_field('profile').get_cached_value(instance, default=None)
+    if profile is not None:
+        user_id = profile.user_id
+    else:
+        user_id = FacultyProfile.objects.filter(pk=instance.profile_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        bump_on_commit(detail_namespace(user_id))
+
+
+# -----------------------
+# Stored files
+# -----------------------
+def remember_files(sender, instance, **kwargs):
+    instance._stored_files = file_names(instance)
+
+
+def track_saved_files(sender, instance, created, **kwargs):
+    before = {} if created else getattr(instance, '_stored_files', {})
+    after = file_names(instance)
+    files_changed(instance, before, after)
+    instance._stored_files = after
+
+
+def track_deleted_files(sender, instance, **kwargs):
+    files_changed(instance, file_names(instance), {name: '' for name in file_fields(sender)})
+
+
+@receiver(pre_save, sender=Document)
+def document_size(sender, instance, **kwargs):
+    name = instance.file.name or ''
+    if instance.size is None or name != getattr(instance, '_stored_files', {}).get('file', ''):
+        try:
+            instance.size = instance.file.size if instance.file else None
+        except OSError:  # file missing from storage
+            instance.size = None
+
+
+for _model in apps.get_models():
+    if file_fields(_model):
+        post_init.connect(remember_files, sender=_model)
+        post_save.connect(track_saved_files, sender=_model)
+        post_delete.connect(track_deleted_files, sender=_model)
+
@@ -1,3 +1,647 @@
-from django.test import TestCase
+import base64
+import csv
+import hashlib
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myjobs_backend.query_budget import QueryBudgetTestMixin
+from myjobs_backend.renderers import msgpack, snake_to_camel
+from myjobs_backend.storage import blob_name
+from .blobs import QuotaExceeded, check_quota
+from .exports import CONTENT_TYPES, EXPORT_COLUMNS
+from .faculty_detail import detail_namespace
+from .models import (
+    College, Course, Degree, Department, Document, ExportJob, FacultyProfile, MarkedProfile,
+    RecruiterProfile, StoredBlob, Transcript, UploadSession,
+)
+from .serializers import (
+    CourseSerializer, EducationSerializer, FacultyProfileSerializer, TranscriptSerializer, camel_to_snake,
+)
+from .uploads import ChecksumMismatch, OffsetMismatch, append_chunk, complete_upload, partial_path
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'myjobs_backend.cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {'LOCAL_TIMEOUT': 0},
+    },
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'users-tests'},
+}
+
+
+def auth(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+def sha256_b64(data):
+    return 'sha256 ' + base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+class MediaTestCase(TestCase):
+    """Media and partial uploads in a temporary directory, caches in memory."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media, UPLOAD_SESSION_DIR=f'{media}/partial', CACHES=LOCMEM_CACHES,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for alias in ('default', 'shared'):
+            caches[alias].clear()
+
+
+def make_faculty(email, department=None):
+    user = User.objects.create_user(email=email, password='pw', is_faculty=True)
+    profile = FacultyProfile.objects.create(user=user, first_name='Ada', last_name='Lovelace')
+    if department is not None:
+        transcript = Transcript.objects.create(
+            profile=profile, degree='PhD', college='State', department=department,
+        )
+        Course.objects.create(transcript=transcript, name='Algorithms', credits=3, department=department)
+    return user
+
+
+def make_recruiter(email):
+    user = User.objects.create_user(email=email, password='pw', is_recruiter=True)
+    RecruiterProfile.objects.create(user=user, first_name='Grace', last_name='Hopper')
+    return user
+
+
+class ViewQueryBudgetTests(QueryBudgetTestMixin, MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science')
+        Degree.objects.create(name='PhD')
+        College.objects.create(name='State University')
+        cls.faculty = make_faculty('faculty@example.com', cls.department)
+        cls.other_faculty = make_faculty('other@example.com', cls.department)
+        cls.recruiter = make_recruiter('recruiter@example.com')
+        MarkedProfile.objects.create(recruiter=cls.recruiter, faculty=cls.other_faculty)
+
+    def test_faculty_profile(self):
+        response = self.assertWithinQueryBudget(self.client, reverse('faculty-profile'), **auth(self.faculty))
+        self.assertEqual(response.status_code, 200)
+
+    def test_transcripts(self):
+        response = self.assertWithinQueryBudget(self.client, reverse('faculty-transcripts'), **auth(self.faculty))
+        self.assertEqual(response.status_code, 200)
+
+    def test_lookups(self):
+        for name in ('degrees-list', 'colleges-list', 'departments-list'):
+            with self.subTest(name):
+                response = self.assertWithinQueryBudget(self.client, reverse(name))
+                self.assertEqual(len(response.data), 1)
+
+    def test_faculty_search(self):
+        url = reverse('recruiter-faculty-search') + '?department=Computer%20Science'
+        response = self.assertWithinQueryBudget(self.client, url, **auth(self.recruiter))
+        # Faculty the recruiter already marked are left out
+        self.assertEqual([r['id'] for r in response.data], [self.faculty.id])
+
+    def test_faculty_detail(self):
+        url = reverse('recruiter-faculty-detail', args=[self.other_faculty.id])
+        response = self.assertWithinQueryBudget(self.client, url, **auth(self.recruiter))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_marked'])
+
+    def test_faculty_compare(self):
+        ids = f'{self.faculty.id},{self.other_faculty.id},999999'
+        url = reverse('recruiter-faculty-compare') + f'?ids={ids}'
+        response = self.assertWithinQueryBudget(self.client, url, **auth(self.recruiter))
+        self.assertEqual([r['id'] for r in response.data['results']], [self.faculty.id, self.other_faculty.id])
+        self.assertEqual(response.data['not_found'], [999999])
+
+    def test_marked_profiles(self):
+        response = self.assertWithinQueryBudget(self.client, reverse('marked-profiles'), **auth(self.recruiter))
+        self.assertEqual([m['faculty'] for m in response.data], [self.other_faculty.id])
+
+    def test_is_profile_marked(self):
+        url = reverse('is-profile-marked', args=[self.other_faculty.id])
+        response = self.assertWithinQueryBudget(self.client, url, **auth(self.recruiter))
+        self.assertTrue(response.data['is_marked'])
+
+    def test_bulk_mark_profiles(self):
+        data = {'mark': [self.faculty.id, self.recruiter.id], 'unmark': [self.other_faculty.id]}
+        response = self.assertWithinQueryBudget(
+            self.client, reverse('bulk-mark-profiles'), 'post', data,
+            content_type='application/json', **auth(self.recruiter),
+        )
+        self.assertEqual(response.data['marked'], {
+            str(self.faculty.id): True, str(self.other_faculty.id): False, str(self.recruiter.id): False,
+        })
+        self.assertEqual(response.data['invalid'], [self.recruiter.id])
+
+    def test_exports(self):
+        for name in ('faculty-search-export', 'marked-profiles-export'):
+            with self.subTest(name):
+                response = self.assertWithinQueryBudget(
+                    self.client, reverse(name, args=['csv']), **auth(self.recruiter),
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'].split(';')[0], 'text/csv')
+
+    def test_export_job_detail(self):
+        job = ExportJob.objects.create(recruiter=self.recruiter, source='search', file_format='csv')
+        url = reverse('export-job-detail', args=[job.pk])
+        response = self.assertWithinQueryBudget(self.client, url, **auth(self.recruiter))
+        self.assertEqual(response.data['status'], 'pending')
+
+    def test_upload_session_detail(self):
+        session = UploadSession.objects.create(
+            owner=self.faculty, target='resume', filename='cv.pdf', size=10,
+        )
+        url = reverse('upload-session-detail', args=[session.pk])
+        for method in ('get', 'head'):
+            with self.subTest(method):
+                response = self.assertWithinQueryBudget(self.client, url, method, **auth(self.faculty))
+                self.assertEqual(response['Upload-Offset'], '0')
+        response = self.assertWithinQueryBudget(
+            self.client, url, 'patch', b'0123456789', content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET='0', **auth(self.faculty),
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['Upload-Offset'], '10')
+
+
+class ChunkedUploadTests(MediaTestCase):
+    data = b'%PDF-1.4 ' + b'x' * 91
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_faculty('uploader@example.com')
+        self.document = Document.objects.create(profile=self.user.facultyprofile, name='Syllabus')
+        self.session = UploadSession.objects.create(
+            owner=self.user, target='document', object_id=self.document.pk, filename='syllabus.pdf',
+            size=len(self.data), checksum=hashlib.sha256(self.data).hexdigest(),
+        )
+        self.url = reverse('upload-session-detail', args=[self.session.pk])
+
+    def patch(self, data, offset, **extra):
+        return self.client.patch(
+            self.url, data, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset), **extra, **auth(self.user),
+        )
+
+    def test_chunk_must_start_at_offset(self):
+        self.assertEqual(self.patch(self.data[:40], 0).status_code, 204)
+        response = self.patch(self.data[50:], 50)
+        self.assertEqual(response.status_code, 409)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.offset, 40)
+
+    def test_bad_chunk_checksum_is_cut_off(self):
+        self.patch(self.data[:40], 0)
+        with self.assertRaises(ChecksumMismatch):
+            append_chunk(self.session, BytesIO(self.data[40:]), 40, len(self.data) - 40, ('sha256', b'\0' * 32))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.offset, 40)
+        with open(partial_path(self.session), 'rb') as fh:
+            self.assertEqual(fh.read(), self.data[:40])
+
+    def test_resume_from_reported_offset(self):
+        self.patch(self.data[:40], 0, HTTP_UPLOAD_CHECKSUM=sha256_b64(self.data[:40]))
+        # The connection dropped; ask where to continue
+        offset = int(self.client.head(self.url, **auth(self.user))['Upload-Offset'])
+        self.assertEqual(offset, 40)
+        response = self.patch(self.data[offset:], offset, HTTP_UPLOAD_CHECKSUM=sha256_b64(self.data[offset:]))
+        self.assertEqual(response['Upload-Offset'], str(len(self.data)))
+
+        response = self.client.post(reverse('upload-session-complete', args=[self.session.pk]), **auth(self.user))
+        self.assertEqual(response.status_code, 200)
+        self.document.refresh_from_db()
+        with self.document.file.open('rb') as fh:
+            self.assertEqual(fh.read(), self.data)
+        self.assertEqual(self.document.size, len(self.data))
+
+    def test_complete_rejects_wrong_file_checksum(self):
+        append_chunk(self.session, BytesIO(b'y' * len(self.data)), 0, len(self.data))
+        with self.assertRaises(ChecksumMismatch):
+            complete_upload(self.session, self.user)
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.offset, self.session.status), (0, 'uploading'))
+
+    def test_complete_needs_every_byte(self):
+        append_chunk(self.session, BytesIO(self.data[:40]), 0, 40)
+        with self.assertRaises(OffsetMismatch):
+            complete_upload(self.session, self.user)
+
+
+class StoredBlobTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_faculty('blobs@example.com')
+        self.profile = self.user.facultyprofile
+
+    def document(self, content, name='Doc'):
+        doc = Document(profile=self.profile, name=name)
+        doc.file.save('doc.pdf', ContentFile(content), save=False)
+        doc.save()
+        return doc
+
+    def refs(self, content):
+        blob = StoredBlob.objects.get(name=blob_name(hashlib.sha256(content).hexdigest(), '.pdf'))
+        return blob.ref_count
+
+    def storage_used(self):
+        return FacultyProfile.objects.get(pk=self.profile.pk).storage_used
+
+    def test_same_content_is_stored_once(self):
+        first, second = self.document(b'same bytes'), self.document(b'same bytes')
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(self.refs(b'same bytes'), 2)
+        self.assertEqual(self.storage_used(), 2 * len(b'same bytes'))
+
+    def test_replace_and_delete_move_references(self):
+        doc = self.document(b'old content')
+        doc.file.save('new.pdf', ContentFile(b'new content!'))
+        self.assertEqual(self.refs(b'old content'), 0)
+        self.assertEqual(self.refs(b'new content!'), 1)
+        self.assertEqual(self.storage_used(), len(b'new content!'))
+
+        doc.delete()
+        self.assertEqual(self.refs(b'new content!'), 0)
+        self.assertEqual(self.storage_used(), 0)
+
+    def test_profile_save_keeps_storage_used(self):
+        self.document(b'counted')
+        stale = FacultyProfile.objects.get(pk=self.profile.pk)
+        self.document(b'counted too')
+        stale.first_name = 'Augusta'
+        stale.save()
+        self.assertEqual(self.storage_used(), len(b'counted') + len(b'counted too'))
+
+    def test_gc_removes_only_unreferenced_blobs(self):
+        kept, dropped = self.document(b'kept'), self.document(b'dropped')
+        dropped_name = dropped.file.name
+        dropped.delete()
+        StoredBlob.objects.update(updated_at=timezone.now() - timedelta(hours=48))
+
+        call_command('gc_blobs', hours=24, stdout=StringIO())
+        self.assertFalse(StoredBlob.objects.filter(name=dropped_name).exists())
+        self.assertFalse(kept.file.storage.exists(dropped_name))
+        self.assertTrue(kept.file.storage.exists(kept.file.name))
+        self.assertEqual(self.refs(b'kept'), 1)
+
+    @override_settings(PROFILE_STORAGE_QUOTA_MB=1)
+    def test_quota(self):
+        megabyte = 1024 * 1024
+        self.document(b'z' * (megabyte - 10))
+        check_quota(self.user, 10)
+        with self.assertRaises(QuotaExceeded):
+            check_quota(self.user, 11)
+        # Replacing a file only counts the difference
+        check_quota(self.user, megabyte - 10, replacing=megabyte - 10)
+
+        response = self.client.post(reverse('upload-sessions'), {
+            'target': 'resume', 'filename': 'cv.pdf', 'size': 100,
+        }, content_type='application/json', **auth(self.user))
+        self.assertEqual(response.status_code, 413)
+
+    @override_settings(PROFILE_STORAGE_QUOTA_MB=1)
+    def test_quota_is_checked_again_on_completion(self):
+        data = b'r' * 100
+        session = UploadSession.objects.create(owner=self.user, target='resume', filename='cv.pdf', size=len(data))
+        append_chunk(session, BytesIO(data), 0, len(data))
+        # Another upload used up the quota after this session was created
+        self.document(b'z' * (1024 * 1024 - 50))
+        with self.assertRaises(QuotaExceeded):
+            complete_upload(session, self.user)
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.resume)
+
+
+class FacultySearchStreamTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science')
+        cls.faculty = make_faculty('faculty@example.com', cls.department)
+        cls.recruiter = make_recruiter('recruiter@example.com')
+        cls.url = reverse('recruiter-faculty-search')
+
+    def search(self, query, accept='application/json'):
+        return self.client.get(self.url + query, HTTP_ACCEPT=accept, **auth(self.recruiter))
+
+    def test_stream_uses_negotiated_renderer(self):
+        for accept, key in (('application/json', 'first_name'),
+                            ('application/vnd.facultyfinder.camel+json', 'firstName')):
+            with self.subTest(accept):
+                response = self.search('?stream=1', accept)
+                self.assertEqual(response['Content-Type'], accept)
+                self.assertIn('Accept', response['Vary'])
+                records = json.loads(b''.join(response.streaming_content))
+                self.assertEqual([r['id'] for r in records], [self.faculty.id])
+                self.assertEqual(records[0][key], 'Ada')
+
+    @override_settings(FACULTY_SEARCH_CACHE_MAX_RECORDS=0)
+    def test_large_result_keeps_camel_case(self):
+        response = self.search('', 'application/vnd.facultyfinder.camel+json')
+        self.assertTrue(response.streaming)
+        records = json.loads(b''.join(response.streaming_content))
+        self.assertIn('profilePhotoUrl', records[0])
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_cannot_stream(self):
+        self.assertEqual(self.search('?stream=1', 'application/msgpack').status_code, 406)
+        self.assertEqual(self.search('', 'application/msgpack').status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TranscriptCacheInvalidationTests(TransactionTestCase):
+    """Real commits, so the on_commit cache bumps run as they do in production."""
+
+    def setUp(self):
+        for alias in ('default', 'shared'):
+            caches[alias].clear()
+        self.faculty = make_faculty('faculty@example.com', Department.objects.create(name='Computer Science'))
+        self.recruiter = make_recruiter('recruiter@example.com')
+        self.transcript_url = reverse(
+            'faculty-transcript-detail', args=[Transcript.objects.get(profile__user=self.faculty).pk],
+        )
+
+    def replace_courses(self, *names):
+        response = self.client.patch(
+            self.transcript_url, {'courses': [{'name': name, 'credits': 3} for name in names]},
+            content_type='application/json', **auth(self.faculty),
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def course_names(self):
+        return list(Course.objects.filter(transcript__profile__user=self.faculty).values_list('name', flat=True))
+
+    def test_namespaces_are_bumped_after_the_courses_are_written(self):
+        seen = {}
+
+        def record(namespace):
+            seen[namespace] = self.course_names()
+
+        with mock.patch('users.signals.bump_namespace', side_effect=record):
+            self.replace_courses('Compilers')
+        self.assertEqual(seen['faculty-search'], ['Compilers'])
+        self.assertEqual(seen[detail_namespace(self.faculty.id)], ['Compilers'])
+
+    def test_detail_and_search_are_rebuilt(self):
+        detail_url = reverse('recruiter-faculty-detail', args=[self.faculty.id])
+        search_url = reverse('recruiter-faculty-search') + '?course=Compilers'
+
+        def detail_courses():
+            payload = self.client.get(detail_url, **auth(self.recruiter)).data
+            return [c['name'] for block in payload['applicable_courses']['degrees'] for c in block['courses']]
+
+        def search_ids():
+            return [r['id'] for r in self.client.get(search_url, **auth(self.recruiter)).data]
+
+        self.assertEqual((detail_courses(), search_ids()), (['Algorithms'], []))
+        self.replace_courses('Compilers')
+        self.assertEqual((detail_courses(), search_ids()), (['Compilers'], [self.faculty.id]))
+
+
+class FacultyCompareTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science')
+        cls.faculty = [make_faculty(f'faculty{i}@example.com', department) for i in range(3)]
+        cls.recruiter = make_recruiter('recruiter@example.com')
+        MarkedProfile.objects.create(recruiter=cls.recruiter, faculty=cls.faculty[1])
+        cls.url = reverse('recruiter-faculty-compare')
+
+    def compare(self, query, user=None):
+        return self.client.get(self.url + query, **auth(user or self.recruiter))
+
+    def test_results_keep_the_requested_order(self):
+        a, b, c = (f.id for f in self.faculty)
+        response = self.compare(f'?ids={c},{a},999999,{c},{b}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(r['id'], r['is_marked']) for r in response.data['results']], [(c, False), (a, False), (b, True)],
+        )
+        self.assertEqual(response.data['not_found'], [999999])
+
+    def test_results_match_the_detail_payload(self):
+        faculty = self.faculty[1]
+        result, = self.compare(f'?ids={faculty.id}').data['results']
+        detail = self.client.get(reverse('recruiter-faculty-detail', args=[faculty.id]), **auth(self.recruiter)).data
+        self.assertEqual({key: value for key, value in result.items() if key != 'id'}, detail)
+
+    def test_sections(self):
+        result, = self.compare(f'?ids={self.faculty[0].id}&sections=basic_info,applicable_courses').data['results']
+        self.assertEqual(set(result), {'id', 'basic_info', 'applicable_courses', 'is_marked'})
+        response = self.compare(f'?ids={self.faculty[0].id}&sections=basic_info,salary')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('salary', response.data['sections'])
+
+    def test_query_count_does_not_depend_on_the_number_of_ids(self):
+        counts = []
+        for faculty in (self.faculty[:1], self.faculty):
+            for alias in ('default', 'shared'):
+                caches[alias].clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.compare('?ids=' + ','.join(str(f.id) for f in faculty))
+            self.assertEqual(len(response.data['results']), len(faculty))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    @override_settings(FACULTY_COMPARE_MAX=2)
+    def test_invalid_requests(self):
+        ids = ','.join(str(f.id) for f in self.faculty)
+        for query in ('', '?ids=', '?ids=1,x', f'?ids={ids}'):
+            with self.subTest(query):
+                self.assertEqual(self.compare(query).status_code, 400)
+        self.assertEqual(self.compare(f'?ids={self.faculty[0].id}', self.faculty[0]).status_code, 403)
+
+
+class BulkMarkTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = [make_faculty(f'faculty{i}@example.com') for i in range(3)]
+        cls.recruiter = make_recruiter('recruiter@example.com')
+        cls.other_recruiter = make_recruiter('other@example.com')
+        MarkedProfile.objects.create(recruiter=cls.recruiter, faculty=cls.faculty[0])
+        MarkedProfile.objects.create(recruiter=cls.other_recruiter, faculty=cls.faculty[1])
+
+    def bulk(self, data, user=None):
+        return self.client.post(
+            reverse('bulk-mark-profiles'), data, content_type='application/json', **auth(user or self.recruiter),
+        )
+
+    def marked(self, recruiter):
+        return sorted(MarkedProfile.objects.filter(recruiter=recruiter).values_list('faculty_id', flat=True))
+
+    def test_mark_and_unmark_in_one_request(self):
+        a, b, c = (f.id for f in self.faculty)
+        response = self.bulk({'mark': [a, b, c], 'unmark': []})
+        self.assertEqual(response.status_code, 200)
+        # Already marked faculty are skipped, not duplicated
+        self.assertEqual(self.marked(self.recruiter), [a, b, c])
+
+        response = self.bulk({'mark': [], 'unmark': [a, c, 999999]})
+        self.assertEqual(response.data, {'marked': {str(a): False, str(c): False, '999999': False}, 'invalid': []})
+        self.assertEqual(self.marked(self.recruiter), [b])
+        # Another recruiter's marks are untouched
+        self.assertEqual(self.marked(self.other_recruiter), [b])
+
+    def test_only_faculty_accounts_can_be_marked(self):
+        response = self.bulk({'mark': [self.faculty[1].id, self.other_recruiter.id]})
+        self.assertEqual(response.data['invalid'], [self.other_recruiter.id])
+        self.assertEqual(self.marked(self.recruiter), sorted([self.faculty[0].id, self.faculty[1].id]))
+
+    def test_invalid_input(self):
+        a = self.faculty[0].id
+        for data in ({}, {'mark': [], 'unmark': []}, {'mark': [a], 'unmark': [a]}, {'mark': ['x']},
+                     {'mark': list(range(1, 502))}):
+            with self.subTest(data=str(data)[:40]):
+                self.assertEqual(self.bulk(data).status_code, 400)
+        self.assertEqual(self.marked(self.recruiter), [a])
+
+    def test_recruiters_only(self):
+        self.assertEqual(self.bulk({'mark': [self.faculty[1].id]}, self.faculty[0]).status_code, 403)
+
+
+CAMEL = 'application/vnd.facultyfinder.camel+json'
+
+
+class CamelCaseRoundTripTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science')
+        cls.faculty = make_faculty('faculty@example.com')
+
+    def camel(self, method, url, data=None):
+        return getattr(self.client, method)(
+            url, data, content_type='application/json', HTTP_ACCEPT=CAMEL, **auth(self.faculty),
+        )
+
+    def test_serializer_field_names_round_trip(self):
+        for serializer in (FacultyProfileSerializer, TranscriptSerializer, CourseSerializer, EducationSerializer):
+            # CourseSerializer also declares a creditHours alias
+            for name in (n for n in serializer().fields if n.islower()):
+                with self.subTest(f'{serializer.__name__}.{name}'):
+                    self.assertEqual(camel_to_snake(snake_to_camel(name)), name)
+
+    def test_profile_output_can_be_sent_back(self):
+        profile = self.camel('get', reverse('faculty-profile')).data
+        self.assertIn('firstName', profile)
+        self.assertNotIn('first_name', profile)
+
+        editable = {key: value for key, value in profile.items()
+                    if key not in ('id', 'user', 'profilePhoto', 'resume', 'transcripts', 'dob')}
+        editable.update(firstName='Grace', workPreference=['Remote', 'Hybrid'])
+        response = self.camel('patch', reverse('faculty-profile'), editable)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual({key: response.data[key] for key in editable}, editable)
+
+        stored = FacultyProfile.objects.get(user=self.faculty)
+        self.assertEqual((stored.first_name, stored.work_preference), ('Grace', ['Remote', 'Hybrid']))
+
+    def test_nested_courses(self):
+        response = self.camel('post', reverse('faculty-transcripts'), {
+            'degreeLevel': 'Doctorate', 'degree': 'PhD', 'college': 'State', 'yearCompleted': 2020,
+            'department': self.department.id,
+            'courses': [{'name': 'Compilers', 'creditHours': 3, 'credits': 4, 'department': self.department.id}],
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual((response.data['yearCompleted'], response.data['departmentName']), (2020, 'Computer Science'))
+        course, = response.data['courses']
+        self.assertEqual((course['name'], course['departmentName']), ('Compilers', 'Computer Science'))
+        self.assertNotIn('creditHours', course)  # write-only
+
+
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def xlsx_rows(content):
+    """Cell values of the first sheet; XlsxWriter's constant-memory mode writes inline strings."""
+    with zipfile.ZipFile(BytesIO(content)) as workbook:
+        sheet = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+    rows = []
+    for row in sheet.iter(f'{XLSX_NS}row'):
+        values = {}
+        for cell in row:
+            text = cell.find(f'{XLSX_NS}is/{XLSX_NS}t')
+            value = text.text if text is not None else float(cell.find(f'{XLSX_NS}v').text)
+            values[cell.get('r').rstrip('0123456789')] = value
+        rows.append([values.get(chr(ord('A') + i), '') for i in range(len(EXPORT_COLUMNS))])
+    return rows
+
+
+class ExportContentTests(MediaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cs = Department.objects.create(name='Computer Science')
+        cls.ada = make_faculty('ada@example.com', cs)
+        cls.historian = make_faculty('historian@example.com', Department.objects.create(name='History'))
+        cls.shortlisted = make_faculty('shortlisted@example.com', cs)
+        cls.recruiter = make_recruiter('recruiter@example.com')
+        MarkedProfile.objects.create(recruiter=cls.recruiter, faculty=cls.shortlisted)
+
+    def expected(self, user, department):
+        return [user.id, 'Ada', 'Lovelace', 'Ada Lovelace', user.email, department, '',
+                f'State – PhD – {department}', 3.0, 1]
+
+    def export(self, name, file_format, query=''):
+        response = self.client.get(reverse(name, args=[file_format]) + query, **auth(self.recruiter))
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        self.assertEqual(response['Content-Type'], CONTENT_TYPES[file_format])
+        self.assertIn(f'.{file_format}"', response['Content-Disposition'])
+        content = b''.join(response.streaming_content)
+        response.close()
+        if file_format == 'xlsx':
+            return xlsx_rows(content)
+        return list(csv.reader(StringIO(content.decode('utf-8'))))
+
+    def test_search_export_content(self):
+        ada, historian = self.expected(self.ada, 'Computer Science'), self.expected(self.historian, 'History')
+        csv_rows = self.export('faculty-search-export', 'csv')
+        self.assertEqual(csv_rows, [EXPORT_COLUMNS, [str(v) for v in ada], [str(v) for v in historian]])
+        # The shortlisted faculty is left out, as in the search itself
+        self.assertEqual(self.export('faculty-search-export', 'xlsx'), [EXPORT_COLUMNS, ada, historian])
+
+    def test_search_export_applies_the_active_filters(self):
+        cases = {
+            '?department=History': [self.historian],
+            '?department=Computer%20Science&course=Algorithms': [self.ada],
+            '?degree=MBA': [],
+            '?unknown=1': [self.ada, self.historian],
+        }
+        for query, faculty in cases.items():
+            for file_format in ('csv', 'xlsx'):
+                with self.subTest(query=query, file_format=file_format):
+                    rows = self.export('faculty-search-export', file_format, query)
+                    self.assertEqual([int(float(row[0])) for row in rows[1:]], [f.id for f in faculty])
+
+    def test_shortlist_export_ignores_search_filters(self):
+        expected = self.expected(self.shortlisted, 'Computer Science')
+        rows = self.export('marked-profiles-export', 'xlsx', '?department=History')
+        self.assertEqual(rows, [EXPORT_COLUMNS, expected])
+
+    @override_settings(EXPORT_SYNC_MAX_ROWS=1)
+    def test_large_exports_are_queued_with_their_filters(self):
+        url = reverse('faculty-search-export', args=['xlsx']) + '?course=Algorithms&unknown=1'
+        response = self.client.get(url, **auth(self.recruiter))
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get(pk=response.data['id'])
+        self.assertEqual((job.file_format, job.source, job.filters), ('xlsx', 'search', {'course': 'Algorithms'}))
+
+    def test_unknown_format(self):
+        url = reverse('faculty-search-export', args=['pdf'])
+        self.assertEqual(self.client.get(url, **auth(self.recruiter)).status_code, 404)
@@ -0,0 +1,234 @@
+# users/uploads.py
+"""
+Chunked, resumable uploads into the file fields of transcripts, resumes,
+documents, certificates and job PDFs.
+
+    POST   /api/uploads/                 {target, object_id, filename, size, checksum?}
+    PATCH  /api/uploads/<id>/            raw chunk; Upload-Offset: <n>, Upload-Checksum: sha256 <base64>
+    HEAD   /api/uploads/<id>/            Upload-Offset of the bytes received so far
+    POST   /api/uploads/<id>/complete/   attach the file to its record
+
+The declared size is checked against the target's limit when the session is
+created, so an oversize file is refused before any data is sent, and no
+chunk may run past the declared size. Chunks are streamed from the request
+into a partial file under UPLOAD_SESSION_DIR, never held in memory, and a
+chunk whose checksum doesn't match is cut off again. A client that lost its
+connection asks for the offset and resumes from there. On completion the
+whole file is checked against ``checksum`` and moved into the field's
+storage (a rename on the local file system).
+
+The partial files live on local disk, so every worker serving a session must
+share UPLOAD_SESSION_DIR.
+"""
+import base64
+import binascii
+import hashlib
+import os
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File, locks
+from django.db import transaction
+from django.utils.text import get_valid_filename
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .blobs import check_quota, owning_profile_id, stored_size
+from .models import FacultyProfile
+
+COPY_CHUNK_SIZE = 64 * 1024
+CHECKSUM_ALGORITHMS = ('sha256', 'sha1', 'md5')
+
+
+@dataclass(frozen=True)
+class UploadTarget:
+    model: str         # 'app_label.Model'
+    field: str         # FileField receiving the upload
+    owner_lookup: str  # path from the model to the owning user
+    max_mb: int        # same limits as the multipart serializers
+
+
+UPLOAD_TARGETS = {
+    'transcript': UploadTarget('users.Transcript', 'file', 'profile__user', 5),
+    'resume': UploadTarget('users.FacultyProfile', 'resume', 'user', 10),
+    'document': UploadTarget('users.Document', 'file', 'profile__user', 5),
+    'certificate': UploadTarget('users.Certificate', 'file', 'profile__user', 5),
+    'job_pdf': UploadTarget('jobs.Job', 'pdf_document', 'posted_by', 10),
+}
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'File is larger than allowed for this upload.'
+    default_code = 'upload_too_large'
+
+
+class OffsetMismatch(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Chunk does not start at the current upload offset.'
+    default_code = 'offset_mismatch'
+
+
+class ChecksumMismatch(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Checksum does not match the data received.'
+    default_code = 'checksum_mismatch'
+
+
+class UploadBusy(APIException):
+    status_code = status.HTTP_423_LOCKED
+    default_detail = 'Another chunk of this upload is being written.'
+    default_code = 'upload_busy'
+
+
+class PartialFile(File):
+    """Lets FileSystemStorage move the finished partial file instead of copying it."""
+
+    def temporary_file_path(self):
+        return self.name
+
+
+# -----------------------
+# Targets
+# -----------------------
+def max_upload_bytes(target):
+    return UPLOAD_TARGETS[target].max_mb * 1024 * 1024
+
+
+def target_object(target, object_id, user):
+    """The record ``user`` may attach an upload of ``target`` to, or None."""
+    spec = UPLOAD_TARGETS[target]
+    objects = apps.get_model(spec.model).objects.filter(**{spec.owner_lookup: user})
+    if target == 'resume':
+        return objects.first()
+    return objects.filter(pk=object_id).first()
+
+
+# -----------------------
+# Chunks
+# -----------------------
+def partial_path(session):
+    return os.path.join(settings.UPLOAD_SESSION_DIR, f'{session.pk}.part')
+
+
+def parse_checksum(header):
+    """(algorithm, digest) from an ``Upload-Checksum: <algorithm> <base64>`` header, or None."""
+    if not header:
+        return None
+    algorithm, _, encoded = header.strip().partition(' ')
+    algorithm = algorithm.lower()
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ValidationError({'checksum': f'Supported algorithms: {", ".join(CHECKSUM_ALGORITHMS)}.'})
+    try:
+        return algorithm, base64.b64decode(encoded.strip(), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValidationError({'checksum': 'Expected "<algorithm> <base64 digest>".'})
+
+
+def _open_locked(session):
+    os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+    fh = os.fdopen(os.open(partial_path(session), os.O_RDWR | os.O_CREAT, 0o600), 'r+b')
+    if not locks.lock(fh, locks.LOCK_EX | locks.LOCK_NB):
+        fh.close()
+        raise UploadBusy()
+    return fh
+
+
+def append_chunk(session, stream, offset, length, checksum=None):
+    """
+    Write ``length`` bytes read from ``stream`` at ``offset`` of the partial
+    file and advance the session's offset; returns the new offset.
+    """
+    if length > getattr(settings, 'UPLOAD_CHUNK_MAX_BYTES', 8 * 1024 * 1024):
+        raise UploadTooLarge('Chunk is larger than UPLOAD_CHUNK_MAX_BYTES.')
+    if offset + length > session.size:
+        raise UploadTooLarge('Chunk runs past the declared upload size.')
+
+    with _open_locked(session) as fh:
+        # Only the lock holder may trust the offset
+        session.refresh_from_db(fields=['offset', 'status'])
+        if session.status != 'uploading':
+            raise OffsetMismatch('Upload is already complete.')
+        if offset != session.offset:
+            raise OffsetMismatch(f'Upload offset is {session.offset}.')
+
+        # Drop whatever an interrupted chunk left after the offset
+        fh.seek(offset)
+        fh.truncate()
+        hasher = hashlib.new(checksum[0]) if checksum else None
+        remaining = length
+        while remaining:
+            data = stream.read(min(COPY_CHUNK_SIZE, remaining))
+            if not data:
+                break
+            fh.write(data)
+            if hasher:
+                hasher.update(data)
+            remaining -= len(data)
+
+        if remaining or (hasher and hasher.digest() != checksum[1]):
+            fh.truncate(offset)
+            if remaining:
+                raise ValidationError({'detail': 'Chunk ended before Content-Length bytes were received.'})
+            raise ChecksumMismatch()
+        fh.flush()
+        os.fsync(fh.fileno())
+
+        session.offset = offset + length
+        session.save(update_fields=['offset', 'updated_at'])
+    return session.offset
+
+
+# -----------------------
+# Completion
+# -----------------------
+def file_sha256(fh):
+    fh.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: fh.read(COPY_CHUNK_SIZE), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def complete_upload(session, user):
+    """Move the finished file into its record's field; returns the record."""
+    with _open_locked(session) as fh:
+        session.refresh_from_db(fields=['offset', 'status'])
+        if session.status != 'uploading':
+            raise OffsetMismatch('Upload is already complete.')
+        if session.offset != session.size:
+            raise OffsetMismatch(f'Upload is incomplete: {session.offset} of {session.size} bytes received.')
+        if session.checksum and file_sha256(fh) != session.checksum.lower():
+            # The file can't be trusted; start over
+            fh.truncate(0)
+            session.offset = 0
+            session.save(update_fields=['offset', 'updated_at'])
+            raise ChecksumMismatch('Checksum of the assembled file does not match; upload it again.')
+
+        instance = target_object(session.target, session.object_id, user)
+        if instance is None:
+            raise ValidationError({'object_id': 'The record for this upload no longer exists.'})
+
+        field = getattr(instance, UPLOAD_TARGETS[session.target].field)
+        with transaction.atomic():
+            profile_id = owning_profile_id(instance)
+            if profile_id is not None:
+                # Other uploads may have finished since the session was created;
+                # the profile lock keeps concurrent completions from all passing
+                FacultyProfile.objects.select_for_update().filter(pk=profile_id).values_list('pk').first()
+                check_quota(user, session.size, stored_size(field.field, field.name))
+            field.save(get_valid_filename(session.filename), PartialFile(fh, name=partial_path(session)), save=True)
+            session.status = 'complete'
+            session.save(update_fields=['status', 'updated_at'])
+
+    # Moved into storage unless the storage had to copy it
+    discard_partial(session)
+    return instance
+
+
+def discard_partial(session):
+    try:
+        os.remove(partial_path(session))
+    except FileNotFoundError:
+        pass
@@ -1,4 +1,5 @@
 # users/urls.py
+from django.conf import settings
 from django.urls import path
 from .views import (
     FacultyRegistrationView, RecruiterRegistrationView, LoginView,
@@ -11,10 +12,16 @@ from .views import (
     SkillListCreateView, SkillDetailView,
     PresentationListCreateView, PresentationDetailView,
     DocumentListCreateView, DocumentDetailView,
-    FacultySearchView, RecruiterFacultyDetailView,
-    MarkedProfileListCreateView, unmark_profile, is_profile_marked
+    FacultySearchView, RecruiterFacultyDetailView, RecruiterFacultyCompareView,
+    MarkedProfileListCreateView, unmark_profile, is_profile_marked, bulk_mark_profiles
 )
 from .views_dropdowns import DegreeListView, CollegeListView, DepartmentListView
+from .views_exports import FacultyExportView, ExportJobDetailView, ExportJobDownloadView
+from .views_async import faculty_detail, faculty_profile_bundle
+from .views_uploads import UploadSessionCreateView, UploadSessionDetailView, UploadSessionCompleteView
+
+# Async read views pay off under ASGI (see users/views_async.py)
+faculty_detail_view = faculty_detail if settings.USE_ASYNC_READ_VIEWS else RecruiterFacultyDetailView.as_view()
 
 urlpatterns = [
     # auth + registration
@@ -24,19 +31,33 @@ urlpatterns = [
 
     # Basic profile endpoints
     path('faculty/profile/', FacultyProfileDetail.as_view(), name='faculty-profile'),
+    path('faculty/profile/bundle/', faculty_profile_bundle, name='faculty-profile-bundle'),
     path('recruiter/profile/', RecruiterProfileDetail.as_view(), name='recruiter-profile'),
 
     # recruiter aggregated faculty search
     path('recruiter/faculty-search/', FacultySearchView.as_view(), name='recruiter-faculty-search'),
 
     # recruiter faculty full detail by user id
-    path('recruiter/faculty/<int:user_id>/details/', RecruiterFacultyDetailView.as_view(), name='recruiter-faculty-detail'),
+    path('recruiter/faculty/<int:user_id>/details/', faculty_detail_view, name='recruiter-faculty-detail'),
+    path('recruiter/faculty/compare/', RecruiterFacultyCompareView.as_view(), name='recruiter-faculty-compare'),
 
     # marked profiles endpoints
     path('recruiter/marked-profiles/', MarkedProfileListCreateView.as_view(), name='marked-profiles'),
+    path('recruiter/marked-profiles/bulk/', bulk_mark_profiles, name='bulk-mark-profiles'),
     path('recruiter/marked-profiles/<int:faculty_id>/', unmark_profile, name='unmark-profile'),
     path('recruiter/faculty/<int:faculty_id>/is-marked/', is_profile_marked, name='is-profile-marked'),
 
+    # CSV / XLSX exports (large ones run as background jobs)
+    path('recruiter/faculty-search/export/<str:file_format>/', FacultyExportView.as_view(), name='faculty-search-export'),
+    path('recruiter/marked-profiles/export/<str:file_format>/', FacultyExportView.as_view(source='shortlist'), name='marked-profiles-export'),
+    path('recruiter/exports/<int:pk>/', ExportJobDetailView.as_view(), name='export-job-detail'),
+    path('recruiter/exports/<int:pk>/download/', ExportJobDownloadView.as_view(), name='export-job-download'),
+
+    # chunked, resumable uploads of transcripts, resumes, documents, certificates and job PDFs
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-sessions'),
+    path('uploads/<uuid:pk>/', UploadSessionDetailView.as_view(), name='upload-session-detail'),
+    path('uploads/<uuid:pk>/complete/', UploadSessionCompleteView.as_view(), name='upload-session-complete'),
+
     # lookups
     path('colleges/', CollegeListView.as_view(), name='colleges-list'),
     path('degrees/', DegreeListView.as_view(), name='degrees-list'),
@@ -1,14 +1,25 @@
 # users/views.py
 import json
+import logging
+from itertools import islice
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status, generics, permissions
+from rest_framework.exceptions import NotAcceptable
 from rest_framework.decorators import api_view, permission_classes
 from django.contrib.auth import authenticate, get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from .email_utils import send_welcome_email, send_admin_notification
+from myjobs_backend.cache import get_or_build, namespaced_key
+from myjobs_backend.db_router import ReplicaReadMixin, on_primary
+from myjobs_backend.query_budget import QueryBudget, query_budget
 
 from .serializers import (
     FacultyRegistrationSerializer, RecruiterRegistrationSerializer,
@@ -17,7 +28,7 @@ from .serializers import (
     CertificateSerializer, MembershipSerializer, ExperienceSerializer,
     SkillSerializer, PresentationSerializer, DocumentSerializer,
     CollegeSerializer, DegreeSerializer, DepartmentSerializer,
-    MarkedProfileSerializer
+    MarkedProfileSerializer, BulkMarkSerializer, departments_by_profile
 )
 from .models import (
     FacultyProfile, RecruiterProfile,
@@ -27,8 +38,17 @@ from .models import (
     College, Degree, Department, MarkedProfile
 )
 from .permissions import IsOwnerOrReadOnly, IsApplicant, IsRecruiter
+from .faculty_detail import (
+    SECTIONS as DETAIL_SECTIONS, absolutize, cached_detail_payload, detail_payloads,
+    marked_faculty_ids,
+)
+from .faculty_search import (
+    base_profiles, search_profiles, search_rows, search_cache_key,
+    iter_search_records,
+)
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 # -----------------------
 # Helpers
@@ -41,9 +61,9 @@ class FacultyRegistrationView(APIView):
 
     def post(self, request):
         try:
-            # Debug: Print incoming data
-            print("Incoming registration data:", request.data)
-            print("Files:", request.FILES)
+            # Never log field values here: the payload contains the password
+            logger.debug("Faculty registration attempt: fields=%s files=%s",
+                         sorted(request.data.keys()), sorted(request.FILES.keys()))
             
             serializer = FacultyRegistrationSerializer(data=request.data)
             if serializer.is_valid():
@@ -75,18 +95,17 @@ class FacultyRegistrationView(APIView):
                     
                 except Exception as e:
                     # Log the error but don't expose it to the user
-                    print(f"Error sending emails: {str(e)}")
+                    logger.exception("Error sending registration emails")
                     return Response(
                         {"message": "Registration successful, but there was an issue sending the confirmation email. Please contact support."},
                         status=status.HTTP_201_CREATED
                     )
             else:
-                # Debug: Print validation errors
-                print("Validation errors:", serializer.errors)
+                logger.info("Faculty registration rejected: %s", serializer.errors)
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
                 
         except Exception as e:
-            print(f"Unexpected error in registration: {str(e)}")
+            logger.exception("Unexpected error in faculty registration")
             return Response(
                 {"detail": "An unexpected error occurred during registration. Please try again."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -150,9 +169,10 @@ class LoginView(APIView):
 class FacultyProfileDetail(generics.RetrieveUpdateAPIView):
     serializer_class = FacultyProfileSerializer
     permission_classes = [permissions.IsAuthenticated, IsApplicant, IsOwnerOrReadOnly]
+    query_budget = QueryBudget(2)
 
     def get_object(self):
-        profile, _ = FacultyProfile.objects.get_or_create(
+        profile, _ = FacultyProfile.objects.select_related('user').get_or_create(
             user=self.request.user,
             defaults={'first_name': '', 'last_name': '', 'work_preference': []}
         )
@@ -245,10 +265,10 @@ class EducationDetailView(generics.RetrieveUpdateDestroyAPIView):
 class TranscriptListCreateView(generics.ListCreateAPIView):
     serializer_class = TranscriptSerializer
     permission_classes = [permissions.IsAuthenticated, IsApplicant]
+    query_budget = QueryBudget(4)
 
     def get_queryset(self):
         try:
-            print(f"[DEBUG] Getting profile for user: {self.request.user.id} - {self.request.user.email}")
             # Get or create the faculty profile if it doesn't exist
             # Create a profile if missing; CustomUser does not have first_name/last_name fields
             profile, created = FacultyProfile.objects.get_or_create(
@@ -257,18 +277,18 @@ class TranscriptListCreateView(generics.ListCreateAPIView):
 
             )
             if created:
-                print(f"[DEBUG] Created new FacultyProfile for user {self.request.user.id}")
-            else:
-                print(f"[DEBUG] Found existing profile: {profile.id}")
+                logger.debug("Created FacultyProfile %s for user %s", profile.id, self.request.user.id)
                 
-            transcripts = Transcript.objects.filter(profile=profile).order_by('-created_at')
-            print(f"[DEBUG] Found {transcripts.count()} transcripts")
+            transcripts = (
+                Transcript.objects.filter(profile=profile)
+                .select_related('department')
+                .prefetch_related(Prefetch('courses', queryset=Course.objects.select_related('department')))
+                .order_by('-created_at')
+            )
             return transcripts
             
-        except Exception as e:
-            print(f"[ERROR] Error in get_queryset: {str(e)}")
-            print(f"[ERROR] User: {self.request.user.id if hasattr(self.request, 'user') else 'No user'}")
-            print(f"[ERROR] Request path: {self.request.path if hasattr(self.request, 'path') else 'No path'}")
+        except Exception:
+            logger.exception("Error loading transcripts for user %s", getattr(self.request.user, 'id', None))
             # Return an empty queryset instead of raising the exception
             return Transcript.objects.none()
     def create(self, request, *args, **kwargs):
@@ -288,7 +308,7 @@ class TranscriptListCreateView(generics.ListCreateAPIView):
         serializer = self.get_serializer(data=data, context={'profile': profile, 'request': request})
         if not serializer.is_valid():
             # Return detailed errors for easier debugging
-            print("[VALIDATION] Transcript create errors:", serializer.errors)
+            logger.info("Transcript create rejected: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         # Save the instance and ensure nested Course creation runs inside serializer.create()
         instance = serializer.save()
@@ -319,7 +339,7 @@ class TranscriptDetailView(generics.RetrieveUpdateDestroyAPIView):
 
         serializer = self.get_serializer(instance, data=data, partial=partial)
         if not serializer.is_valid():
-            print("[VALIDATION] Transcript update errors:", serializer.errors)
+            logger.info("Transcript update rejected: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         self.perform_update(serializer)
         return Response(serializer.data)
@@ -349,64 +369,43 @@ class MembershipListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         try:
-            print(f"[DEBUG] Getting memberships for user: {self.request.user.email}")
-            
             # Get or create the profile
             try:
                 profile = FacultyProfile.objects.get(user=self.request.user)
-                print(f"[DEBUG] Found profile: {profile.id}")
             except FacultyProfile.DoesNotExist:
-                print("[DEBUG] Profile does not exist, creating...")
                 profile = FacultyProfile.objects.create(
                     user=self.request.user,
                     first_name='',
                     last_name='',
                     work_preference=[]
                 )
-                print(f"[DEBUG] Created new profile: {profile.id}")
+                logger.debug("Created FacultyProfile %s for user %s", profile.id, self.request.user.id)
             
             # Get memberships
-            memberships = profile.memberships.all().order_by('-start_date')
-            print(f"[DEBUG] Found {memberships.count()} memberships")
-            return memberships
+            return profile.memberships.all().order_by('-start_date')
             
-        except Exception as e:
-            import traceback
-            error_msg = f"Error in get_queryset: {str(e)}\n{traceback.format_exc()}"
-            print(f"[ERROR] {error_msg}")
+        except Exception:
+            logger.exception("Error loading memberships for user %s", self.request.user.id)
             return Membership.objects.none()
     
     def perform_create(self, serializer):
         try:
-            print(f"[DEBUG] Creating membership for user: {self.request.user.email}")
             profile = FacultyProfile.objects.get(user=self.request.user)
-            print(f"[DEBUG] Using profile: {profile.id}")
             instance = serializer.save(profile=profile)
-            print(f"[DEBUG] Created membership: {instance.id}")
-        except Exception as e:
-            import traceback
-            error_msg = f"Error in perform_create: {str(e)}\n{traceback.format_exc()}"
-            print(f"[ERROR] {error_msg}")
+            logger.debug("Created membership %s for profile %s", instance.id, profile.id)
+        except Exception:
+            logger.exception("Error creating membership for user %s", self.request.user.id)
             raise
     
     def handle_exception(self, exc):
-        import traceback
-        error_details = {
-            'error': str(exc),
-            'traceback': traceback.format_exc(),
-            'user': str(self.request.user),
-            'method': self.request.method,
-            'path': self.request.path,
-        }
-        print("\n" + "="*50)
-        print("ERROR IN MEMBERSHIP VIEW:")
-        for k, v in error_details.items():
-            print(f"{k.upper()}:\n{v}")
-        print("="*50 + "\n")
+        logger.error(
+            "Error in membership view: %s %s",
+            self.request.method, self.request.path,
+            exc_info=exc,
+            extra={'user_id': getattr(self.request.user, 'id', None)},
+        )
         
         # Return a proper error response
-        from rest_framework.response import Response
-        from rest_framework import status
         return Response(
             {"detail": "An error occurred while processing your request."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -478,90 +477,78 @@ class DocumentDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsApplicant, IsOwnerOrReadOnly]
 
 
-class FacultySearchView(APIView):
+class FacultySearchView(ReplicaReadMixin, APIView):
     """
     Read-only aggregated view for recruiters to search registered faculty.
     Data comes exclusively from Transcript -> Courses and FacultyProfile.
+
+    Optional filters: ``?department=``, ``?course=``, ``?degree=``.
+    The recruiter-independent record list is cached per filter combination
+    (single-flight, invalidated by users/signals.py) when it holds at most
+    FACULTY_SEARCH_CACHE_MAX_RECORDS records. Larger results, and any request
+    with ``?stream=1``, skip the cache and stream the array record by record
+    through the negotiated renderer (so camelCase clients still get camelCase)
+    to keep memory flat. Renderers that can't stream, MessagePack and the
+    browsable API, get 406 for those. Reads go to the read replica, if configured.
     """
     permission_classes = [permissions.IsAuthenticated, IsRecruiter]
+    query_budget = QueryBudget(3)
 
     def get(self, request):
-        # Get faculty IDs that are already marked by this recruiter
-        marked_faculty_ids = MarkedProfile.objects.filter(
-            recruiter=request.user
-        ).values_list('faculty_id', flat=True)
-        
-        profiles = (
-            FacultyProfile.objects.filter(transcripts_list__isnull=False)
-            .select_related("user")
-            .prefetch_related("transcripts_list__department", "transcripts_list__courses")
-            .exclude(user_id__in=marked_faculty_ids)  # Exclude already marked faculty
-            .distinct()
+        params = request.query_params
+        if params.get('stream') in ('1', 'true'):
+            return self.stream(request, params)
+
+        records = get_or_build(
+            namespaced_key('faculty-search', search_cache_key(params)),
+            on_primary(lambda: self.cacheable_records(params)),
+            timeout=getattr(settings, 'FACULTY_SEARCH_CACHE_TIMEOUT', 60),
+            stale_timeout=getattr(settings, 'FACULTY_SEARCH_STALE_TIMEOUT', 300),
+        )
+        if records is None:
+            # Too large to cache: streamed from the database like ?stream=1
+            return self.stream(request, params)
+        marked_faculty_ids = set(
+            MarkedProfile.objects.filter(recruiter=request.user).values_list('faculty_id', flat=True)
         )
-
         results = []
-        for p in profiles:
-            # Basic identity
-            first = (p.first_name or "").strip()
-            last = (p.last_name or "").strip()
-            full_name = f"{first} {last}".strip() or p.user.email
-            initials = "".join([s[0] for s in [first, last] if s])[:2].upper() or (p.user.email[:2].upper() if p.user.email else "")
-            photo_url = None
-            try:
-                if p.profile_photo:
-                    photo_url = request.build_absolute_uri(p.profile_photo.url)
-            except Exception:
-                photo_url = None
-
-            # Aggregate transcript-derived details
-            course_credit_total = 0.0
-            departments = []
-            degrees = []
-            degree_credits = []
-            courses = []
-
-            for t in p.transcripts_list.all():
-                dept_name = t.department.name if t.department else None
-                if dept_name and dept_name not in departments:
-                    departments.append(dept_name)
-
-                t_credits = 0.0
-                for c in t.courses.all():
-                    credit = float(c.credits or 0)
-                    t_credits += credit
-                    courses.append({"name": c.name, "credits": credit})
-                course_credit_total += t_credits
-
-                degrees.append({
-                    "institution": t.college,
-                    "degree": t.degree,
-                    "department": dept_name,
-                    "degree_level": t.degree_level,
-                    "label": f"{t.college} \u2013 {t.degree}" + (f" \u2013 {dept_name}" if dept_name else "")
-                })
-                degree_credits.append({
-                    "degree": t.degree,
-                    "credits": t_credits
-                })
-
-            results.append({
-                "id": p.user.id,
-                "profile_id": p.id,
-                "email": p.user.email,
-                "first_name": first,
-                "last_name": last,
-                "full_name": full_name,
-                "initials": initials,
-                "profile_photo_url": photo_url,
-                "course_credit_total": course_credit_total,
-                "courses": courses,
-                "degrees": degrees,
-                "degree_credits": degree_credits,
-                "departments": departments,
-            })
-
+        for record in records:
+            if record['id'] in marked_faculty_ids:
+                continue
+            if record['profile_photo_url']:
+                record = {**record, 'profile_photo_url': request.build_absolute_uri(record['profile_photo_url'])}
+            results.append(record)
         return Response(results, status=status.HTTP_200_OK)
 
+    @staticmethod
+    def cacheable_records(params):
+        """The records for ``params``, or None if there are more than FACULTY_SEARCH_CACHE_MAX_RECORDS."""
+        limit = getattr(settings, 'FACULTY_SEARCH_CACHE_MAX_RECORDS', 2000)
+        chunk_size = getattr(settings, 'FACULTY_SEARCH_STREAM_CHUNK_SIZE', 2000)
+        # A cursor, so a result over the limit is never loaded in full
+        rows = search_rows(base_profiles(params)).iterator(chunk_size=chunk_size)
+        records = list(islice(iter_search_records(rows, None), limit + 1))
+        return records if len(records) <= limit else None
+
+    def stream(self, request, params):
+        renderer = request.accepted_renderer
+        if not hasattr(renderer, 'stream_array'):
+            raise NotAcceptable(
+                f'This result is too large for {request.accepted_media_type}; '
+                f'request application/json or narrow the search.'
+            )
+        # Faculty already marked by this recruiter are excluded in SQL
+        rows = search_rows(search_profiles(request.user, params))
+        chunk_size = getattr(settings, 'FACULTY_SEARCH_STREAM_CHUNK_SIZE', 2000)
+        records = iter_search_records(rows.iterator(chunk_size=chunk_size), request)
+        return StreamingHttpResponse(renderer.stream_array(records), content_type=renderer.media_type)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # The body format (and, for large results, 200 vs 406) depends on Accept
+        patch_vary_headers(response, ('Accept',))
+        return response
+
 
 class RecruiterFacultyDetailView(APIView):
     """
@@ -572,120 +559,68 @@ class RecruiterFacultyDetailView(APIView):
       - experience (Experience)
       - applicable_courses (per-transcript degree row + nested courses)
       - documents (uploaded documents)
+      - is_marked (whether the requesting recruiter has marked this faculty)
     """
     permission_classes = [permissions.IsAuthenticated, IsRecruiter]
+    query_budget = QueryBudget(8)
 
     def get(self, request, user_id: int):
-        # Locate the faculty profile for the given user id
-        profile = FacultyProfile.objects.filter(user_id=user_id).select_related('user').first()
-        if not profile or not getattr(profile.user, 'is_faculty', False):
+        # The assembled payload is shared by all recruiters (users/faculty_detail.py);
+        # only absolute URLs and the marked flag are per request
+        payload = cached_detail_payload(user_id)
+        if payload is None:
             return Response({'detail': 'Faculty not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Prefetch transcripts, their departments and courses
-        profile = (
-            FacultyProfile.objects
-            .filter(pk=profile.pk)
-            .select_related('user')
-            .prefetch_related(
-                'transcripts_list__department',
-                'transcripts_list__courses__department',
-                'educations',
-                'experiences',
-                'documents'
-            )
-        ).first()
-
-        # Aggregate departments and compute per-transcript data
-        degrees_blocks = []
-        departments = []
-        transcripts_summary = []
-
-        for t in profile.transcripts_list.all():
-            dept_name = t.department.name if t.department else None
-            if dept_name and dept_name not in departments:
-                departments.append(dept_name)
-
-            # sum credits for this transcript
-            t_credit_sum = 0.0
-            course_rows = []
-            for c in t.courses.all():
-                credit = float(c.credits or 0)
-                t_credit_sum += credit
-                course_rows.append({
-                    'code': c.code,
-                    'name': c.name,
-                    'credits': credit,
-                    'department': c.department.name if c.department else None,
-                })
-
-            degrees_blocks.append({
-                'transcript_id': t.id,
-                'degree_name': t.degree_level,  # e.g., Master's / Doctorate
-                'college_name': t.college,
-                'degree': t.degree,
-                'major': t.major,
-                'department': dept_name,
-                'course_credit_total': t_credit_sum,
-                'courses': course_rows,
-            })
-
-            transcripts_summary.append({
-                'id': t.id,
-                'degree_level': t.degree_level,
-                'degree': t.degree,
-                'college': t.college,
-                'major': t.major,
-                'department_name': dept_name,
-                'year_completed': t.year_completed,
-            })
-
-        # Build basic info
-        first = (profile.first_name or '').strip()
-        last = (profile.last_name or '').strip()
-        full_name = f"{first} {last}".strip() or profile.user.email
-        photo_url = None
+        payload = absolutize(payload, request)
+        payload['is_marked'] = user_id in marked_faculty_ids(request.user, [user_id])
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class RecruiterFacultyCompareView(APIView):
+    """
+    Detail payloads for several faculty at once, for side-by-side comparison.
+
+    GET ?ids=12,15,31 (up to FACULTY_COMPARE_MAX user ids)
+        &sections=basic_info,applicable_courses (optional, default all)
+
+    Returns ``results`` in the requested order (each with ``id`` and
+    ``is_marked``) and the ``not_found`` ids. The query count does not depend
+    on the number of ids.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsRecruiter]
+    query_budget = QueryBudget(8)
+
+    def get(self, request):
         try:
-            if profile.profile_photo:
-                photo_url = request.build_absolute_uri(profile.profile_photo.url)
-        except Exception:
-            photo_url = None
-
-        basic_info = {
-            'id': profile.user.id,
-            'email': profile.user.email,
-            'first_name': first,
-            'last_name': last,
-            'full_name': full_name,
-            'designation': profile.title,
-            'profile_photo_url': photo_url,
-            'linkedin': profile.linkedin,
-            'phone': profile.phone,
-            'city': profile.city,
-            'state': profile.state,
-            'work_preference': profile.work_preference or [],
-            'departments': departments,
-        }
-
-        # Serialize education, experience, documents using existing serializers
-        edu_list = EducationSerializer(profile.educations.all(), many=True).data
-        exp_list = ExperienceSerializer(profile.experiences.all(), many=True).data
-        # include request so FileField returns absolute URL
-        doc_list = DocumentSerializer(profile.documents.all(), many=True, context={'request': request}).data
-
-        payload = {
-            'basic_info': basic_info,
-            'education': {
-                'educations': edu_list,
-                'transcripts': transcripts_summary,
-            },
-            'experience': exp_list,
-            'applicable_courses': {
-                'degrees': degrees_blocks,
-            },
-            'documents': doc_list,
-        }
+            user_ids = list(dict.fromkeys(
+                int(v) for v in request.query_params.get('ids', '').split(',') if v.strip()
+            ))
+        except ValueError:
+            return Response({'ids': 'Expected a comma-separated list of user ids'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = getattr(settings, 'FACULTY_COMPARE_MAX', 10)
+        if not user_ids or len(user_ids) > limit:
+            return Response({'ids': f'Provide between 1 and {limit} user ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        sections = DETAIL_SECTIONS
+        if request.query_params.get('sections'):
+            sections = tuple(s.strip() for s in request.query_params['sections'].split(',') if s.strip())
+            unknown = set(sections) - set(DETAIL_SECTIONS)
+            if unknown:
+                return Response(
+                    {'sections': f"Unknown sections: {', '.join(sorted(unknown))}. Valid: {', '.join(DETAIL_SECTIONS)}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        return Response(payload, status=status.HTTP_200_OK)
+        payloads = detail_payloads(user_ids, sections)
+        marked = marked_faculty_ids(request.user, user_ids)
+        results = []
+        for uid in user_ids:
+            if uid in payloads:
+                results.append({'id': uid, **absolutize(payloads[uid], request), 'is_marked': uid in marked})
+        return Response({
+            'results': results,
+            'not_found': [uid for uid in user_ids if uid not in payloads],
+        }, status=status.HTTP_200_OK)
 
 
 # -----------------------
@@ -698,10 +633,26 @@ class MarkedProfileListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = MarkedProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = QueryBudget(4)
     
     def get_queryset(self):
         """Only return marked profiles for the current recruiter"""
-        return MarkedProfile.objects.filter(recruiter=self.request.user)
+        return (
+            MarkedProfile.objects.filter(recruiter=self.request.user)
+            .select_related('faculty__facultyprofile')
+        )
+    
+    def list(self, request, *args, **kwargs):
+        """Resolve departments for every listed faculty in two queries"""
+        marked = list(self.filter_queryset(self.get_queryset()))
+        profile_ids = [
+            m.faculty.facultyprofile.id for m in marked
+            if hasattr(m.faculty, 'facultyprofile')
+        ]
+        context = self.get_serializer_context()
+        context['faculty_departments'] = departments_by_profile(profile_ids)
+        serializer = self.get_serializer_class()(marked, many=True, context=context)
+        return Response(serializer.data)
     
     def perform_create(self, serializer):
         """Set the recruiter to the current user"""
@@ -726,6 +677,45 @@ def unmark_profile(request, faculty_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+@query_budget(5, methods=('POST',))
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated, IsRecruiter])
+def bulk_mark_profiles(request):
+    """
+    Mark and/or unmark many faculty in one request:
+        {"mark": [faculty user ids], "unmark": [faculty user ids]}
+    Already-marked faculty are skipped (ON CONFLICT DO NOTHING) and all
+    unmarks run as one DELETE. Returns the resulting {id: is_marked} map for
+    every requested id, plus ids that aren't faculty accounts.
+    """
+    serializer = BulkMarkSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    mark_ids = set(serializer.validated_data['mark'])
+    unmark_ids = set(serializer.validated_data['unmark'])
+
+    with transaction.atomic():
+        if mark_ids:
+            valid_ids = set(User.objects.filter(id__in=mark_ids, is_faculty=True).values_list('id', flat=True))
+            MarkedProfile.objects.bulk_create(
+                [MarkedProfile(recruiter=request.user, faculty_id=fid) for fid in valid_ids],
+                ignore_conflicts=True,
+            )
+        else:
+            valid_ids = set()
+        if unmark_ids:
+            MarkedProfile.objects.filter(recruiter=request.user, faculty_id__in=unmark_ids).delete()
+
+    requested = mark_ids | unmark_ids
+    marked = set(
+        MarkedProfile.objects.filter(recruiter=request.user, faculty_id__in=requested)
+        .values_list('faculty_id', flat=True)
+    )
+    return Response({
+        'marked': {str(fid): fid in marked for fid in sorted(requested)},
+        'invalid': sorted(mark_ids - valid_ids),
+    }, status=status.HTTP_200_OK)
+
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def is_profile_marked(request, faculty_id):
@@ -0,0 +1,98 @@
+# users/views_async.py
+"""
+Async versions of read-heavy endpoints (plain Django async views, see
+myjobs_backend/async_views.py). Under ASGI a request waiting on the database
+no longer holds a worker, and the independent queries of one request run
+concurrently on worker threads.
+"""
+from django.db.models import Prefetch
+
+from myjobs_backend.async_views import api_response, authenticate, error_response, gather_db
+from .faculty_detail import abuild_detail_payload, absolutize, cached_detail_entry, marked_faculty_ids
+from .models import (
+    Certificate, Course, Document, Education, Experience, FacultyProfile, Membership,
+    Presentation, Skill, Transcript,
+)
+from .serializers import (
+    CertificateSerializer, DocumentSerializer, EducationSerializer, ExperienceSerializer,
+    FacultyProfileSerializer, MembershipSerializer, PresentationSerializer, SkillSerializer,
+    TranscriptSerializer,
+)
+
+NOT_AUTHENTICATED = 'Authentication credentials were not provided.'
+FORBIDDEN = 'You do not have permission to perform this action.'
+
+
+async def faculty_detail(request, user_id):
+    """
+    GET: Async RecruiterFacultyDetailView (same payload). The cache lookup
+    and the marked check run concurrently; on a miss the profile sections are
+    loaded concurrently too.
+    """
+    if request.method != 'GET':
+        return error_response(request, f'Method "{request.method}" not allowed.', 405)
+    user = await authenticate(request)
+    if user is None:
+        return error_response(request, NOT_AUTHENTICATED, 401)
+    if not user.is_recruiter:
+        return error_response(request, FORBIDDEN, 403)
+
+    (key, payload), marked = await gather_db(
+        lambda: cached_detail_entry(user_id),
+        lambda: marked_faculty_ids(user, [user_id]),
+    )
+    if payload is None:
+        payload = await abuild_detail_payload(user_id, key)
+    if payload is None:
+        return error_response(request, 'Faculty not found', 404)
+
+    payload = absolutize(payload, request)
+    payload['is_marked'] = user_id in marked
+    return api_response(request, payload)
+
+
+# section -> (serializer, queryset for the faculty's user id); orderings
+# match the individual list endpoints
+BUNDLE_SECTIONS = {
+    'educations': (EducationSerializer, lambda uid: Education.objects.filter(profile__user_id=uid).order_by('-created_at')),
+    'transcripts': (TranscriptSerializer, lambda uid: (
+        Transcript.objects.filter(profile__user_id=uid)
+        .select_related('department')
+        .prefetch_related(Prefetch('courses', queryset=Course.objects.select_related('department')))
+        .order_by('-created_at')
+    )),
+    'certificates': (CertificateSerializer, lambda uid: Certificate.objects.filter(profile__user_id=uid).order_by('-created_at')),
+    'memberships': (MembershipSerializer, lambda uid: Membership.objects.filter(profile__user_id=uid).order_by('-start_date')),
+    'experiences': (ExperienceSerializer, lambda uid: Experience.objects.filter(profile__user_id=uid).order_by('-created_at')),
+    'skills': (SkillSerializer, lambda uid: Skill.objects.filter(profile__user_id=uid)),
+    'presentations': (PresentationSerializer, lambda uid: Presentation.objects.filter(profile__user_id=uid)),
+    'documents': (DocumentSerializer, lambda uid: Document.objects.filter(profile__user_id=uid).order_by('-uploaded_at')),
+}
+
+
+async def faculty_profile_bundle(request):
+    """
+    GET: The faculty's whole profile page in one response -- the profile
+    plus every section list -- with all sections queried concurrently.
+    """
+    if request.method != 'GET':
+        return error_response(request, f'Method "{request.method}" not allowed.', 405)
+    user = await authenticate(request)
+    if user is None:
+        return error_response(request, NOT_AUTHENTICATED, 401)
+    if not user.is_faculty:
+        return error_response(request, FORBIDDEN, 403)
+
+    context = {'request': request}
+
+    def profile_data():
+        profile, _ = FacultyProfile.objects.select_related('user').get_or_create(
+            user=user, defaults={'first_name': '', 'last_name': '', 'work_preference': []}
+        )
+        return FacultyProfileSerializer(profile, context=context).data
+
+    def section_data(serializer_class, queryset):
+        return lambda: serializer_class(queryset(user.id), many=True, context=context).data
+
+    results = await gather_db(profile_data, *(section_data(*spec) for spec in BUNDLE_SECTIONS.values()))
+    return api_response(request, {'profile': results[0], **dict(zip(BUNDLE_SECTIONS, results[1:]))})
@@ -2,8 +2,32 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from .models import Degree, College, Department
 from .serializers_dropdowns import DegreeSerializer, CollegeSerializer, DepartmentSerializer
+from rest_framework.response import Response
+from myjobs_backend.cache import get_or_build, namespaced_key
+from myjobs_backend.compression import cache_compressed
+from myjobs_backend.db_router import ReplicaReadMixin, on_primary
+from myjobs_backend.query_budget import QueryBudget
 
-class DegreeListView(generics.ListAPIView):
+
+class CachedLookupMixin:
+    """
+    Serve the (small, rarely changing) lookup list from the cache. Entries are
+    rebuilt single-flight and invalidated by users/signals.py via the
+    'lookups' namespace; their compressed bodies are cached alongside.
+    """
+    cache_name = None
+
+    def list(self, request, *args, **kwargs):
+        key = namespaced_key('lookups', self.cache_name)
+        data = get_or_build(
+            key,
+            on_primary(lambda: list(self.get_serializer(self.get_queryset(), many=True).data)),
+            timeout=3600,
+            stale_timeout=600,
+        )
+        return cache_compressed(Response(data), key, 3600 + 600)
+
+class DegreeListView(ReplicaReadMixin, CachedLookupMixin, generics.ListAPIView):
     """
     API endpoint that allows degrees to be viewed.
     """
@@ -11,8 +35,10 @@ class DegreeListView(generics.ListAPIView):
     serializer_class = DegreeSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None
+    cache_name = 'degrees'
+    query_budget = QueryBudget(2)
 
-class CollegeListView(generics.ListAPIView):
+class CollegeListView(ReplicaReadMixin, CachedLookupMixin, generics.ListAPIView):
     """
     API endpoint that allows colleges to be viewed.
     """
@@ -20,8 +46,10 @@ class CollegeListView(generics.ListAPIView):
     serializer_class = CollegeSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None
+    cache_name = 'colleges'
+    query_budget = QueryBudget(2)
 
-class DepartmentListView(generics.ListAPIView):
+class DepartmentListView(ReplicaReadMixin, CachedLookupMixin, generics.ListAPIView):
     """
     API endpoint that allows departments to be viewed.
     """
@@ -29,3 +57,5 @@ class DepartmentListView(generics.ListAPIView):
     serializer_class = DepartmentSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None
+    cache_name = 'departments'
+    query_budget = QueryBudget(2)
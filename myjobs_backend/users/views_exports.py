@@ -0,0 +1,92 @@
+# users/views_exports.py
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from myjobs_backend.db_router import ReplicaReadMixin
+from myjobs_backend.query_budget import QueryBudget
+from .exports import (
+    CONTENT_TYPES, export_profiles, export_rows, stream_csv, write_export,
+)
+from .faculty_search import SEARCH_FILTERS
+from .models import ExportJob
+from .permissions import IsRecruiter
+from .serializers import ExportJobSerializer
+
+
+class FacultyExportView(ReplicaReadMixin, APIView):
+    """
+    GET: Export the recruiter's faculty search results (source='search',
+    honouring ?department=, ?course=, ?degree=) or shortlist
+    (source='shortlist') as CSV or XLSX.
+
+    Up to EXPORT_SYNC_MAX_ROWS profiles are returned directly; larger exports
+    are queued as an ExportJob for ``manage.py process_export_jobs`` and
+    answered with 202 and the job status.
+    Reads go to the replica, if configured; the job itself and its status
+    stay on the primary.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsRecruiter]
+    source = 'search'
+    query_budget = QueryBudget(3)
+
+    def get(self, request, file_format):
+        if file_format not in CONTENT_TYPES:
+            raise Http404
+        filters = {}
+        if self.source == 'search':
+            filters = {k: request.query_params[k] for k in SEARCH_FILTERS if request.query_params.get(k)}
+        profiles = export_profiles(request.user, self.source, filters)
+
+        if profiles.count() > getattr(settings, 'EXPORT_SYNC_MAX_ROWS', 5000):
+            job = ExportJob.objects.create(
+                recruiter=request.user, source=self.source, file_format=file_format, filters=filters,
+            )
+            serializer = ExportJobSerializer(job, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+        filename = f"{self.source}-export-{timezone.now():%Y%m%d-%H%M%S}.{file_format}"
+        if file_format == 'csv':
+            response = StreamingHttpResponse(stream_csv(export_rows(profiles)), content_type=CONTENT_TYPES['csv'])
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
+
+        # XLSX can only be sent once the workbook is closed; it is written to a
+        # temp file that FileResponse deletes when it closes it.
+        fh = tempfile.NamedTemporaryFile(suffix='.xlsx')
+        write_export(export_rows(profiles), file_format, fh)
+        return FileResponse(fh, as_attachment=True, filename=filename, content_type=CONTENT_TYPES['xlsx'])
+
+
+class ExportJobDetailView(generics.RetrieveAPIView):
+    """
+    GET: Status of one of the recruiter's background exports.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [permissions.IsAuthenticated, IsRecruiter]
+    query_budget = QueryBudget(2)
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(recruiter=self.request.user)
+
+
+class ExportJobDownloadView(APIView):
+    """
+    GET: Download the file of a finished background export.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsRecruiter]
+
+    def get(self, request, pk):
+        job = ExportJob.objects.filter(recruiter=request.user, pk=pk, status='done').first()
+        if job is None or not job.file:
+            raise Http404
+        return FileResponse(
+            job.file.open('rb'), as_attachment=True,
+            filename=f"{job.source}-export-{job.pk}.{job.file_format}",
+            content_type=CONTENT_TYPES[job.file_format],
+        )
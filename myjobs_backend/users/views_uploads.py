@@ -0,0 +1,85 @@
+# users/views_uploads.py
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from myjobs_backend.query_budget import QueryBudget
+from .models import UploadSession
+from .serializers import UploadSessionSerializer
+from .uploads import UPLOAD_TARGETS, append_chunk, complete_upload, discard_partial, parse_checksum
+
+
+def offset_headers(session):
+    return {'Upload-Offset': str(session.offset), 'Upload-Length': str(session.size), 'Cache-Control': 'no-store'}
+
+
+class UploadSessionCreateView(generics.CreateAPIView):
+    """
+    POST: Start a chunked upload (see users/uploads.py). Oversize files are
+    refused here with 413; the Location header is where chunks go.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+    def get_success_headers(self, data):
+        return {'Location': reverse('upload-session-detail', args=[data['id']])}
+
+
+class UploadSessionDetailView(APIView):
+    """
+    GET/HEAD: Bytes received so far (body and Upload-Offset header).
+    PATCH: Append the raw request body at Upload-Offset, optionally verified
+    against Upload-Checksum ("sha256 <base64 digest>").
+    DELETE: Abandon the upload.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = QueryBudget(4, methods=('GET', 'HEAD', 'PATCH'))
+
+    def get_object(self, pk):
+        return get_object_or_404(UploadSession, pk=pk, owner=self.request.user)
+
+    def get(self, request, pk):
+        session = self.get_object(pk)
+        return Response(UploadSessionSerializer(session).data, headers=offset_headers(session))
+
+    def patch(self, request, pk):
+        session = self.get_object(pk)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            raise ValidationError({'detail': 'Upload-Offset and Content-Length headers are required.'})
+        if offset < 0 or length <= 0:
+            raise ValidationError({'detail': 'Upload-Offset and Content-Length must be positive.'})
+
+        # The body is read straight from the request stream, chunk by chunk
+        append_chunk(session, request, offset, length, parse_checksum(request.headers.get('Upload-Checksum')))
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=offset_headers(session))
+
+    def delete(self, request, pk):
+        session = self.get_object(pk)
+        discard_partial(session)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionCompleteView(APIView):
+    """
+    POST: Verify the finished upload and attach it to its record; returns the
+    stored file's URL.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, owner=request.user)
+        instance = complete_upload(session, request.user)
+        stored = getattr(instance, UPLOAD_TARGETS[session.target].field)
+        data = UploadSessionSerializer(session).data
+        data['file_url'] = request.build_absolute_uri(stored.url)
+        return Response(data, status=status.HTTP_200_OK)